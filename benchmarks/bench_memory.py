@@ -0,0 +1,118 @@
+"""Wi-Fi設定のメモリ使用量ベンチマーク
+
+    python -m benchmarks.bench_memory [--sizes 1000 10000 100000]
+
+__slots__ なしの従来の dataclass、スロット化した WiFiConfig、列指向の
+WiFiConfigTable のそれぞれで、件数ごとの確保メモリ（tracemalloc）を比較します。
+"""
+import argparse
+import gc
+import sys
+import tracemalloc
+import uuid
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional
+
+from models.wifi_config import WiFiConfig
+from models.wifi_config_table import WiFiConfigTable
+
+
+@dataclass
+class _DictStatusFlags:
+    """比較用: __slots__ なしのステータスフラグ"""
+    ignore_today: bool = False
+    ignore_until_manual_reset: bool = False
+    last_ignored_date: Optional[str] = None
+
+
+@dataclass
+class _DictWiFiConfig:
+    """比較用: __slots__ なしのWi-Fi設定（従来の表現）"""
+    ssid: str
+    password: str
+    priority: int
+    id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    status_flags: _DictStatusFlags = field(default_factory=_DictStatusFlags)
+
+
+def _make_records(count: int) -> List[dict]:
+    # 実際の利用に近づけるため、SSIDは少数の値を使い回す
+    return [
+        {
+            "id": str(uuid.uuid4()),
+            "ssid": f"Network-{i % 200:03d}",
+            "password": f"password-{i:06d}",
+            "priority": i + 1,
+            "status_flags": {
+                "ignore_today": i % 7 == 0,
+                "ignore_until_manual_reset": i % 11 == 0,
+                "last_ignored_date": None,
+            },
+        }
+        for i in range(count)
+    ]
+
+
+def _build_dict_configs(records: List[dict]):
+    return [
+        _DictWiFiConfig(
+            ssid=r["ssid"], password=r["password"], priority=r["priority"], id=r["id"],
+            status_flags=_DictStatusFlags(**r["status_flags"]),
+        )
+        for r in records
+    ]
+
+
+def _build_slotted_configs(records: List[dict]):
+    return [WiFiConfig.from_dict(r) for r in records]
+
+
+def _build_table(records: List[dict]):
+    return WiFiConfigTable.from_dicts(records)
+
+
+def _measure(build: Callable[[List[dict]], object], records: List[dict]) -> int:
+    """build(records) が新たに確保したバイト数を返す（入力の辞書は含まない）"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build(records)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return after - before
+
+
+def run(sizes: List[int]) -> List[dict]:
+    """件数ごとに3種類の表現のメモリ使用量を計測する"""
+    results = []
+    for count in sizes:
+        records = _make_records(count)
+        results.append({
+            "count": count,
+            "dataclass_bytes": _measure(_build_dict_configs, records),
+            "slotted_bytes": _measure(_build_slotted_configs, records),
+            "table_bytes": _measure(_build_table, records),
+        })
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    args = parser.parse_args(argv)
+    
+    print(f"{'件数':>8} {'dataclass':>12} {'slots':>12} {'table':>12}  (1件あたりのバイト数)")
+    for result in run(args.sizes):
+        count = result["count"]
+        print(
+            f"{count:>8} "
+            f"{result['dataclass_bytes'] / count:>12.1f} "
+            f"{result['slotted_bytes'] / count:>12.1f} "
+            f"{result['table_bytes'] / count:>12.1f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,59 @@
+"""パスワード暗号化のベンチマーク
+
+    python -m benchmarks.bench_password_cipher [--count 10000] [--budget 1.0]
+
+暗号化・復号化それぞれの所要時間が予算（秒）を超えた場合は終了コード1を返します。
+"""
+import argparse
+import os
+import sys
+import time
+
+from services.password_cipher import PasswordCipher
+
+
+def run(count: int = 10000) -> dict:
+    """count件のパスワードを一括で暗号化・復号化した時間を計測する"""
+    cipher = PasswordCipher(os.urandom(32))
+    passwords = [f"password-{i:05d}-secret" for i in range(count)]
+    
+    start = time.perf_counter()
+    tokens = cipher.encrypt_many(passwords)
+    encrypt_seconds = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    decrypted = cipher.decrypt_many(tokens)
+    decrypt_seconds = time.perf_counter() - start
+    
+    if decrypted != passwords:
+        raise AssertionError("復号結果が一致しません")
+    
+    return {
+        "algorithm": cipher.algorithm,
+        "count": count,
+        "encrypt_seconds": encrypt_seconds,
+        "decrypt_seconds": decrypt_seconds,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=10000)
+    parser.add_argument("--budget", type=float, default=1.0, help="暗号化・復号化それぞれの上限（秒）")
+    args = parser.parse_args(argv)
+    
+    result = run(args.count)
+    print(
+        f"{result['algorithm']}: {result['count']}件 "
+        f"暗号化 {result['encrypt_seconds'] * 1000:.1f}ms / 復号化 {result['decrypt_seconds'] * 1000:.1f}ms "
+        f"(予算 {args.budget * 1000:.0f}ms)"
+    )
+    
+    if max(result["encrypt_seconds"], result["decrypt_seconds"]) > args.budget:
+        print("予算超過")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,172 @@
+"""スキャン結果パーサーのベンチマーク
+
+    python -m benchmarks.bench_scan_parser [--bss 20000] [--ssids 2000] [--repeat 5]
+
+`iw dev wlan0 scan` と `wpa_cli scan_results` の出力を模した大きなダンプを生成し、
+services.scan_parser のストリーミングパーサーと、従来の「出力全体を split して
+リストで重複を除く」方式のスループット（行/秒, MB/秒）を比較します。
+計測の前に、生成したダンプの解析結果を検証します（実機の出力形式での検証は
+tests/test_scan_parser.py と tests/fixtures のスキャン出力で行います）。
+"""
+import argparse
+import random
+import sys
+import time
+from typing import List
+
+from services.scan_parser import StrongestBySsid, parse_iw_scan, parse_wpa_cli_scan_results
+
+
+def _bssid(i: int) -> str:
+    return ":".join(f"{b:02x}" for b in i.to_bytes(6, "big"))
+
+
+def _make_bss(count: int, ssids: int, seed: int = 0) -> list:
+    """(ssid, bssid, freq, signal) のリスト（SSIDは ssids 種類を使い回す）"""
+    rng = random.Random(seed)
+    return [
+        (f"Network-{rng.randrange(ssids):05d}", _bssid(i + 1), rng.choice((2412, 2437, 2462, 5180, 5745)),
+         float(rng.randrange(-95, -30)))
+        for i in range(count)
+    ]
+
+
+def make_iw_dump(bss: list) -> str:
+    """`iw dev wlan0 scan` 形式のダンプを生成する"""
+    blocks = []
+    for ssid, bssid, freq, signal in bss:
+        blocks.append(
+            f"BSS {bssid}(on wlan0)\n"
+            f"\tTSF: 1234567890 usec (0d, 00:20:34)\n"
+            f"\tfreq: {freq}\n"
+            f"\tbeacon interval: 100 TUs\n"
+            f"\tcapability: ESS Privacy ShortSlotTime (0x0411)\n"
+            f"\tsignal: {signal:.2f} dBm\n"
+            f"\tlast seen: 120 ms ago\n"
+            f"\tSSID: {ssid}\n"
+            f"\tSupported rates: 1.0* 2.0* 5.5* 11.0* 6.0 9.0 12.0 18.0\n"
+            f"\tDS Parameter set: channel 6\n"
+            f"\tRSN:\t * Version: 1\n"
+            f"\t\t * Group cipher: CCMP\n"
+            f"\t\t * Pairwise ciphers: CCMP\n"
+            f"\t\t * Authentication suites: PSK\n"
+            f"\t\t * Capabilities: 16-PTKSA-RC 1-GTKSA-RC (0x000c)\n"
+            f"\tHT capabilities:\n"
+            f"\t\tCapabilities: 0x1ad\n"
+            f"\t\tMax AMSDU length: 3839 bytes\n"
+        )
+    return "".join(blocks)
+
+
+def make_wpa_cli_dump(bss: list) -> str:
+    """`wpa_cli scan_results` 形式のダンプを生成する"""
+    lines = ["bssid / frequency / signal level / flags / ssid\n"]
+    for ssid, bssid, freq, signal in bss:
+        lines.append(f"{bssid}\t{freq}\t{int(signal)}\t[WPA2-PSK-CCMP][ESS]\t{ssid}\n")
+    return "".join(lines)
+
+
+def _legacy_parse_iw(output: str) -> List[str]:
+    """比較用: 従来のiwの解析（split + リストで重複除去）"""
+    ssids = []
+    for line in output.split('\n'):
+        if 'SSID:' in line:
+            ssid = line.split('SSID:')[1].strip()
+            if ssid and ssid not in ssids:
+                ssids.append(ssid)
+    return ssids
+
+
+def _legacy_parse_wpa_cli(output: str) -> List[str]:
+    """比較用: 従来のwpa_cliの解析"""
+    ssids = []
+    for line in output.split('\n')[1:]:
+        parts = line.split()
+        if len(parts) >= 5:
+            ssid = ' '.join(parts[4:])
+            if ssid and ssid not in ssids:
+                ssids.append(ssid)
+    return ssids
+
+
+def _expected_strongest(bss: list) -> dict:
+    best = {}
+    for ssid, bssid, freq, signal in bss:
+        if ssid not in best or signal > best[ssid][1]:
+            best[ssid] = (bssid, signal)
+    return best
+
+
+def _best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _verify(name: str, parsed: list, expected: dict):
+    """解析結果が生成したダンプと一致するか確かめる（python -O でも省略されないよう assert は使わない）
+    
+    Raises:
+        RuntimeError: 一致しない場合
+    """
+    if len(parsed) != len(expected):
+        raise RuntimeError(f"{name}: SSIDの数が一致しません（{len(parsed)} != {len(expected)}）")
+    for r in parsed:
+        bssid, signal = expected[r.ssid]
+        if (r.bssid, r.signal_dbm) != (bssid, float(int(signal))):
+            raise RuntimeError(f"{name}: {r.ssid} の最も強いBSSが一致しません（{r}）")
+    if any(a.signal_dbm < b.signal_dbm for a, b in zip(parsed, parsed[1:])):
+        raise RuntimeError(f"{name}: 信号の強い順に並んでいません")
+
+
+def run(bss_count: int = 20000, ssid_count: int = 2000, repeat: int = 5) -> dict:
+    """生成したダンプでパーサーを検証し、スループットを計測する"""
+    bss = _make_bss(bss_count, ssid_count)
+    expected = _expected_strongest(bss)
+    result = {"bss": bss_count, "ssids": len(expected)}
+    
+    for name, dump, parse, legacy in (
+        ("iw", make_iw_dump(bss), parse_iw_scan, _legacy_parse_iw),
+        ("wpa_cli", make_wpa_cli_dump(bss), parse_wpa_cli_scan_results, _legacy_parse_wpa_cli),
+    ):
+        lines = dump.splitlines(keepends=True)
+        _verify(name, StrongestBySsid(parse(lines)).results(), expected)
+        
+        seconds = _best_of(lambda: StrongestBySsid(parse(lines)).results(), repeat)
+        legacy_seconds = _best_of(lambda: legacy(dump), repeat)
+        size_mb = len(dump.encode("utf-8")) / 1e6
+        result[name] = {
+            "lines": len(lines),
+            "megabytes": size_mb,
+            "seconds": seconds,
+            "lines_per_second": len(lines) / seconds,
+            "megabytes_per_second": size_mb / seconds,
+            "legacy_seconds": legacy_seconds,
+        }
+    return result
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--bss", type=int, default=20000, help="BSSの数")
+    parser.add_argument("--ssids", type=int, default=2000, help="SSIDの種類の数")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+    
+    result = run(args.bss, args.ssids, args.repeat)
+    print(f"BSS {result['bss']}件 / SSID {result['ssids']}種類（解析結果の検証: OK）")
+    for name in ("iw", "wpa_cli"):
+        r = result[name]
+        print(
+            f"  {name:8s} {r['lines']:8d}行 {r['megabytes']:6.2f}MB  "
+            f"{r['seconds'] * 1000:8.1f}ms ({r['lines_per_second'] / 1e6:.2f}M行/秒, "
+            f"{r['megabytes_per_second']:.1f}MB/秒)  従来方式 {r['legacy_seconds'] * 1000:8.1f}ms"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
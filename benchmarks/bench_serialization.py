@@ -0,0 +1,185 @@
+"""Wi-Fi設定のシリアライズのベンチマーク
+
+    python -m benchmarks.bench_serialization [--count 10000] [--trials 9] [--min-speedup 3.0]
+
+従来の dataclasses.asdict による辞書変換と、生成済みの変換関数（models.codec）で
+「オブジェクト → 辞書 → オブジェクト」の往復のスループットを比較します。
+参考として、標準ライブラリの json と services.json_codec を含めた往復も計測します。
+
+計測は --trials 回に分け、各回で従来方式と codec を続けて計測して速度比を求めます
+（マシンの負荷の変化が両方に同じように影響するようにするため）。
+辞書変換の速度比の中央値が --min-speedup を下回った場合は、全回の結果を表示して
+終了コード1を返します。1回ごとの速度比は負荷の揺れで上下するため、最小値ではなく
+中央値で判定します（たまたま速かった1回でも、たまたま遅かった1回でも結果は変わりません）。
+"""
+import argparse
+import gc
+import json
+import statistics
+import sys
+import time
+import uuid
+from dataclasses import dataclass, field, asdict
+from typing import Optional
+
+from models.wifi_config import WiFiConfig
+from services import json_codec
+
+
+@dataclass
+class _LegacyStatusFlags:
+    """比較用: 従来のステータスフラグ（asdict で変換）"""
+    ignore_today: bool = False
+    ignore_until_manual_reset: bool = False
+    last_ignored_date: Optional[str] = None
+    
+    def to_dict(self):
+        return asdict(self)
+    
+    @classmethod
+    def from_dict(cls, data: dict):
+        return cls(**data)
+
+
+@dataclass
+class _LegacyWiFiConfig:
+    """比較用: 従来のWi-Fi設定"""
+    ssid: str
+    password: str
+    priority: int
+    id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    status_flags: _LegacyStatusFlags = field(default_factory=_LegacyStatusFlags)
+    
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "ssid": self.ssid,
+            "password": self.password,
+            "priority": self.priority,
+            "status_flags": self.status_flags.to_dict()
+        }
+    
+    @classmethod
+    def from_dict(cls, data: dict):
+        status_flags = _LegacyStatusFlags.from_dict(data.get("status_flags", {}))
+        return cls(
+            id=data.get("id", str(uuid.uuid4())),
+            ssid=data["ssid"],
+            password=data["password"],
+            priority=data["priority"],
+            status_flags=status_flags
+        )
+
+
+def _make_records(count: int) -> list:
+    return [
+        {
+            "id": str(uuid.uuid4()),
+            "ssid": f"Network-{i:05d}",
+            "password": f"hmac1:{'A' * 64}{i:05d}",
+            "priority": i + 1,
+            "status_flags": {
+                "ignore_today": i % 7 == 0,
+                "ignore_until_manual_reset": i % 11 == 0,
+                "last_ignored_date": None,
+            },
+        }
+        for i in range(count)
+    ]
+
+
+def _best_of(fn, repeat: int) -> float:
+    """repeat回実行した最短時間（timeit と同様にGCを止めて計測）"""
+    best = float("inf")
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - start)
+    finally:
+        if gc_enabled:
+            gc.enable()
+    return best
+
+
+def run(count: int = 10000, repeat: int = 10, trials: int = 9) -> dict:
+    """count件の往復（エンコード + デコード）の所要時間を計測する
+    
+    Returns:
+        各項目の最短時間（秒）と、回ごとの速度比（speedups）・その中央値（speedup）を含む辞書
+    """
+    records = _make_records(count)
+    legacy_configs = [_LegacyWiFiConfig.from_dict(r) for r in records]
+    configs = WiFiConfig.from_dicts(records)
+    legacy_text = json.dumps({"wifi_configs": records}, indent=2, ensure_ascii=False)
+    text = json_codec.dumps_bytes({"wifi_configs": records}, indent=True)
+    
+    def legacy_roundtrip():
+        [_LegacyWiFiConfig.from_dict(r) for r in [w.to_dict() for w in legacy_configs]]
+    
+    def roundtrip():
+        WiFiConfig.from_dicts(WiFiConfig.to_dicts(configs))
+    
+    def legacy_json_roundtrip():
+        json.dumps({"wifi_configs": [w.to_dict() for w in legacy_configs]}, indent=2, ensure_ascii=False)
+        [_LegacyWiFiConfig.from_dict(r) for r in json.loads(legacy_text)["wifi_configs"]]
+    
+    def json_roundtrip():
+        json_codec.dumps_bytes({"wifi_configs": WiFiConfig.to_dicts(configs)}, indent=True)
+        WiFiConfig.from_dicts(json_codec.loads(text)["wifi_configs"])
+    
+    speedups = []
+    json_speedups = []
+    seconds = {"legacy_seconds": [], "codec_seconds": [], "legacy_json_seconds": [], "codec_json_seconds": []}
+    for _ in range(trials):
+        legacy = _best_of(legacy_roundtrip, repeat)
+        codec = _best_of(roundtrip, repeat)
+        legacy_json = _best_of(legacy_json_roundtrip, repeat)
+        codec_json = _best_of(json_roundtrip, repeat)
+        speedups.append(legacy / codec)
+        json_speedups.append(legacy_json / codec_json)
+        for name, value in (("legacy_seconds", legacy), ("codec_seconds", codec),
+                            ("legacy_json_seconds", legacy_json), ("codec_json_seconds", codec_json)):
+            seconds[name].append(value)
+    
+    result = {"count": count, "json": json_codec.backend_name(), "trials": trials}
+    result.update({name: min(values) for name, values in seconds.items()})
+    result["speedups"] = speedups
+    result["speedup"] = statistics.median(speedups)
+    result["json_speedup"] = statistics.median(json_speedups)
+    return result
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=10, help="1回の計測で実行する回数（最良値を使う）")
+    parser.add_argument("--trials", type=int, default=9, help="速度比を求める回数（中央値で判定する）")
+    parser.add_argument("--min-speedup", type=float, default=3.0, help="従来方式に対する速度比の中央値の下限")
+    args = parser.parse_args(argv)
+    
+    result = run(args.count, args.repeat, args.trials)
+    speedups = sorted(result["speedups"])
+    print(
+        f"{result['count']}件の往復（{result['trials']}回）\n"
+        f"  辞書変換:  asdict {result['legacy_seconds'] * 1000:.1f}ms / "
+        f"codec {result['codec_seconds'] * 1000:.1f}ms "
+        f"(最小 {speedups[0]:.2f}倍 / 中央値 {result['speedup']:.2f}倍 / "
+        f"最大 {speedups[-1]:.2f}倍, 中央値の下限 {args.min_speedup:.1f}倍)\n"
+        f"  JSON込み:  asdict + json {result['legacy_json_seconds'] * 1000:.1f}ms / "
+        f"codec + {result['json']} {result['codec_json_seconds'] * 1000:.1f}ms "
+        f"(中央値 {result['json_speedup']:.2f}倍)"
+    )
+    
+    if result["speedup"] < args.min_speedup:
+        print(f"NG: 辞書変換の速度比の中央値 {result['speedup']:.2f}倍が下限 {args.min_speedup:.1f}倍を"
+              f"下回りました（{', '.join(f'{s:.2f}' for s in result['speedups'])}）", file=sys.stderr)
+        return 1
+    print(f"OK: 辞書変換の速度比の中央値 {result['speedup']:.2f}倍が下限 {args.min_speedup:.1f}倍を超えました")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
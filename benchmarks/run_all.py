@@ -0,0 +1,290 @@
+"""ベンチマークをまとめて実行し、結果をJSONで保存する
+
+    python -m benchmarks.run_all [--sizes 10 1000 10000] [--output result.json]
+                                 [--baseline previous.json] [--threshold 0.25]
+
+保存済みWi-Fi設定の件数ごとに、以下の所要時間（秒）を計測します。
+
+- storage: StorageManager の読み込み・一括保存・追加・更新・削除（追加・更新・削除は1件あたり）
+- scan_parser: iw / wpa_cli のスキャン出力の解析（件数と同じ数のBSS）
+- ignore_filter: is_ignored() による1件ずつの除外、exclude_ignored() による一括の除外、
+  WiFiConfigTable の列（フラグ・日付）から求める除外のビットマスク
+- matching: スキャン結果（300件）から接続候補を探す処理
+- dashboard: Dashboard.load_wifi_configs() による一覧の作り直し（flet がない場合は省略）
+
+--baseline に以前の結果を指定すると、threshold（0.25 なら25%）を超えて遅くなった
+項目を表示し、終了コード1を返します。
+"""
+import argparse
+import json
+import platform
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional
+
+from models.wifi_config import WiFiConfig, exclude_ignored, today_epoch_day
+from models.wifi_config_table import WiFiConfigTable
+from services import json_codec
+from services.scan_parser import StrongestBySsid, parse_iw_scan, parse_wpa_cli_scan_results
+from services.storage_manager import StorageManager
+from services.wifi_repository import WiFiRepository
+from benchmarks.bench_scan_parser import _make_bss, make_iw_dump, make_wpa_cli_dump
+
+# 追加・更新・削除を計測する回数（1件あたりの時間を求める）
+_OPS_PER_SIZE = 20
+
+# この時間より短い項目は、比率が大きくても計測誤差として回帰とみなさない（秒）
+_MIN_REGRESSION_SECONDS = 1e-4
+
+
+def _best_of(fn: Callable[[], object], repeat: int,
+             setup: Optional[Callable[[], object]] = None) -> float:
+    """fn の最短の所要時間（setup は毎回 fn の前に呼ばれ、計測に含めない）"""
+    best = float("inf")
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _make_configs(count: int, ignored_every: int = 7) -> List[WiFiConfig]:
+    """count件のWi-Fi設定（SSIDは使い回し、ignored_every 件に1件は除外中）"""
+    today = today_epoch_day()
+    configs = []
+    for i in range(count):
+        wifi = WiFiConfig(ssid=f"Network-{i % max(count // 3, 1):05d}", password=f"password-{i:05d}", priority=i)
+        if i % ignored_every == 0:
+            wifi.status_flags.ignore_today = True
+            wifi.status_flags.last_ignored_date = today
+        configs.append(wifi)
+    return configs
+
+
+def bench_storage(size: int, repeat: int) -> Dict[str, float]:
+    """StorageManager の読み込み・保存・追加・更新・削除"""
+    with tempfile.TemporaryDirectory() as storage_dir:
+        storage = StorageManager(storage_dir=storage_dir)
+        configs = _make_configs(size)
+        
+        # 保存済みと同じ内容は書き込まれないため、毎回すべての設定を変更してから保存する
+        def touch_all():
+            for wifi in configs:
+                wifi.set_ignore_permanently(not wifi.status_flags.ignore_until_manual_reset)
+        save = _best_of(lambda: storage.save_wifi_configs(configs), repeat, setup=touch_all)
+        
+        # バックエンドもファイルの内容をキャッシュするため、毎回新しい StorageManager で読み込む
+        fresh: List[StorageManager] = []
+        
+        def open_fresh():
+            if fresh:
+                fresh.pop().close()
+            fresh.append(StorageManager(storage_dir=storage_dir))
+        load_seconds = _best_of(lambda: fresh[-1].get_wifi_configs(), repeat, setup=open_fresh)
+        fresh.pop().close()
+        
+        added = [WiFiConfig(ssid=f"Added-{i}", password="secret", priority=size + i) for i in range(_OPS_PER_SIZE)]
+        start = time.perf_counter()
+        for wifi in added:
+            storage.add_wifi_config(wifi)
+        add = (time.perf_counter() - start) / _OPS_PER_SIZE
+        
+        start = time.perf_counter()
+        for wifi in added:
+            wifi.set_ignore_permanently(True)
+            storage.update_wifi_config(wifi)
+        update = (time.perf_counter() - start) / _OPS_PER_SIZE
+        
+        start = time.perf_counter()
+        for wifi in added:
+            storage.delete_wifi_config(wifi.id)
+        delete = (time.perf_counter() - start) / _OPS_PER_SIZE
+        
+        assert len(storage.get_wifi_configs()) == size
+        storage.close()
+    return {"load": load_seconds, "save": save, "add": add, "update": update, "delete": delete}
+
+
+def bench_scan_parser(size: int, repeat: int) -> Dict[str, float]:
+    """size件のBSSを含むスキャン出力の解析"""
+    bss = _make_bss(size, max(size // 10, 1))
+    results = {}
+    for name, dump, parse in (
+        ("iw", make_iw_dump(bss), parse_iw_scan),
+        ("wpa_cli", make_wpa_cli_dump(bss), parse_wpa_cli_scan_results),
+    ):
+        lines = dump.splitlines(keepends=True)
+        results[name] = _best_of(lambda: StrongestBySsid(parse(lines)).results(), repeat)
+    return results
+
+
+def bench_ignore_filter(size: int, repeat: int) -> Dict[str, float]:
+    """除外中のWi-Fiを除く処理"""
+    configs = _make_configs(size)
+    today = today_epoch_day()
+    expected = [wifi for wifi in configs if not wifi.is_ignored(today)]
+    assert exclude_ignored(configs, today) == expected
+    table = WiFiConfigTable(configs)
+    assert table.ignored_mask(today) == sum(1 << i for i, wifi in enumerate(configs) if wifi.is_ignored(today))
+    return {
+        "is_ignored": _best_of(lambda: [wifi for wifi in configs if not wifi.is_ignored(today)], repeat),
+        "exclude_ignored": _best_of(lambda: exclude_ignored(configs, today), repeat),
+        "table_ignored_mask": _best_of(lambda: table.ignored_mask(today), repeat),
+    }
+
+
+def bench_matching(size: int, repeat: int) -> Dict[str, float]:
+    """スキャン結果（300件）と保存済みWi-Fiの照合"""
+    configs = _make_configs(size)
+    repository = WiFiRepository(configs)
+    visible = [f"Network-{i:05d}" for i in range(0, 600, 2)]
+    today = today_epoch_day()
+    expected = [wifi for wifi in repository.match_scan(visible) if not wifi.is_ignored(today)]
+    assert repository.best_match(visible, today) is (expected[0] if expected else None)
+    return {
+        "match_scan": _best_of(lambda: repository.match_scan(visible), repeat),
+        "best_match": _best_of(lambda: repository.best_match(visible, today), repeat),
+    }
+
+
+class _StubPage:
+    """Dashboard の計測用の最小限のページ（描画はしない）"""
+    
+    def __init__(self):
+        self.overlay = []
+        self.snack_bar = None
+        self.dialog = None
+    
+    def update(self, *controls):
+        pass
+    
+    def run_task(self, handler, *args):
+        raise RuntimeError("計測中は非同期タスクを実行しません")
+
+
+def bench_dashboard(size: int, repeat: int) -> Optional[Dict[str, float]]:
+    """Dashboard.load_wifi_configs() による一覧の作り直し（flet がない場合はNone）"""
+    try:
+        from ui.dashboard import Dashboard
+    except ImportError:
+        return None
+    from services.license_manager import LicenseManager
+    from services.wifi_manager import WiFiManager
+    
+    with tempfile.TemporaryDirectory() as storage_dir:
+        storage = StorageManager(storage_dir=storage_dir)
+        storage.save_wifi_configs(_make_configs(size))
+        wifi_manager = WiFiManager(simulator="synthetic:networks=10")
+        dashboard = Dashboard(storage, wifi_manager, LicenseManager(), _StubPage())
+        seconds = _best_of(dashboard.load_wifi_configs, repeat)
+        assert len(dashboard.wifi_list_view.controls) == size
+        storage.close()
+    return {"load_wifi_configs": seconds}
+
+
+BENCHMARKS: Dict[str, Callable[[int, int], Optional[Dict[str, float]]]] = {
+    "storage": bench_storage,
+    "scan_parser": bench_scan_parser,
+    "ignore_filter": bench_ignore_filter,
+    "matching": bench_matching,
+    "dashboard": bench_dashboard,
+}
+
+
+def run(sizes: List[int], repeat: int = 3, only: Optional[List[str]] = None) -> dict:
+    """ベンチマークを実行する
+    
+    Returns:
+        {"environment": {...}, "results": {"storage.load": {"10": 秒, ...}, ...}, "skipped": [...]}
+    """
+    results: Dict[str, Dict[str, float]] = {}
+    skipped = []
+    for group, bench in BENCHMARKS.items():
+        if only and group not in only:
+            continue
+        for size in sizes:
+            measured = bench(size, repeat)
+            if measured is None:
+                skipped.append(group)
+                break
+            for name, seconds in measured.items():
+                results.setdefault(f"{group}.{name}", {})[str(size)] = seconds
+    return {
+        "environment": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "system": platform.system(),
+            "json_backend": json_codec.backend_name(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        },
+        "sizes": sizes,
+        "repeat": repeat,
+        "results": results,
+        "skipped": skipped,
+    }
+
+
+def find_regressions(current: dict, baseline: dict, threshold: float) -> List[dict]:
+    """baseline より threshold の割合を超えて遅くなった項目を返す
+    
+    どちらか一方にしかない項目と、_MIN_REGRESSION_SECONDS より短い差は比べません。
+    """
+    regressions = []
+    for name, by_size in current["results"].items():
+        base_by_size = baseline.get("results", {}).get(name, {})
+        for size, seconds in by_size.items():
+            base = base_by_size.get(size)
+            if base is None or base <= 0:
+                continue
+            if seconds > base * (1 + threshold) and seconds - base > _MIN_REGRESSION_SECONDS:
+                regressions.append({"name": name, "size": size, "baseline": base, "current": seconds,
+                                    "ratio": seconds / base})
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1000, 10000], help="保存済みWi-Fi設定の件数")
+    parser.add_argument("--repeat", type=int, default=3, help="各項目の計測回数（最良値を使う）")
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), help="実行するベンチマーク")
+    parser.add_argument("--output", help="結果を保存するJSONファイル")
+    parser.add_argument("--baseline", help="比較する以前の結果のJSONファイル")
+    parser.add_argument("--threshold", type=float, default=0.25, help="回帰とみなす遅くなった割合")
+    args = parser.parse_args(argv)
+    
+    result = run(args.sizes, args.repeat, args.only)
+    
+    print(f"{'項目':28s}" + "".join(f"{size:>12d}" for size in args.sizes))
+    for name, by_size in result["results"].items():
+        print(f"{name:28s}" + "".join(
+            f"{by_size[str(size)] * 1000:10.3f}ms" if str(size) in by_size else f"{'-':>12s}"
+            for size in args.sizes
+        ))
+    for group in result["skipped"]:
+        print(f"{group}: 必要なパッケージがないため省略しました")
+    
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"結果を保存しました: {args.output}")
+    
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = find_regressions(result, baseline, args.threshold)
+        if regressions:
+            print(f"NG: {len(regressions)}項目が{args.threshold:.0%}を超えて遅くなりました")
+            for r in regressions:
+                print(f"  {r['name']} [{r['size']}件] {r['baseline'] * 1000:.3f}ms -> "
+                      f"{r['current'] * 1000:.3f}ms ({r['ratio']:.2f}倍)")
+            return 1
+        print(f"OK: {args.threshold:.0%}を超えて遅くなった項目はありません")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,11 @@
 import flet as ft
 import traceback
 from services.storage_manager import StorageManager
-from services.wifi_manager import WiFiManager
+from services.wifi_manager import WiFiManager, CONNECTION_POLL_INTERVAL, DEFAULT_SCAN_CACHE_TTL
+from services.auto_connect import AutoConnectEngine
+from services.scan_scheduler import AdaptiveScanScheduler
 from services.license_manager import LicenseManager
+from services.midnight_rollover import MidnightRolloverScheduler
 from ui.dashboard import Dashboard
 
 
@@ -17,7 +20,12 @@ def main(page: ft.Page):
         
         # サービス初期化
         storage_manager = StorageManager()
-        wifi_manager = WiFiManager()
+        storage_manager.upgrade_password_encryption()  # 旧形式（Base64）のパスワードを暗号化し直す
+        storage_manager.upgrade_ignore_dates()  # 旧形式（ISO文字列）の無視日付をエポック日に変換
+        # スキャン結果はスキャン間隔の設定と同じ時間だけ再利用する
+        user_settings = storage_manager.get_user_settings()
+        scan_interval = user_settings.get("scan_interval_seconds", DEFAULT_SCAN_CACHE_TTL)
+        wifi_manager = WiFiManager(scan_cache_ttl=scan_interval)
         license_manager = LicenseManager()  # 開発環境ではモックモード
         
         # ダッシュボード作成
@@ -31,6 +39,44 @@ def main(page: ft.Page):
         # ページに追加
         page.add(dashboard)
         
+        # スキャン完了・接続・切断は wpa_supplicant のイベントで受け取る
+        # （受け取れない環境では接続状態をポーリングし、スキャン完了はスケジューラが知らせる）
+        event_source = wifi_manager.start_event_monitor(poll_interval=CONNECTION_POLL_INTERVAL)
+        print(f"Wi-Fiイベントの取得方法: {event_source}")
+        
+        # 周囲の変化に合わせて間隔を変えながら定期スキャン（スキャン間隔の設定が基準）
+        scan_scheduler = AdaptiveScanScheduler(wifi_manager, base_interval=scan_interval)
+        scan_scheduler.start()
+        
+        # 日付が変わったら期限切れの「今日だけ無視」を解除して一覧を更新
+        rollover_scheduler = MidnightRolloverScheduler(
+            storage_manager,
+            on_rollover=lambda expired: dashboard.load_wifi_configs()
+        )
+        rollover_scheduler.start()
+        
+        # より優先度の高いWi-Fiが見えたら切り替えを提案する
+        auto_connect_engine = None
+        if user_settings.get("notifications_enabled", True):
+            auto_connect_engine = AutoConnectEngine(
+                storage_manager,
+                wifi_manager,
+                on_decision=dashboard.show_auto_connect_decision,
+                interval=scan_interval,
+            )
+            auto_connect_engine.start(periodic=False)  # 定期スキャンはスケジューラに任せる
+        
+        # 終了時に遅延書き込み待ちの変更を保存
+        def on_disconnect(e):
+            rollover_scheduler.stop()
+            scan_scheduler.stop()
+            if auto_connect_engine is not None:
+                auto_connect_engine.stop()
+            storage_manager.flush()
+            wifi_manager.close()
+        
+        page.on_disconnect = on_disconnect
+        
     except Exception as e:
         # エラー発生時に画面に詳細を表示
         page.clean()
@@ -1,3 +1,22 @@
-from .wifi_config import WiFiConfig
+from .wifi_config import (
+    WiFiConfig,
+    EncryptedPassword,
+    reveal_password,
+    compute_ignored_flags,
+    exclude_ignored,
+    today_epoch_day,
+)
+from .wifi_config_table import WiFiConfigTable, WiFiConfigRow
+from .scan_result import ScanResult
 
-__all__ = ['WiFiConfig']
+__all__ = [
+    'WiFiConfig',
+    'EncryptedPassword',
+    'reveal_password',
+    'compute_ignored_flags',
+    'exclude_ignored',
+    'today_epoch_day',
+    'WiFiConfigTable',
+    'WiFiConfigRow',
+    'ScanResult',
+]
@@ -0,0 +1,236 @@
+import dataclasses
+import types
+from itertools import count
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+# 型チェックを行う単純な型（Optional や Union の項目はチェックしない）
+_CHECKED_TYPES = (str, int, bool, float)
+
+
+class ModelCodec:
+    """dataclass 専用の辞書変換関数（エンコーダ・デコーダ・検証関数）
+    
+    クラスのフィールド定義からソースコードを生成してコンパイルするため、
+    dataclasses.asdict のような再帰的な走査・コピーや、フィールドごとの
+    getattr / setattr のループは行いません。ネストした dataclass の変換も
+    同じ関数内に展開し、複数件の変換・検証は1つのループで行います。
+    get_codec() または register_codec() で取得してください。
+    """
+    
+    def __init__(self, cls: type, key_order: Optional[Sequence[str]] = None,
+                 decoders: Optional[Dict[str, Callable[[Any], Any]]] = None):
+        """
+        Args:
+            cls: 対象の dataclass
+            key_order: 辞書のキーの並び順（省略時はフィールドの定義順）
+            decoders: フィールド名 → 読み込み時の変換関数（旧形式の値の変換など）
+        """
+        self.cls = cls
+        fields = [f for f in dataclasses.fields(cls) if f.init and not f.name.startswith("_")]
+        if key_order is not None:
+            position = {name: i for i, name in enumerate(key_order)}
+            fields.sort(key=lambda f: position.get(f.name, len(position)))
+        self.fields = fields
+        self.decoders = dict(decoders or {})
+        
+        namespace: Dict[str, Any] = {"_MISSING": _MISSING_KEY, "_set": object.__setattr__}
+        names = count()
+        encode_expr = self._encode_expr("obj")
+        valid_expr = self._valid_expr("data", namespace, names)
+        source = "\n".join([
+            "def encode(obj):",
+            f"    return {encode_expr}",
+            "def encode_many(objs):",
+            f"    return [{encode_expr} for obj in objs]",
+            "def decode(data):",
+            *self._decode_lines("data", "obj", namespace, names, "    "),
+            "    return obj",
+            "def decode_many(records):",
+            "    result = []",
+            "    append = result.append",
+            "    for data in records:",
+            *self._decode_lines("data", "obj", namespace, names, "        "),
+            "        append(obj)",
+            "    return result",
+            "def invalid_indexes(records):",
+            f"    return [i for i, data in enumerate(records) if not ({valid_expr})]",
+            "def validate(data):",
+            "    if type(data) is not dict:",
+            "        return ['辞書ではありません']",
+            "    errors = []",
+            *self._validate_lines("data", "", namespace, names, "    "),
+            "    return errors",
+        ])
+        exec(compile(source, f"<codec {cls.__name__}>", "exec"), namespace)
+        self.encode: Callable[[Any], dict] = namespace["encode"]
+        self.decode: Callable[[dict], Any] = namespace["decode"]
+        self.validate: Callable[[Any], List[str]] = namespace["validate"]
+        self._encode_many = namespace["encode_many"]
+        self._decode_many = namespace["decode_many"]
+        self._invalid_indexes = namespace["invalid_indexes"]
+    
+    def _nested(self, f: dataclasses.Field) -> Optional["ModelCodec"]:
+        if isinstance(f.type, type) and dataclasses.is_dataclass(f.type):
+            return get_codec(f.type)
+        return None
+    
+    def _encode_expr(self, var: str) -> str:
+        """オブジェクトを辞書にする式（ネストした dataclass も同じ式に展開する）"""
+        items = []
+        for f in self.fields:
+            nested = self._nested(f)
+            if nested is not None:
+                items.append(f"{f.name!r}: {nested._encode_expr(f'{var}.{f.name}')}")
+            else:
+                items.append(f"{f.name!r}: {var}.{f.name}")
+        return "{" + ", ".join(items) + "}"
+    
+    def _decode_lines(self, data: str, obj: str, namespace: Dict[str, Any], names, indent: str) -> List[str]:
+        """辞書 data からオブジェクトを作って obj に代入する文"""
+        cls = self.cls
+        prefix = f"_{cls.__name__}{next(names)}"
+        namespace[f"{prefix}_new"] = cls.__new__
+        namespace[f"{prefix}_cls"] = cls
+        lines = [f"{indent}{obj} = {prefix}_new({prefix}_cls)"]
+        for f in dataclasses.fields(cls):
+            name = f.name
+            public = f.init and not name.startswith("_")
+            nested = self._nested(f) if public else None
+            if nested is not None:
+                inner_data = f"{prefix}_{name}_data"
+                inner_obj = f"{prefix}_{name}_obj"
+                lines.append(f"{indent}{inner_data} = {data}.get({name!r}) or {{}}")
+                lines.extend(nested._decode_lines(inner_data, inner_obj, namespace, names, indent))
+                value = inner_obj
+            elif public:
+                if f.default is not dataclasses.MISSING:
+                    namespace[f"{prefix}_default_{name}"] = f.default
+                    value = f"{data}.get({name!r}, {prefix}_default_{name})"
+                elif f.default_factory is not dataclasses.MISSING:
+                    namespace[f"{prefix}_factory_{name}"] = f.default_factory
+                    value = f"({data}.get({name!r}) or {prefix}_factory_{name}())"
+                else:
+                    value = f"{data}[{name!r}]"
+                if name in self.decoders:
+                    namespace[f"{prefix}_convert_{name}"] = self.decoders[name]
+                    value = f"{prefix}_convert_{name}({value})"
+            elif f.default is not dataclasses.MISSING:
+                namespace[f"{prefix}_default_{name}"] = f.default
+                value = f"{prefix}_default_{name}"
+            elif f.default_factory is not dataclasses.MISSING:
+                namespace[f"{prefix}_factory_{name}"] = f.default_factory
+                value = f"{prefix}_factory_{name}()"
+            else:
+                continue
+            slot = cls.__dict__.get(name)
+            if isinstance(slot, types.MemberDescriptorType):
+                # __slots__ のクラスはスロットのデスクリプタに直接書き込む（__setattr__ を経由しない）
+                namespace[f"{prefix}_set_{name}"] = slot.__set__
+                lines.append(f"{indent}{prefix}_set_{name}({obj}, {value})")
+            else:
+                lines.append(f"{indent}_set({obj}, {name!r}, {value})")
+        if hasattr(cls, "__post_init__"):
+            namespace[f"{prefix}_post_init"] = cls.__post_init__
+            lines.append(f"{indent}{prefix}_post_init({obj})")
+        return lines
+    
+    def _checks(self):
+        """(フィールド, 必須か, ネストしたcodec, チェックする型) を順に返す"""
+        for f in self.fields:
+            required = f.default is dataclasses.MISSING and f.default_factory is dataclasses.MISSING
+            nested = self._nested(f)
+            checked_type = None
+            if nested is None and f.type in _CHECKED_TYPES and f.name not in self.decoders:
+                checked_type = f.type
+            yield f, required, nested, checked_type
+    
+    def _valid_expr(self, var: str, namespace: Dict[str, Any], names) -> str:
+        """辞書 var が正しければ True になる式（検証ループの中で関数呼び出しなしに評価する）"""
+        terms = [f"type({var}) is dict"]
+        for f, required, nested, checked_type in self._checks():
+            if required:
+                terms.append(f"{f.name!r} in {var}")
+            if nested is None and checked_type is None:
+                continue
+            value = f"_v{next(names)}"
+            if nested is not None:
+                check = f"{value} is None or ({nested._valid_expr(value, namespace, names)})"
+            else:
+                namespace[f"_type_{checked_type.__name__}"] = checked_type
+                check = f"isinstance({value}, _type_{checked_type.__name__})"
+            terms.append(f"(({value} := {var}.get({f.name!r}, _MISSING)) is _MISSING or {check})")
+        return " and ".join(terms)
+    
+    def _validate_lines(self, var: str, path: str, namespace: Dict[str, Any], names, indent: str) -> List[str]:
+        """辞書 var の問題点を errors に追加する文（エラーメッセージの作成用）"""
+        lines = []
+        for f, required, nested, checked_type in self._checks():
+            value = f"_v{next(names)}"
+            label = f"{path}{f.name}"
+            lines.append(f"{indent}{value} = {var}.get({f.name!r}, _MISSING)")
+            if required:
+                lines.append(f"{indent}if {value} is _MISSING:")
+                lines.append(f"{indent}    errors.append('{label} がありません')")
+            if nested is not None:
+                lines.append(f"{indent}if type({value}) is dict:")
+                lines.extend(nested._validate_lines(value, f"{label}.", namespace, names, indent + "    "))
+                lines.append(f"{indent}elif {value} is not _MISSING and {value} is not None:")
+                lines.append(f"{indent}    errors.append('{label} が辞書ではありません')")
+            elif checked_type is not None:
+                namespace[f"_type_{checked_type.__name__}"] = checked_type
+                lines.append(f"{indent}if {value} is not _MISSING and not isinstance({value}, _type_{checked_type.__name__}):")
+                lines.append(f"{indent}    errors.append('{label} の型が不正です')")
+        return lines
+    
+    def encode_many(self, objs: Iterable[Any]) -> List[dict]:
+        """複数のオブジェクトをまとめて辞書に変換"""
+        return self._encode_many(objs)
+    
+    def decode_many(self, records: Iterable[dict], validate: bool = True) -> List[Any]:
+        """複数の辞書をまとめて検証してからオブジェクトに変換
+        
+        Raises:
+            ValueError: validate=True で不正なレコードが含まれていた場合（何も変換しない）
+        """
+        if not isinstance(records, (list, tuple)):
+            records = list(records)
+        if validate:
+            self.check_many(records)
+        return self._decode_many(records)
+    
+    def check_many(self, records: Sequence[dict]):
+        """複数の辞書をまとめて検証する
+        
+        Raises:
+            ValueError: 不正なレコードが含まれていた場合（先頭の数件の内容を含む）
+        """
+        invalid = self._invalid_indexes(records)
+        if not invalid:
+            return
+        problems = [f"{i}: {', '.join(self.validate(records[i]))}" for i in invalid[:5]]
+        more = f" ほか{len(invalid) - 5}件" if len(invalid) > 5 else ""
+        raise ValueError(
+            f"{self.cls.__name__} の不正なレコードが{len(invalid)}件あります（{'; '.join(problems)}{more}）"
+        )
+
+
+# 検証関数で「キーがない」ことを表す値
+_MISSING_KEY = object()
+
+_codecs: Dict[type, ModelCodec] = {}
+
+
+def register_codec(cls: type, key_order: Optional[Sequence[str]] = None,
+                   decoders: Optional[Dict[str, Callable[[Any], Any]]] = None) -> ModelCodec:
+    """クラスの変換関数を生成して登録する（オプションを指定する場合に使用）"""
+    codec = ModelCodec(cls, key_order, decoders)
+    _codecs[cls] = codec
+    return codec
+
+
+def get_codec(cls: type) -> ModelCodec:
+    """クラスの変換関数を返す（初回のみ生成）"""
+    codec = _codecs.get(cls)
+    if codec is None:
+        codec = register_codec(cls)
+    return codec
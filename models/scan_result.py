@@ -0,0 +1,30 @@
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+# 暗号化を表すフラグの接頭辞（wpa_supplicant の表記）
+_SECURED_FLAG_PREFIXES = ("WPA", "RSN", "WEP", "SAE", "OWE")
+
+
+@dataclass(slots=True)
+class ScanResult:
+    """スキャンで見つかったアクセスポイント（BSS）
+    
+    スキャン結果はキャッシュで共有されるため、変更しないでください
+    （大量に生成するので frozen にはしていません）。
+    """
+    ssid: str
+    bssid: str
+    freq: Optional[int] = None  # 周波数（MHz）
+    signal_dbm: Optional[float] = None  # 信号強度（dBm）
+    flags: Tuple[str, ...] = ()  # セキュリティなど（例: "WPA2-PSK-CCMP", "ESS"）
+    
+    @property
+    def is_open(self) -> bool:
+        """パスワードなしで接続できるネットワークか"""
+        return not any(flag.startswith(_SECURED_FLAG_PREFIXES) for flag in self.flags)
+    
+    def is_stronger_than(self, other: "ScanResult") -> bool:
+        """other より信号が強いか（信号強度が不明なものは最も弱いとみなす）"""
+        if self.signal_dbm is None:
+            return False
+        return other.signal_dbm is None or self.signal_dbm > other.signal_dbm
@@ -1,70 +1,272 @@
+import copy
+import time
 import uuid
-from datetime import datetime
-from dataclasses import dataclass, field, asdict
-from typing import Optional
+from datetime import date, datetime, timedelta
+from dataclasses import dataclass, field
+from typing import Any, Callable, FrozenSet, Iterable, List, Optional, Union
+from models.codec import register_codec
 
 
-@dataclass
+class EncryptedPassword:
+    """暗号化されたままのパスワード
+    
+    ストレージから読み込んだパスワードは復号化せずにこの形で保持し、
+    接続時など実際に必要になった時点で reveal() により復号化します。
+    """
+    __slots__ = ("token", "decrypt")
+    
+    def __init__(self, token: str, decrypt: Callable[[str], str]):
+        """
+        Args:
+            token: 暗号化済みの文字列
+            decrypt: token を平文に戻す関数
+        """
+        self.token = token
+        self.decrypt = decrypt
+    
+    def reveal(self) -> str:
+        """復号化した平文のパスワードを返す"""
+        return self.decrypt(self.token)
+    
+    def __eq__(self, other):
+        if isinstance(other, EncryptedPassword):
+            return self.token == other.token and self.decrypt == other.decrypt
+        return NotImplemented
+    
+    def __hash__(self):
+        return hash(self.token)
+    
+    def __repr__(self):
+        return "EncryptedPassword(***)"
+    
+    def __copy__(self):
+        return self
+    
+    def __deepcopy__(self, memo):
+        return self
+
+
+def reveal_password(password: Union[str, EncryptedPassword]) -> str:
+    """平文・暗号化済みのどちらのパスワードも平文にして返す"""
+    if isinstance(password, EncryptedPassword):
+        return password.reveal()
+    return password
+
+
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+# (今日のエポック日, 次のローカル時刻0時のタイムスタンプ)
+_today_cache = (0, 0.0)
+
+
+def to_epoch_day(day: date) -> int:
+    """日付を1970-01-01からの経過日数（エポック日）に変換"""
+    return day.toordinal() - _EPOCH_ORDINAL
+
+
+def from_epoch_day(epoch_day: int) -> date:
+    """エポック日を日付に変換"""
+    return date.fromordinal(epoch_day + _EPOCH_ORDINAL)
+
+
+def today_epoch_day() -> int:
+    """ローカル時刻での今日のエポック日
+    
+    日付の計算は日付が変わるまでキャッシュし、それまでは time.time() の比較だけで返します。
+    """
+    global _today_cache
+    day, next_midnight = _today_cache
+    if time.time() < next_midnight:
+        return day
+    today = date.today()
+    next_midnight = datetime.combine(today + timedelta(days=1), datetime.min.time()).timestamp()
+    _today_cache = (to_epoch_day(today), next_midnight)
+    return _today_cache[0]
+
+
+def parse_epoch_day(value) -> Optional[int]:
+    """保存されている last_ignored_date をエポック日に変換する
+    
+    旧形式のISO 8601文字列（"2024-01-01T12:00:00"）や、SQLiteのTEXT列から
+    読み込んだ数字の文字列にも対応します。
+    """
+    if value is None or isinstance(value, int):
+        return value
+    if isinstance(value, str):
+        if value.lstrip("-").isdigit():
+            return int(value)
+        return to_epoch_day(datetime.fromisoformat(value).date())
+    return int(value)
+
+
+@dataclass(slots=True)
 class StatusFlags:
     """Wi-Fi接続ステータスフラグ"""
     ignore_today: bool = False
     ignore_until_manual_reset: bool = False
-    last_ignored_date: Optional[str] = None
+    last_ignored_date: Optional[int] = None  # 無視を設定した日（エポック日）
+    _owner: Any = field(default=None, init=False, repr=False, compare=False)
+    
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        # 所属するWiFiConfigに変更を通知（ダーティトラッキング）
+        if name != "_owner":
+            owner = getattr(self, "_owner", None)
+            if owner is not None:
+                owner._touch("status_flags")
+    
+    def __copy__(self):
+        return StatusFlags(**self.to_dict())
     
     def to_dict(self):
-        return asdict(self)
+        return STATUS_FLAGS_CODEC.encode(self)
     
     @classmethod
     def from_dict(cls, data: dict):
-        return cls(**data)
+        return STATUS_FLAGS_CODEC.decode(data)
 
 
-@dataclass
+@dataclass(slots=True)
 class WiFiConfig:
-    """Wi-Fi設定情報モデル"""
+    """Wi-Fi設定情報モデル
+    
+    大量の設定を保持してもメモリを圧迫しないよう __slots__ を使用しています。
+    さらに省メモリにしたい場合は models.wifi_config_table.WiFiConfigTable を使用してください。
+    """
     ssid: str
-    password: str
+    password: Union[str, EncryptedPassword]
     priority: int
     id: str = field(default_factory=lambda: str(uuid.uuid4()))
     status_flags: StatusFlags = field(default_factory=StatusFlags)
+    # 変更されたフィールドのビットマスク（TRACKED_FIELDS の並び順）
+    _dirty_fields: Optional[int] = field(default=None, init=False, repr=False, compare=False)
+    _version: int = field(default=0, init=False, repr=False, compare=False)
     
-    def to_dict(self):
-        """辞書形式に変換"""
+    # 変更を追跡するフィールド
+    TRACKED_FIELDS = ("ssid", "password", "priority", "id", "status_flags")
+    _FIELD_BITS = {name: 1 << i for i, name in enumerate(TRACKED_FIELDS)}
+    _ALL_FIELD_BITS = (1 << len(TRACKED_FIELDS)) - 1
+    
+    def __post_init__(self):
+        # 一度も保存されていないので全フィールドを変更済みとして扱う
+        # （一括デコードで件数分呼ばれるため、スロットのデスクリプタに直接書き込む）
+        _set_dirty_fields(self, _ALL_FIELD_BITS)
+        _set_version(self, 0)
+        _set_owner(self.status_flags, self)
+    
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        if name in self.TRACKED_FIELDS and getattr(self, "_dirty_fields", None) is not None:
+            if name == "status_flags":
+                object.__setattr__(value, "_owner", self)
+            self._touch(name)
+    
+    def __copy__(self):
+        clone = WiFiConfig(
+            ssid=self.ssid,
+            password=self.password,
+            priority=self.priority,
+            id=self.id,
+            status_flags=copy.copy(self.status_flags),
+        )
+        object.__setattr__(clone, "_dirty_fields", self._dirty_fields)
+        object.__setattr__(clone, "_version", self._version)
+        return clone
+    
+    def _touch(self, name: str):
+        object.__setattr__(self, "_dirty_fields", self._dirty_fields | self._FIELD_BITS[name])
+        object.__setattr__(self, "_version", self._version + 1)
+    
+    @property
+    def version(self) -> int:
+        """変更のたびに増えるバージョン番号"""
+        return self._version
+    
+    @property
+    def is_dirty(self) -> bool:
+        """最後に保存されてから変更されているか"""
+        return bool(self._dirty_fields)
+    
+    @property
+    def dirty_fields(self) -> FrozenSet[str]:
+        """最後に保存されてから変更されたフィールド名"""
+        return frozenset(
+            name for name, bit in self._FIELD_BITS.items() if self._dirty_fields & bit
+        )
+    
+    def mark_clean(self, version: Optional[int] = None):
+        """保存済みとして変更履歴をクリアする
+        
+        Args:
+            version: 保存した時点のバージョン。指定した場合、その後に
+                     変更されていればクリアしない（保存漏れを防ぐ）
+        """
+        if version is None or version == self._version:
+            object.__setattr__(self, "_dirty_fields", 0)
+    
+    def to_delta(self) -> dict:
+        """変更されたフィールドだけを辞書で返す（idは常に含む）"""
+        data = self.to_dict()
+        dirty = self.dirty_fields
         return {
-            "id": self.id,
-            "ssid": self.ssid,
-            "password": self.password,
-            "priority": self.priority,
-            "status_flags": self.status_flags.to_dict()
+            key: value for key, value in data.items()
+            if key == "id" or key in dirty
         }
     
+    def to_dict(self):
+        """辞書形式に変換"""
+        return WIFI_CONFIG_CODEC.encode(self)
+    
     @classmethod
     def from_dict(cls, data: dict):
         """辞書から生成"""
-        status_flags = StatusFlags.from_dict(data.get("status_flags", {}))
-        return cls(
-            id=data.get("id", str(uuid.uuid4())),
-            ssid=data["ssid"],
-            password=data["password"],
-            priority=data["priority"],
-            status_flags=status_flags
-        )
+        return WIFI_CONFIG_CODEC.decode(data)
     
-    def should_ignore_today(self) -> bool:
-        """今日は無視するべきか判定"""
-        if not self.status_flags.ignore_today:
-            return False
+    @classmethod
+    def to_dicts(cls, configs: Iterable["WiFiConfig"]) -> List[dict]:
+        """複数のWi-Fi設定をまとめて辞書に変換"""
+        return WIFI_CONFIG_CODEC.encode_many(configs)
+    
+    @classmethod
+    def from_dicts(cls, records: Iterable[dict]) -> List["WiFiConfig"]:
+        """複数の辞書をまとめて検証してからWi-Fi設定を生成
         
-        # 日付が変わっていればフラグをリセット
-        if self.status_flags.last_ignored_date:
-            last_date = datetime.fromisoformat(self.status_flags.last_ignored_date).date()
-            today = datetime.now().date()
-            if last_date < today:
-                self.status_flags.ignore_today = False
-                self.status_flags.last_ignored_date = None
-                return False
+        Raises:
+            ValueError: 必須項目の欠落や型の不正なレコードが含まれていた場合
+        """
+        return WIFI_CONFIG_CODEC.decode_many(records)
+    
+    def should_ignore_today(self, today: Optional[int] = None) -> bool:
+        """今日は無視するべきか判定（フラグは変更しない）
+        
+        期限切れのフラグの解除は MidnightRolloverScheduler がまとめて行います。
+        解除前に呼ばれた場合も、前日以前に設定されたフラグは無視しません。
         
-        return True
+        Args:
+            today: 今日のエポック日（省略時は today_epoch_day()）
+        """
+        flags = self.status_flags
+        if not flags.ignore_today:
+            return False
+        if flags.last_ignored_date is None:
+            return True
+        if today is None:
+            today = today_epoch_day()
+        return flags.last_ignored_date >= today
+    
+    def is_ignore_today_expired(self, today: Optional[int] = None) -> bool:
+        """「今日だけ無視」が前日以前に設定されたもので、解除すべきか"""
+        flags = self.status_flags
+        if not flags.ignore_today or flags.last_ignored_date is None:
+            return False
+        if today is None:
+            today = today_epoch_day()
+        return flags.last_ignored_date < today
+    
+    def clear_ignore_today(self):
+        """今日だけ無視フラグを解除"""
+        self.status_flags.ignore_today = False
+        self.status_flags.last_ignored_date = None
     
     def should_ignore_permanently(self) -> bool:
         """永続的に無視するべきか判定"""
@@ -73,12 +275,61 @@ class WiFiConfig:
     def set_ignore_today(self):
         """今日だけ無視フラグをセット"""
         self.status_flags.ignore_today = True
-        self.status_flags.last_ignored_date = datetime.now().isoformat()
+        self.status_flags.last_ignored_date = today_epoch_day()
     
     def set_ignore_permanently(self, enabled: bool):
         """永続的に無視フラグをセット/解除"""
         self.status_flags.ignore_until_manual_reset = enabled
     
-    def is_ignored(self) -> bool:
-        """接続候補から除外されているか"""
-        return self.should_ignore_today() or self.should_ignore_permanently()
+    def is_ignored(self, today: Optional[int] = None) -> bool:
+        """接続候補から除外されているか
+        
+        Args:
+            today: 今日のエポック日（省略時は today_epoch_day()）
+        """
+        return self.should_ignore_today(today) or self.should_ignore_permanently()
+
+
+# 辞書との変換関数（クラス定義から生成）
+# __post_init__ で使うスロットの書き込み関数（__setattr__ を経由しない）
+_set_dirty_fields = WiFiConfig.__dict__["_dirty_fields"].__set__
+_set_version = WiFiConfig.__dict__["_version"].__set__
+_set_owner = StatusFlags.__dict__["_owner"].__set__
+_ALL_FIELD_BITS = WiFiConfig._ALL_FIELD_BITS
+
+STATUS_FLAGS_CODEC = register_codec(
+    StatusFlags,
+    decoders={"last_ignored_date": parse_epoch_day},
+)
+WIFI_CONFIG_CODEC = register_codec(
+    WiFiConfig,
+    key_order=("id", "ssid", "password", "priority", "status_flags"),
+)
+
+
+def compute_ignored_flags(configs: Iterable[WiFiConfig], today: Optional[int] = None) -> List[bool]:
+    """接続候補から除外されているかを configs と同じ順のリストで返す
+    
+    今日の日付は1回だけ求め、フラグを直接読んで判定します（is_ignored() を1件ずつ
+    呼ぶより速く、フラグの変更（期限切れのリセット）も行いません）。
+    
+    Args:
+        configs: 判定するWi-Fi設定
+        today: 今日のエポック日（省略時は today_epoch_day()）
+    """
+    if today is None:
+        today = today_epoch_day()
+    ignored = []
+    for wifi in configs:
+        flags = wifi.status_flags
+        ignored.append(flags.ignore_until_manual_reset or (
+            flags.ignore_today
+            and (flags.last_ignored_date is None or flags.last_ignored_date >= today)
+        ))
+    return ignored
+
+
+def exclude_ignored(configs: Iterable[WiFiConfig], today: Optional[int] = None) -> List[WiFiConfig]:
+    """除外されていないWi-Fi設定だけを順序を保って返す"""
+    configs = list(configs)
+    return [wifi for wifi, ignored in zip(configs, compute_ignored_flags(configs, today)) if not ignored]
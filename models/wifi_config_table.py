@@ -0,0 +1,322 @@
+import sys
+import uuid
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional, Union
+from models.wifi_config import (
+    WiFiConfig, StatusFlags, EncryptedPassword, parse_epoch_day, today_epoch_day,
+)
+
+
+# フラグ列のビット
+FLAG_IGNORE_TODAY = 0x01
+FLAG_IGNORE_PERMANENTLY = 0x02
+
+_UUID_SIZE = 16
+
+# last_ignored_date 列で「未設定」を表す値
+_NO_DAY = -1
+
+# フラグのバイト値 → いずれかのフラグが立っていれば "1"、なければ "0"
+_ANY_FLAG_TO_CHAR = bytes(0x31 if value else 0x30 for value in range(256))
+
+
+class WiFiConfigTable:
+    """大量のWi-Fi設定を列ごとにまとめて保持するテーブル
+    
+    1件ごとにオブジェクトを持つ代わりに、IDは16バイトのUUIDとして bytearray に、
+    優先順位と last_ignored_date（エポック日）は array('i') に、ステータスフラグは
+    ビットとして array('B') に格納し、SSIDは sys.intern で共有します。UUID形式でないIDだけは辞書で別に保持します。
+    
+    行へのアクセスは WiFiConfigRow（WiFiConfig と同じAPIを持つビュー）で行います。
+    ビューは行番号を参照するため、remove() の後は取り直してください。
+    """
+    
+    def __init__(self, configs: Optional[Iterable[WiFiConfig]] = None):
+        """
+        Args:
+            configs: 初期データ（WiFiConfig または WiFiConfigRow）
+        """
+        self._ids = bytearray()
+        self._odd_ids: Dict[int, str] = {}
+        self._ssids: List[str] = []
+        self._passwords: List[Union[str, EncryptedPassword]] = []
+        self._priorities = array('i')
+        self._flags = array('B')
+        self._last_ignored_days = array('i')
+        self._index: Optional[Dict[str, int]] = None
+        if configs is not None:
+            self.extend(configs)
+    
+    @classmethod
+    def from_dicts(cls, records: Iterable[dict]) -> "WiFiConfigTable":
+        """WiFiConfig.to_dict() 形式の辞書から生成（WiFiConfigを経由しない）"""
+        table = cls()
+        for data in records:
+            flags = data.get("status_flags", {})
+            table._append(
+                data.get("id") or str(uuid.uuid4()),
+                data["ssid"],
+                data["password"],
+                data["priority"],
+                flags.get("ignore_today", False),
+                flags.get("ignore_until_manual_reset", False),
+                parse_epoch_day(flags.get("last_ignored_date")),
+            )
+        return table
+    
+    def append(self, wifi: WiFiConfig):
+        """1件追加する"""
+        flags = wifi.status_flags
+        self._append(
+            wifi.id, wifi.ssid, wifi.password, wifi.priority,
+            flags.ignore_today, flags.ignore_until_manual_reset, flags.last_ignored_date,
+        )
+    
+    def extend(self, configs: Iterable[WiFiConfig]):
+        """複数件追加する"""
+        for wifi in configs:
+            self.append(wifi)
+    
+    def _append(self, wifi_id: str, ssid: str, password, priority: int,
+                ignore_today: bool, ignore_permanently: bool, last_ignored_date: Optional[int]):
+        row = len(self._ssids)
+        self._ids += self._pack_id(row, wifi_id)
+        self._ssids.append(sys.intern(ssid))
+        self._passwords.append(password)
+        self._priorities.append(priority)
+        self._flags.append(
+            (FLAG_IGNORE_TODAY if ignore_today else 0)
+            | (FLAG_IGNORE_PERMANENTLY if ignore_permanently else 0)
+        )
+        self._last_ignored_days.append(_NO_DAY if last_ignored_date is None else last_ignored_date)
+        if self._index is not None:
+            self._index[wifi_id] = row
+    
+    def _pack_id(self, row: int, wifi_id: str) -> bytes:
+        """IDを16バイトに変換する（UUIDの正規形でない場合は辞書に退避）"""
+        try:
+            packed = uuid.UUID(wifi_id)
+        except (ValueError, TypeError, AttributeError):
+            packed = None
+        if packed is not None and str(packed) == wifi_id:
+            self._odd_ids.pop(row, None)
+            return packed.bytes
+        self._odd_ids[row] = wifi_id
+        return bytes(_UUID_SIZE)
+    
+    def get_id(self, row: int) -> str:
+        """行のIDを返す"""
+        odd = self._odd_ids.get(row)
+        if odd is not None:
+            return odd
+        start = row * _UUID_SIZE
+        return str(uuid.UUID(bytes=bytes(self._ids[start:start + _UUID_SIZE])))
+    
+    def set_id(self, row: int, wifi_id: str):
+        old_id = self.get_id(row)
+        start = row * _UUID_SIZE
+        self._ids[start:start + _UUID_SIZE] = self._pack_id(row, wifi_id)
+        if self._index is not None:
+            self._index.pop(old_id, None)
+            self._index[wifi_id] = row
+    
+    def row_by_id(self, wifi_id: str) -> Optional["WiFiConfigRow"]:
+        """IDで行を探す（初回呼び出し時にIDインデックスを構築）"""
+        if self._index is None:
+            self._index = {self.get_id(row): row for row in range(len(self))}
+        row = self._index.get(wifi_id)
+        return WiFiConfigRow(self, row) if row is not None else None
+    
+    def remove(self, wifi_id: str) -> bool:
+        """IDで1件削除する
+        
+        Returns:
+            削除した場合True
+        """
+        found = self.row_by_id(wifi_id)
+        if found is None:
+            return False
+        row = found._row
+        start = row * _UUID_SIZE
+        del self._ids[start:start + _UUID_SIZE]
+        del self._ssids[row]
+        del self._passwords[row]
+        del self._priorities[row]
+        del self._flags[row]
+        del self._last_ignored_days[row]
+        # 後ろの行は番号が1つずつ前にずれる
+        self._odd_ids = {
+            (r - 1 if r > row else r): value
+            for r, value in self._odd_ids.items() if r != row
+        }
+        self._index = None
+        return True
+    
+    def ignored_mask(self, today: Optional[int] = None) -> int:
+        """接続候補から除外されている行のビットマスク（行 i が除外ならビット i）
+        
+        フラグ列と日付列だけを走査するため、行のビューは作成しません。
+        
+        Args:
+            today: 今日のエポック日（省略時は today_epoch_day()）
+        """
+        if not self._flags:
+            return 0
+        if today is None:
+            today = today_epoch_day()
+        flags = self._flags.tobytes()
+        # フラグが1つでも立っている行を "1" とした文字列（行 i が i 文字目）
+        bits = bytearray(flags.translate(_ANY_FLAG_TO_CHAR))
+        # 「今日だけ無視」のみの行は日付が古ければ対象外
+        days = self._last_ignored_days
+        row = flags.find(FLAG_IGNORE_TODAY)
+        while row >= 0:
+            day = days[row]
+            if day != _NO_DAY and day < today:
+                bits[row] = 0x30  # "0"
+            row = flags.find(FLAG_IGNORE_TODAY, row + 1)
+        return int(bits[::-1], 2)
+    
+    def to_configs(self) -> List[WiFiConfig]:
+        """全行を WiFiConfig のリストに変換する"""
+        return [row.to_config() for row in self]
+    
+    def to_dicts(self) -> List[dict]:
+        """全行を WiFiConfig.to_dict() 形式の辞書のリストに変換する"""
+        return [row.to_dict() for row in self]
+    
+    def __len__(self) -> int:
+        return len(self._ssids)
+    
+    def __getitem__(self, row: int) -> "WiFiConfigRow":
+        if row < 0:
+            row += len(self)
+        if not 0 <= row < len(self):
+            raise IndexError("行番号が範囲外です")
+        return WiFiConfigRow(self, row)
+    
+    def __iter__(self) -> Iterator["WiFiConfigRow"]:
+        for row in range(len(self)):
+            yield WiFiConfigRow(self, row)
+
+
+class _RowStatusFlags:
+    """WiFiConfigRow.status_flags のビュー（書き込みはテーブルへ反映）"""
+    __slots__ = ("_table", "_row")
+    
+    def __init__(self, table: WiFiConfigTable, row: int):
+        self._table = table
+        self._row = row
+    
+    def _get_bit(self, bit: int) -> bool:
+        return bool(self._table._flags[self._row] & bit)
+    
+    def _set_bit(self, bit: int, enabled: bool):
+        if enabled:
+            self._table._flags[self._row] |= bit
+        else:
+            self._table._flags[self._row] &= ~bit & 0xFF
+    
+    @property
+    def ignore_today(self) -> bool:
+        return self._get_bit(FLAG_IGNORE_TODAY)
+    
+    @ignore_today.setter
+    def ignore_today(self, value: bool):
+        self._set_bit(FLAG_IGNORE_TODAY, value)
+    
+    @property
+    def ignore_until_manual_reset(self) -> bool:
+        return self._get_bit(FLAG_IGNORE_PERMANENTLY)
+    
+    @ignore_until_manual_reset.setter
+    def ignore_until_manual_reset(self, value: bool):
+        self._set_bit(FLAG_IGNORE_PERMANENTLY, value)
+    
+    @property
+    def last_ignored_date(self) -> Optional[int]:
+        day = self._table._last_ignored_days[self._row]
+        return None if day == _NO_DAY else day
+    
+    @last_ignored_date.setter
+    def last_ignored_date(self, value: Optional[int]):
+        self._table._last_ignored_days[self._row] = _NO_DAY if value is None else value
+    
+    to_dict = StatusFlags.to_dict
+    
+    def __repr__(self):
+        return repr(StatusFlags(**self.to_dict()))
+
+
+class WiFiConfigRow:
+    """WiFiConfigTable の1行のビュー
+    
+    WiFiConfig と同じ属性・メソッド（ssid, password, priority, id, status_flags,
+    to_dict, should_ignore_today など）を持ち、変更はテーブルへ直接反映されます。
+    ダーティトラッキングは行いません。保存する場合は to_config() で WiFiConfig に変換してください。
+    """
+    __slots__ = ("_table", "_row")
+    
+    def __init__(self, table: WiFiConfigTable, row: int):
+        self._table = table
+        self._row = row
+    
+    @property
+    def id(self) -> str:
+        return self._table.get_id(self._row)
+    
+    @id.setter
+    def id(self, value: str):
+        self._table.set_id(self._row, value)
+    
+    @property
+    def ssid(self) -> str:
+        return self._table._ssids[self._row]
+    
+    @ssid.setter
+    def ssid(self, value: str):
+        self._table._ssids[self._row] = sys.intern(value)
+    
+    @property
+    def password(self) -> Union[str, EncryptedPassword]:
+        return self._table._passwords[self._row]
+    
+    @password.setter
+    def password(self, value: Union[str, EncryptedPassword]):
+        self._table._passwords[self._row] = value
+    
+    @property
+    def priority(self) -> int:
+        return self._table._priorities[self._row]
+    
+    @priority.setter
+    def priority(self, value: int):
+        self._table._priorities[self._row] = value
+    
+    @property
+    def status_flags(self) -> _RowStatusFlags:
+        return _RowStatusFlags(self._table, self._row)
+    
+    def to_config(self) -> WiFiConfig:
+        """独立した WiFiConfig に変換する"""
+        return WiFiConfig.from_dict(self.to_dict())
+    
+    # WiFiConfig のメソッドをそのまま使う（属性アクセスのみに依存しているため）
+    to_dict = WiFiConfig.to_dict
+    should_ignore_today = WiFiConfig.should_ignore_today
+    should_ignore_permanently = WiFiConfig.should_ignore_permanently
+    set_ignore_today = WiFiConfig.set_ignore_today
+    set_ignore_permanently = WiFiConfig.set_ignore_permanently
+    is_ignore_today_expired = WiFiConfig.is_ignore_today_expired
+    clear_ignore_today = WiFiConfig.clear_ignore_today
+    is_ignored = WiFiConfig.is_ignored
+    
+    def __eq__(self, other):
+        if isinstance(other, (WiFiConfigRow, WiFiConfig)):
+            return self.to_dict() == other.to_dict()
+        return NotImplemented
+    
+    __hash__ = None
+    
+    def __repr__(self):
+        return repr(self.to_config())
@@ -0,0 +1,204 @@
+import threading
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Optional
+from models.scan_result import ScanResult
+from models.wifi_config import WiFiConfig, today_epoch_day
+from services.wpa_ctrl import EVENT_SCAN_RESULTS
+
+# 判定結果の種類
+ACTION_SUGGEST = "suggest"  # より優先度の高いWi-Fiへの切り替えを提案する
+ACTION_CONNECT = "connect"  # より優先度の高いWi-Fiに接続した
+
+# これより弱い信号のネットワークは候補にしない（dBm）
+DEFAULT_MIN_SIGNAL_DBM = -80.0
+
+
+@dataclass(frozen=True)
+class AutoConnectDecision:
+    """自動接続エンジンの判定結果"""
+    action: str  # ACTION_SUGGEST / ACTION_CONNECT
+    wifi: WiFiConfig  # 接続先の候補
+    scan: ScanResult  # 候補のスキャン結果（最も信号の強いBSS）
+    current_ssid: Optional[str]  # 判定時に接続していたSSID
+    connected: Optional[bool] = None  # ACTION_CONNECT の場合の接続結果
+
+
+class AutoConnectEngine:
+    """スキャン結果と保存済みWi-Fiの優先順位を比べ、より優先度の高いWi-Fiを
+    提案（または接続）するエンジン
+    
+    interval 秒ごとにスキャンし（最近の結果があればそれを使い）、スキャン結果を
+    SSIDで索引して、見えているSSIDごとに保存済みWi-Fiをハッシュ検索します。
+    除外中のWi-Fi（is_ignored()）は候補にせず、候補が現在の接続より優先度が
+    高い場合だけ on_decision に判定結果を渡します。同じ判定は続けて通知しません。
+    
+    スキャン完了のイベント（wpa_supplicant のイベント、または AdaptiveScanScheduler
+    が配信するもの）でもすぐに判定します。定期スキャンを AdaptiveScanScheduler に
+    任せる場合は start(periodic=False) でイベントだけで判定します。
+    UIに依存しないため、モックのWi-Fiマネージャーでも動きます。
+    """
+    
+    def __init__(self, storage_manager, wifi_manager,
+                 on_decision: Optional[Callable[[AutoConnectDecision], None]] = None,
+                 interval: Optional[float] = None, auto_connect: bool = False,
+                 min_signal_dbm: Optional[float] = DEFAULT_MIN_SIGNAL_DBM):
+        """
+        Args:
+            storage_manager: StorageManager
+            wifi_manager: WiFiManager
+            on_decision: 判定結果を受け取るコールバック（エンジンのスレッドで呼ばれる）
+            interval: 判定する間隔（秒）。省略時は user_settings.scan_interval_seconds
+            auto_connect: Trueの場合は提案せずに接続する
+            min_signal_dbm: 候補にする信号強度の下限（Noneの場合は制限しない）
+        """
+        self.storage_manager = storage_manager
+        self.wifi_manager = wifi_manager
+        self.on_decision = on_decision
+        if interval is None:
+            interval = storage_manager.get_user_settings().get("scan_interval_seconds", 300)
+        self.interval = interval
+        self.auto_connect = auto_connect
+        self.min_signal_dbm = min_signal_dbm
+        self.last_decision: Optional[AutoConnectDecision] = None
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._remove_listener: Optional[Callable[[], None]] = None
+    
+    def start(self, periodic: bool = True):
+        """バックグラウンドでの判定を開始する
+        
+        Args:
+            periodic: Falseの場合は自分ではスキャンせず、スキャン完了のイベントだけで判定する
+        """
+        if self._remove_listener is None:
+            self._remove_listener = self.wifi_manager.add_event_listener(
+                lambda event: self._on_scan_results(), [EVENT_SCAN_RESULTS]
+            )
+        if not periodic or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="auto-connect", daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        """判定を停止する"""
+        self._stop_event.set()
+        if self._remove_listener is not None:
+            self._remove_listener()
+            self._remove_listener = None
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+    
+    def _run(self):
+        while True:
+            try:
+                self.check()
+            except Exception as e:
+                print(f"自動接続の判定エラー: {e}")
+            if self._stop_event.wait(self.interval):
+                return
+    
+    def _on_scan_results(self):
+        snapshot = self.wifi_manager.scan_cache.peek()
+        if snapshot is None:
+            return
+        try:
+            self.process(snapshot.results)
+        except Exception as e:
+            print(f"自動接続の判定エラー: {e}")
+    
+    def check(self, force_refresh: bool = False) -> Optional[AutoConnectDecision]:
+        """スキャンして判定する（最近のスキャン結果があればそれを使う）
+        
+        Returns:
+            新しい判定結果（通知するものがない場合はNone）
+        """
+        snapshot = self.wifi_manager.start_scan(force_refresh=force_refresh).result()
+        return self.process(snapshot.results)
+    
+    def process(self, results: Iterable[ScanResult]) -> Optional[AutoConnectDecision]:
+        """スキャン結果から判定し、必要なら接続して on_decision を呼ぶ
+        
+        Returns:
+            新しい判定結果（通知するものがない場合や、前回と同じ判定の場合はNone）
+        """
+        attempt = None
+        with self._lock:
+            current_ssid = self.wifi_manager.get_current_network()
+            decision = self.evaluate(results, current_ssid)
+            previous = self.last_decision
+            self.last_decision = decision
+            if decision is None or (
+                previous is not None
+                and previous.wifi.id == decision.wifi.id
+                and previous.current_ssid == decision.current_ssid
+            ):
+                return None
+            
+            if decision.action == ACTION_CONNECT:
+                # 画面からの接続と同じ経路で、制限時間と「1インターフェースに1つ」の制御を受ける。
+                # 実行中の接続試行（画面からの接続など）は横取りせず、次の判定に回す
+                attempt = self.wifi_manager.connect_async(
+                    decision.wifi.ssid, decision.wifi.password, supersede=False
+                )
+                if attempt is None:
+                    self.last_decision = previous
+                    return None
+        
+        if attempt is not None:
+            # 接続を待つ間はロックを持たない（他のスレッドからの判定を止めない）
+            pending = decision
+            decision = AutoConnectDecision(
+                pending.action, pending.wifi, pending.scan, current_ssid, attempt.result()
+            )
+            with self._lock:
+                if self.last_decision is pending:
+                    self.last_decision = decision
+        
+        if self.on_decision is not None:
+            try:
+                self.on_decision(decision)
+            except Exception as e:
+                print(f"自動接続の通知エラー: {e}")
+        return decision
+    
+    def evaluate(self, results: Iterable[ScanResult], current_ssid: Optional[str],
+                 today: Optional[int] = None) -> Optional[AutoConnectDecision]:
+        """スキャン結果と現在の接続から、切り替え先の候補を求める（副作用なし）
+        
+        スキャン結果の件数に比例した時間で判定します。
+        
+        Args:
+            results: スキャン結果（同じSSIDが複数あれば信号の強いBSSを使う）
+            current_ssid: 接続中のSSID（接続していない場合はNone）
+            today: 今日のエポック日（省略時は today_epoch_day()）
+        
+        Returns:
+            候補が現在の接続より優先度が高い場合の判定結果（それ以外はNone）
+        """
+        if today is None:
+            today = today_epoch_day()
+        min_signal = self.min_signal_dbm
+        visible: Dict[str, ScanResult] = {}
+        for result in results:
+            if not result.ssid:
+                continue
+            if min_signal is not None and (result.signal_dbm is None or result.signal_dbm < min_signal):
+                continue
+            best = visible.get(result.ssid)
+            if best is None or result.is_stronger_than(best):
+                visible[result.ssid] = result
+        
+        candidate = self.storage_manager.best_scanned_network(visible, today)
+        if candidate is None or candidate.ssid == current_ssid:
+            return None
+        if current_ssid is not None:
+            # 同じSSIDが複数保存されている場合は、最も優先度の高いものと比べる
+            current = self.storage_manager.find_wifi_configs_by_ssid(current_ssid)
+            if current and min(wifi.priority for wifi in current) <= candidate.priority:
+                return None
+        
+        action = ACTION_CONNECT if self.auto_connect else ACTION_SUGGEST
+        return AutoConnectDecision(action, candidate, visible[candidate.ssid], current_ssid)
@@ -0,0 +1,158 @@
+import os
+import threading
+import zlib
+from typing import List, Optional
+from services import json_codec
+
+
+def fsync_directory(path: str):
+    """path を含むディレクトリをfsyncし、os.replace による置き換えを確定させる
+    
+    POSIX以外（Windows）ではディレクトリを開けないため何もしません。
+    """
+    if os.name != "posix":
+        return
+    fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def atomic_write_text(path: str, text: str):
+    """一時ファイルに書き込んでから os.replace で置き換える（クラッシュ安全）"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    fsync_directory(path)
+
+
+class ConfigJournal:
+    """config.json に対する追記専用の変更ジャーナル
+    
+    1レコード1行で `<crc32(16進8桁)> <JSON>\\n` の形式で追記します。
+    書き込み途中でクラッシュした末尾のレコード（改行なし・CRC不一致）は
+    replay時に検出して切り捨てます。途中のレコードが壊れている場合は
+    切り捨てずにそのレコードだけを読み飛ばし、corrupt_offsets に記録して報告します。
+    """
+    
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = None
+        # 直近の replay で読み飛ばした、途中の破損レコードの位置（バイト）
+        self.corrupt_offsets: List[int] = []
+    
+    def _encode(self, record: dict) -> bytes:
+        payload = json_codec.dumps_bytes(record)
+        return b"%08x %s\n" % (zlib.crc32(payload), payload)
+    
+    def append(self, record: dict):
+        """レコードを1件追記してfsyncする"""
+        self.append_many([record])
+    
+    def append_many(self, records: List[dict]):
+        """複数レコードをまとめて追記し、1回だけfsyncする"""
+        data = b"".join(self._encode(r) for r in records)
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, 'ab')
+            self._file.write(data)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+    
+    def replay(self) -> List[dict]:
+        """ジャーナルを先頭から読み込み、有効なレコードのリストを返す
+        
+        書き込み途中で壊れた最後のレコードは、その位置でファイルを切り詰めます。
+        それより前の破損レコードは読み飛ばして後続の有効なレコードを残し、
+        位置を corrupt_offsets に記録します。
+        """
+        with self._lock:
+            self.corrupt_offsets = []
+            try:
+                with open(self.path, 'rb') as f:
+                    data = f.read()
+            except FileNotFoundError:
+                return []
+            
+            records = []
+            offset = 0
+            while offset < len(data):
+                end = data.find(b"\n", offset)
+                if end < 0:
+                    # 改行のない末尾は書き込み途中のレコード
+                    break
+                record = self._decode(data[offset:end])
+                if record is None:
+                    if end + 1 == len(data):
+                        # 最後のレコードの破損は書き込み途中のクラッシュとみなす
+                        break
+                    self.corrupt_offsets.append(offset)
+                else:
+                    records.append(record)
+                offset = end + 1
+            
+            if self.corrupt_offsets:
+                print(f"ジャーナルの途中に破損したレコードがあります（{len(self.corrupt_offsets)}件を読み飛ばしました。"
+                      f"位置: {', '.join(map(str, self.corrupt_offsets))}）")
+            if offset < len(data):
+                print(f"ジャーナル末尾の破損を検出しました（{len(data) - offset}バイトを破棄）")
+                self._close()
+                with open(self.path, 'r+b') as f:
+                    f.truncate(offset)
+                    f.flush()
+                    os.fsync(f.fileno())
+            
+            return records
+    
+    def _decode(self, line: bytes) -> Optional[dict]:
+        if len(line) < 10 or line[8:9] != b" ":
+            return None
+        payload = line[9:]
+        try:
+            if int(line[:8], 16) != zlib.crc32(payload):
+                return None
+            return json_codec.loads(payload)
+        except ValueError:
+            return None
+    
+    def size(self) -> int:
+        """ジャーナルのバイト数"""
+        try:
+            return os.path.getsize(self.path)
+        except OSError:
+            return 0
+    
+    def discard_before(self, offset: int):
+        """offset より前のレコードを破棄する（以降に追記された分は残す）
+        
+        スナップショットへ反映済みの範囲を削除するために使用します。
+        """
+        with self._lock:
+            self._close()
+            try:
+                with open(self.path, 'rb') as f:
+                    f.seek(offset)
+                    tail = f.read()
+            except FileNotFoundError:
+                tail = b""
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(tail)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+            fsync_directory(self.path)
+    
+    def close(self):
+        with self._lock:
+            self._close()
+    
+    def _close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
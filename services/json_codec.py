@@ -0,0 +1,42 @@
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # orjson はオプション（Androidビルドなどでは標準ライブラリを使用）
+    orjson = None
+
+
+def dumps(obj: Any, indent: bool = False) -> str:
+    """JSON文字列に変換（orjson があれば使用）
+
+    Args:
+        obj: 変換するオブジェクト
+        indent: Trueの場合、2スペースでインデントする（設定ファイル用）
+    """
+    return dumps_bytes(obj, indent).decode('utf-8')
+
+
+def dumps_bytes(obj: Any, indent: bool = False) -> bytes:
+    """UTF-8のJSONバイト列に変換（orjson があれば使用）"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    if indent:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    """JSON文字列・バイト列を読み込む（orjson があれば使用）
+
+    Raises:
+        ValueError: JSONとして不正な場合
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def backend_name() -> str:
+    """使用しているJSONライブラリの名前"""
+    return "orjson" if orjson is not None else "json"
@@ -0,0 +1,87 @@
+import threading
+import time
+from typing import Callable, List, Optional
+from models.wifi_config import WiFiConfig, today_epoch_day
+
+
+class MidnightRolloverScheduler:
+    """日付が変わったときに期限切れの「今日だけ無視」をまとめて解除するスケジューラ
+    
+    バックグラウンドスレッドでローカル時刻の0時を待ち、日付が変わっていれば
+    StorageManager.expire_ignore_today() で期限切れのフラグを1回のトランザクションで
+    解除してから on_rollover を1回だけ呼び出します。
+    
+    端末のスリープ中はタイマーが進まないことがあるため、待機は check_interval 秒
+    ごとに区切って壁時計の日付を確認します。スリープ明けに0時を過ぎていれば、
+    最初の確認で解除されます。アプリの再開時などに check() を直接呼ぶこともできます。
+    """
+    
+    def __init__(self, storage_manager, on_rollover: Optional[Callable[[List[WiFiConfig]], None]] = None,
+                 check_interval: float = 60.0):
+        """
+        Args:
+            storage_manager: StorageManager
+            on_rollover: フラグを解除したWi-Fiのリストを受け取るコールバック（解除がない場合は呼ばない）
+            check_interval: 日付を確認する最大間隔（秒）
+        """
+        self.storage_manager = storage_manager
+        self.on_rollover = on_rollover
+        self.check_interval = check_interval
+        self._last_day: Optional[int] = None
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def start(self):
+        """起動時点で期限切れのフラグを解除し、バックグラウンドでの監視を開始する"""
+        self.check()
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        """監視を停止する"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+    
+    def check(self) -> List[WiFiConfig]:
+        """日付が変わっていれば期限切れのフラグを解除する
+        
+        Returns:
+            フラグを解除したWi-Fiのリスト
+        """
+        with self._lock:
+            today = today_epoch_day()
+            if today == self._last_day:
+                return []
+            try:
+                expired = self.storage_manager.expire_ignore_today(today)
+            except Exception as e:
+                print(f"無視フラグの解除エラー: {e}")
+                return []
+            self._last_day = today
+        
+        if expired and self.on_rollover is not None:
+            try:
+                self.on_rollover(expired)
+            except Exception as e:
+                print(f"日付変更の通知エラー: {e}")
+        return expired
+    
+    def _seconds_until_midnight(self) -> float:
+        now = time.time()
+        local = time.localtime(now)
+        midnight = time.mktime((local.tm_year, local.tm_mon, local.tm_mday + 1, 0, 0, 0, 0, 0, -1))
+        return max(midnight - now, 0.0)
+    
+    def _run(self):
+        while not self._stop_event.is_set():
+            # 0時ちょうどに確認できるよう、残り時間が短ければそれに合わせて待つ
+            timeout = min(self.check_interval, self._seconds_until_midnight() + 0.5)
+            if self._stop_event.wait(timeout):
+                return
+            self.check()
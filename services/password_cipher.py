@@ -0,0 +1,209 @@
+import base64
+import hashlib
+import hmac
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+from services.config_journal import fsync_directory
+
+try:
+    from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+except ImportError:  # Androidビルドでは cryptography を同梱できない場合がある
+    AESGCM = None
+
+KEY_SIZE = 32
+
+
+def _xor(data: bytes, keystream: bytes) -> bytes:
+    return (int.from_bytes(data, 'big') ^ int.from_bytes(keystream, 'big')).to_bytes(len(data), 'big')
+
+
+class PasswordCipher:
+    """保存用パスワードの認証付き暗号化（AEAD）
+    
+    通常は cryptography の AES-256-GCM を使用します。cryptography を使えない環境
+    （Androidビルドなど）では、標準ライブラリのみで構成した HMAC-SHA256 (CTR) +
+    HMAC-SHA256 タグの Encrypt-then-MAC 方式を使用します（get_password_cipher が警告を表示します）。
+    どちらも改ざんを検出できます。HMAC 方式のトークンは cryptography があっても読み込めます。
+    
+    トークン形式:
+        "gcm1:" + Base64(nonce(12) + 暗号文 + タグ(16))
+        "hmac1:" + Base64(nonce(16) + 暗号文 + タグ(32))
+        プレフィックスなし: 旧形式（Base64のみ）。読み込みのみ対応
+    """
+    
+    GCM_PREFIX = "gcm1:"
+    HMAC_PREFIX = "hmac1:"
+    
+    def __init__(self, key: bytes):
+        """
+        Args:
+            key: 32バイトのマスターキー
+        
+        Raises:
+            ValueError: キーの長さが正しくない場合
+        """
+        if len(key) != KEY_SIZE:
+            raise ValueError(f"暗号化キーは{KEY_SIZE}バイトである必要があります")
+        
+        # 鍵導出はインスタンス生成時に1回だけ行い、以後はコンテキストを使い回す
+        self._aesgcm = AESGCM(key) if AESGCM is not None else None
+        enc_key = hmac.new(key, b"my_connect_wifi/enc", hashlib.sha256).digest()
+        mac_key = hmac.new(key, b"my_connect_wifi/mac", hashlib.sha256).digest()
+        self._enc_hmac = hmac.new(enc_key, digestmod=hashlib.sha256)
+        self._mac_hmac = hmac.new(mac_key, digestmod=hashlib.sha256)
+    
+    @property
+    def algorithm(self) -> str:
+        """新規暗号化に使用する方式名"""
+        return "AES-256-GCM" if self._aesgcm is not None else "HMAC-SHA256-CTR+HMAC"
+    
+    def encrypt(self, password: str) -> str:
+        """パスワードを暗号化してトークン文字列を返す"""
+        data = password.encode('utf-8')
+        if self._aesgcm is not None:
+            nonce = os.urandom(12)
+            sealed = nonce + self._aesgcm.encrypt(nonce, data, self.GCM_PREFIX.encode())
+            return self.GCM_PREFIX + base64.b64encode(sealed).decode('ascii')
+        
+        nonce = os.urandom(16)
+        ciphertext = _xor(data, self._keystream(nonce, len(data)))
+        tag = self._tag(nonce + ciphertext)
+        return self.HMAC_PREFIX + base64.b64encode(nonce + ciphertext + tag).decode('ascii')
+    
+    def decrypt(self, token: str) -> str:
+        """トークンを復号化する
+        
+        Raises:
+            ValueError: 改ざん・破損が検出された場合、または復号に必要なライブラリがない場合
+        """
+        if token.startswith(self.GCM_PREFIX):
+            if self._aesgcm is None:
+                raise ValueError("AES-GCMの復号には cryptography が必要です")
+            sealed = base64.b64decode(token[len(self.GCM_PREFIX):])
+            try:
+                data = self._aesgcm.decrypt(sealed[:12], sealed[12:], self.GCM_PREFIX.encode())
+            except Exception:
+                raise ValueError("パスワードの認証に失敗しました")
+            return data.decode('utf-8')
+        
+        if token.startswith(self.HMAC_PREFIX):
+            sealed = base64.b64decode(token[len(self.HMAC_PREFIX):])
+            if len(sealed) < 48:
+                raise ValueError("パスワードのデータが破損しています")
+            nonce, ciphertext, tag = sealed[:16], sealed[16:-32], sealed[-32:]
+            if not hmac.compare_digest(tag, self._tag(nonce + ciphertext)):
+                raise ValueError("パスワードの認証に失敗しました")
+            data = _xor(ciphertext, self._keystream(nonce, len(ciphertext)))
+            return data.decode('utf-8')
+        
+        # 旧形式（Base64のみ）
+        return base64.b64decode(token.encode()).decode()
+    
+    def encrypt_many(self, passwords: List[str]) -> List[str]:
+        """複数のパスワードを同じ暗号コンテキストでまとめて暗号化"""
+        encrypt = self.encrypt
+        return [encrypt(password) for password in passwords]
+    
+    def decrypt_many(self, tokens: List[str]) -> List[str]:
+        """複数のトークンを同じ暗号コンテキストでまとめて復号化"""
+        decrypt = self.decrypt
+        return [decrypt(token) for token in tokens]
+    
+    def is_legacy(self, token: str) -> bool:
+        """旧形式（暗号化されていないBase64）のトークンか"""
+        return not token.startswith((self.GCM_PREFIX, self.HMAC_PREFIX))
+    
+    def needs_reencryption(self, token: str) -> bool:
+        """現在の方式で暗号化し直すべきトークンか
+        
+        旧形式に加えて、AES-GCM を使える場合の HMAC 方式のトークンが該当します。
+        """
+        if self._aesgcm is not None and token.startswith(self.HMAC_PREFIX):
+            return True
+        return self.is_legacy(token)
+    
+    def _keystream(self, nonce: bytes, length: int) -> bytes:
+        blocks = []
+        for counter in range((length + 31) // 32):
+            h = self._enc_hmac.copy()
+            h.update(nonce + counter.to_bytes(4, 'big'))
+            blocks.append(h.digest())
+        return b"".join(blocks)[:length]
+    
+    def _tag(self, data: bytes) -> bytes:
+        h = self._mac_hmac.copy()
+        h.update(self.HMAC_PREFIX.encode() + data)
+        return h.digest()
+
+
+# 鍵ファイルのパス → PasswordCipher（鍵の読み込み・導出はプロセスごとに1回だけ）
+_cipher_cache: Dict[str, PasswordCipher] = {}
+_cipher_cache_lock = threading.Lock()
+
+
+def _read_key(key_file: str) -> Optional[bytes]:
+    """鍵ファイルを読み込む（存在しない場合はNone）
+    
+    Raises:
+        ValueError: 内容が正しくない場合
+    """
+    try:
+        with open(key_file, 'rb') as f:
+            data = f.read().strip()
+    except FileNotFoundError:
+        return None
+    key = base64.b64decode(data, validate=True)
+    if len(key) != KEY_SIZE:
+        raise ValueError(f"キーの長さが{len(key)}バイトです")
+    return key
+
+
+def load_or_create_key(key_file: str) -> bytes:
+    """鍵ファイルからマスターキーを読み込む。存在しない場合は生成して保存する
+    
+    内容が壊れている（Base64でない・長さが違う）場合は、起動できるように
+    元のファイルを "<key_file>.invalid-<時刻>" に退避して新しいキーを作ります。
+    退避したキーで暗号化されていたパスワードは復号化できないため、再入力が必要です。
+    """
+    try:
+        key = _read_key(key_file)
+    except ValueError as e:
+        backup = f"{key_file}.invalid-{time.time_ns()}"
+        print(f"暗号化キーのファイルが壊れています（{e}）。{backup} に退避して新しいキーを作成します")
+        os.replace(key_file, backup)
+        key = None
+    if key is not None:
+        return key
+    
+    key = os.urandom(KEY_SIZE)
+    tmp_path = f"{key_file}.tmp"
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, 'wb') as f:
+        f.write(base64.b64encode(key))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, key_file)
+    fsync_directory(key_file)
+    return key
+
+
+def get_password_cipher(key_file: str) -> PasswordCipher:
+    """鍵ファイルに対応する PasswordCipher を返す（プロセス内でキャッシュ）
+    
+    cryptography がない場合は警告を表示し、標準ライブラリの HMAC 方式で暗号化します。
+    
+    Args:
+        key_file: 鍵ファイルのパス（encryption.key）
+    """
+    cache_key = os.path.abspath(key_file)
+    with _cipher_cache_lock:
+        cipher = _cipher_cache.get(cache_key)
+        if cipher is None:
+            if AESGCM is None:
+                print("警告: cryptography が見つからないため、標準ライブラリのHMAC方式で暗号化します"
+                      "（pip install -r requirements.txt で AES-256-GCM を使えます）")
+            cipher = PasswordCipher(load_or_create_key(key_file))
+            _cipher_cache[cache_key] = cipher
+        return cipher
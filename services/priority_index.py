@@ -0,0 +1,163 @@
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from models.wifi_config import WiFiConfig
+
+# 新しく追加するWi-Fiの優先順位の間隔（並べ替えで間に入れられる余地を残す）
+PRIORITY_STEP = 1024
+
+
+class PriorityIndex:
+    """優先順位順に並んだWi-Fi設定のインデックス
+    
+    (priority, 登録順) をキーとしたソート済みリストを保持するため、読み込みのたびに
+    全件をソートし直す必要はありません。位置の検索は二分探索で行います。
+    同じ優先順位のWi-Fiは登録順に並びます（従来の安定ソートと同じ順序）。
+    
+    キーはWiFiConfigとは別に保持しているため、WiFiConfig.priority を変更した後は
+    put() で位置を更新してください。
+    
+    WiFiConfig.priority は並べ替え用のキーで、PRIORITY_STEP 間隔で割り当てます。
+    画面に表示する順位（1始まり）は index_of() + 1 を使ってください。
+    """
+    
+    def __init__(self, configs: Iterable[WiFiConfig] = ()):
+        """
+        Args:
+            configs: 初期データ（順不同）
+        """
+        self._seq = 0
+        entries = []
+        for wifi in configs:
+            entries.append(((wifi.priority, self._next_seq()), wifi))
+        entries.sort(key=lambda entry: entry[0])
+        self._keys: List[Tuple[int, int]] = [key for key, _ in entries]
+        self._items: List[WiFiConfig] = [wifi for _, wifi in entries]
+        self._key_by_id: Dict[str, Tuple[int, int]] = {wifi.id: key for key, wifi in entries}
+    
+    def _next_seq(self) -> int:
+        self._seq += 1
+        return self._seq
+    
+    def _position(self, key: Tuple[int, int]) -> int:
+        return bisect_left(self._keys, key)
+    
+    def put(self, wifi: WiFiConfig):
+        """追加する。同じIDが登録済みの場合は置き換えて現在の優先順位の位置へ移す"""
+        old_key = self._key_by_id.get(wifi.id)
+        if old_key is not None:
+            position = self._position(old_key)
+            if old_key[0] == wifi.priority:
+                self._items[position] = wifi
+                return
+            del self._keys[position]
+            del self._items[position]
+            key = (wifi.priority, old_key[1])
+        else:
+            key = (wifi.priority, self._next_seq())
+        position = self._position(key)
+        self._keys.insert(position, key)
+        self._items.insert(position, wifi)
+        self._key_by_id[wifi.id] = key
+    
+    def remove(self, wifi_id: str) -> Optional[WiFiConfig]:
+        """IDで削除する
+        
+        Returns:
+            削除したWiFiConfig（登録されていない場合はNone）
+        """
+        key = self._key_by_id.pop(wifi_id, None)
+        if key is None:
+            return None
+        position = self._position(key)
+        del self._keys[position]
+        return self._items.pop(position)
+    
+    def get(self, wifi_id: str) -> Optional[WiFiConfig]:
+        """IDでWiFiConfigを取得"""
+        key = self._key_by_id.get(wifi_id)
+        if key is None:
+            return None
+        return self._items[self._position(key)]
+    
+    def sort_key(self, wifi_id: str) -> Tuple[int, int]:
+        """優先順位順に並べるためのキー（登録済みのIDのみ）"""
+        return self._key_by_id[wifi_id]
+    
+    def index_of(self, wifi_id: str) -> int:
+        """優先順位順での位置（0始まり）を返す。見つからない場合は -1"""
+        key = self._key_by_id.get(wifi_id)
+        return self._position(key) if key is not None else -1
+    
+    def next_priority(self) -> int:
+        """末尾に追加する場合の優先順位（最大値 + PRIORITY_STEP）"""
+        return self._keys[-1][0] + PRIORITY_STEP if self._keys else PRIORITY_STEP
+    
+    def move(self, wifi_id: str, position: int) -> List[WiFiConfig]:
+        """Wi-Fiを指定した位置へ移動し、優先順位を変更したWiFiConfigを返す
+        
+        移動先の前後の優先順位の中間の値を割り当てるため、通常は移動したWi-Fiだけが
+        変更されます。同じ場所への移動を繰り返して間に空きがなくなった場合に限り、
+        全件を PRIORITY_STEP 間隔に振り直します（変更されたWi-Fiをすべて返します）。
+        
+        Args:
+            wifi_id: 移動するWi-FiのID
+            position: 移動先の位置（0始まり。範囲外は先頭・末尾に丸める）
+        
+        Raises:
+            KeyError: wifi_id が登録されていない場合
+        """
+        if wifi_id not in self._key_by_id:
+            raise KeyError(wifi_id)
+        seq = self._key_by_id[wifi_id][1]
+        wifi = self.remove(wifi_id)
+        position = max(0, min(position, len(self._keys)))
+        
+        changed = []
+        previous = self._keys[position - 1][0] if position > 0 else 0
+        if position < len(self._keys) and self._keys[position][0] - previous < 2:
+            # 間に空きがないので、移動先を空けて全件を振り直す
+            changed = self._respace(position)
+            priority = (position + 1) * PRIORITY_STEP
+        elif position < len(self._keys):
+            priority = (previous + self._keys[position][0]) // 2
+        else:
+            priority = previous + PRIORITY_STEP
+        
+        if wifi.priority != priority:
+            wifi.priority = priority
+            changed.insert(0, wifi)
+        key = (priority, seq)
+        insort(self._keys, key)
+        self._items.insert(self._position(key), wifi)
+        self._key_by_id[wifi_id] = key
+        return changed
+    
+    def _respace(self, gap_at: int) -> List[WiFiConfig]:
+        """全件の優先順位を PRIORITY_STEP 間隔に振り直す（gap_at の位置に1つ分の空きを残す）
+        
+        Returns:
+            優先順位が変わったWiFiConfig
+        """
+        changed = []
+        for i, item in enumerate(self._items):
+            priority = (i + 1 + (i >= gap_at)) * PRIORITY_STEP
+            key = (priority, self._keys[i][1])
+            self._keys[i] = key
+            self._key_by_id[item.id] = key
+            if item.priority != priority:
+                item.priority = priority
+                changed.append(item)
+        return changed
+    
+    def to_list(self) -> List[WiFiConfig]:
+        """優先順位順のリスト（コピー）を返す"""
+        return list(self._items)
+    
+    def __contains__(self, wifi_id: str) -> bool:
+        return wifi_id in self._key_by_id
+    
+    def __len__(self) -> int:
+        return len(self._items)
+    
+    def __iter__(self) -> Iterator[WiFiConfig]:
+        return iter(list(self._items))
@@ -0,0 +1,239 @@
+import asyncio
+import re
+from typing import Dict, Iterable, Iterator, List, Optional, Union
+from models.scan_result import ScanResult
+
+# iw / wpa_cli がSSIDの表示できない文字に使うエスケープ（\xNN と \\ など）
+_ESCAPE_PATTERN = re.compile(rb'\\(x[0-9a-fA-F]{2}|.)', re.DOTALL)
+_ESCAPED_CHARS = {b"n": b"\n", b"r": b"\r", b"t": b"\t", b"e": b"\x1b"}
+
+# iw の認証方式 → wpa_supplicant のフラグでの表記
+_AUTH_SUITE_NAMES = {
+    "IEEE 802.1X": "EAP",
+    "PSK": "PSK",
+    "SAE": "SAE",
+    "FT/IEEE 802.1X": "FT/EAP",
+    "FT/PSK": "FT/PSK",
+    "FT/SAE": "FT/SAE",
+    "IEEE 802.1X/SHA-256": "EAP-SHA256",
+    "PSK/SHA-256": "PSK-SHA256",
+    "OWE": "OWE",
+}
+_AUTH_SUITE_PATTERN = re.compile("|".join(
+    re.escape(name) for name in sorted(_AUTH_SUITE_NAMES, key=len, reverse=True)
+))
+
+
+def unescape_ssid(text: str) -> str:
+    """iw / wpa_cli の出力でエスケープされたSSIDを元に戻す
+    
+    NUL文字だけのSSID（ステルスのアクセスポイントが長さだけを示すもの）は空文字にします。
+    """
+    if "\\" not in text:
+        return text
+    
+    def replace(match):
+        escaped = match.group(1)
+        if len(escaped) == 3:
+            return bytes((int(escaped[1:], 16),))
+        return _ESCAPED_CHARS.get(escaped, escaped)
+    
+    # \xNN はUTF-8のバイト列の1バイトなので、バイト列のまま戻してからデコードする
+    ssid = _ESCAPE_PATTERN.sub(replace, text.encode("utf-8")).decode("utf-8", errors="replace")
+    return ssid if ssid.strip("\x00") else ""
+
+
+class IwScanParser:
+    """`iw dev wlan0 scan` の出力を1行ずつ解析するパーサー
+    
+    feed() に行を渡すと、BSSの区切りに達したところでその前のBSSの
+    ScanResult を返します。最後のBSSは close() で取り出します。
+    """
+    
+    def __init__(self):
+        self._bssid: Optional[str] = None
+        self._reset()
+    
+    def _reset(self):
+        self._ssid = ""
+        self._freq: Optional[int] = None
+        self._signal: Optional[float] = None
+        self._ess = False
+        self._privacy = False
+        # [プロトコル, 認証方式, 暗号方式] のリスト（RSN / WPA の情報要素ごと）
+        self._security: List[List[str]] = []
+    
+    def feed(self, line: str) -> Optional[ScanResult]:
+        """1行を解析し、BSSが1つ完成していれば返す"""
+        if line.startswith("BSS "):
+            result = self.close()
+            # "BSS aa:bb:cc:dd:ee:ff(on wlan0) -- associated"
+            self._bssid = line[4:].split("(", 1)[0].split(None, 1)[0]
+            return result
+        if self._bssid is None:
+            return None
+        
+        if line.startswith("\t\t"):
+            # 情報要素の詳細行は、RSN / WPA の認証方式と暗号方式だけを読む
+            if self._security:
+                key, sep, value = line.strip().partition(":")
+                if key == "* Authentication suites":
+                    self._security[-1][1] = "+".join(
+                        _AUTH_SUITE_NAMES[name] for name in _AUTH_SUITE_PATTERN.findall(value)
+                    )
+                elif key == "* Pairwise ciphers":
+                    self._security[-1][2] = "+".join(value.split())
+            return None
+        
+        key, sep, value = line.strip().partition(":")
+        if not sep:
+            return None
+        if key == "SSID":
+            self._ssid = unescape_ssid(value[1:] if value.startswith(" ") else value)
+        elif key == "signal":
+            self._signal = float(value.split(None, 1)[0])
+        elif key == "freq":
+            self._freq = int(float(value))
+        elif key == "capability":
+            self._ess = "ESS" in value
+            self._privacy = "Privacy" in value
+        elif key == "RSN":
+            self._security.append(["WPA2", "", ""])
+        elif key == "WPA":
+            self._security.append(["WPA", "", ""])
+        return None
+    
+    def close(self) -> Optional[ScanResult]:
+        """解析中のBSSがあれば返す（出力の終わりで呼ぶ）"""
+        if self._bssid is None:
+            return None
+        flags = ["-".join(part for part in entry if part) for entry in self._security]
+        if not flags and self._privacy:
+            flags.append("WEP")
+        if self._ess:
+            flags.append("ESS")
+        result = ScanResult(self._ssid, self._bssid, self._freq, self._signal, tuple(flags))
+        self._bssid = None
+        self._reset()
+        return result
+
+
+class WpaCliScanParser:
+    """`wpa_cli scan_results` の出力を1行ずつ解析するパーサー
+    
+    各行は「bssid, 周波数, 信号強度, フラグ, SSID」のタブ区切りです。
+    ヘッダーや "Selected interface" などの行は読み飛ばします。
+    """
+    
+    def feed(self, line: str) -> Optional[ScanResult]:
+        """1行を解析し、BSSの行であれば返す"""
+        line = line.rstrip("\r\n")
+        parts = line.split("\t", 4)
+        if len(parts) < 4:
+            # タブが空白に置き換えられている出力（SSIDの空白は区別できない）
+            parts = line.split(None, 4)
+        if len(parts) < 4 or len(parts[0]) != 17 or parts[0].count(":") != 5:
+            return None
+        try:
+            freq = int(parts[1])
+            signal = float(parts[2])
+        except ValueError:
+            return None
+        flags = parts[3]
+        ssid = unescape_ssid(parts[4]) if len(parts) > 4 else ""
+        return ScanResult(
+            ssid,
+            parts[0],
+            freq,
+            signal,
+            tuple(flags[1:-1].split("][")) if flags.startswith("[") else (),
+        )
+    
+    def close(self) -> Optional[ScanResult]:
+        """行単位で完結するため、出力の終わりで返すものはない"""
+        return None
+
+
+ScanParser = Union[IwScanParser, WpaCliScanParser]
+
+
+class StrongestBySsid:
+    """SSIDごとに最も信号の強いBSSだけを残すコレクション
+    
+    SSIDをキーにした辞書で管理するため、1件の追加は O(1) です。
+    SSIDが空（ステルス）のBSSは追加しません。
+    """
+    
+    def __init__(self, results: Iterable[ScanResult] = ()):
+        self._best: Dict[str, ScanResult] = {}
+        self.extend(results)
+    
+    def add(self, result: ScanResult):
+        """追加する（同じSSIDのより強いBSSがあれば何もしない）"""
+        ssid = result.ssid
+        if not ssid:
+            return
+        best = self._best.get(ssid)
+        if best is None or result.is_stronger_than(best):
+            self._best[ssid] = result
+    
+    def extend(self, results: Iterable[ScanResult]):
+        """まとめて追加する"""
+        for result in results:
+            self.add(result)
+    
+    def results(self) -> List[ScanResult]:
+        """信号の強い順のリストを返す（同じ強さなら見つかった順）"""
+        return sorted(
+            self._best.values(),
+            key=lambda r: -r.signal_dbm if r.signal_dbm is not None else float("inf"),
+        )
+    
+    def __len__(self) -> int:
+        return len(self._best)
+
+
+def iter_scan_results(lines: Iterable[str], parser: ScanParser) -> Iterator[ScanResult]:
+    """行を順にパーサーに渡し、完成した ScanResult を返すジェネレーター"""
+    feed = parser.feed
+    for line in lines:
+        result = feed(line)
+        if result is not None:
+            yield result
+    result = parser.close()
+    if result is not None:
+        yield result
+
+
+def parse_iw_scan(lines: Iterable[str]) -> Iterator[ScanResult]:
+    """`iw dev wlan0 scan` の出力（行のイテラブル）を解析する"""
+    return iter_scan_results(lines, IwScanParser())
+
+
+def parse_wpa_cli_scan_results(lines: Iterable[str]) -> Iterator[ScanResult]:
+    """`wpa_cli scan_results` の出力（行のイテラブル）を解析する"""
+    return iter_scan_results(lines, WpaCliScanParser())
+
+
+async def read_scan_results(stream: asyncio.StreamReader, parser: ScanParser) -> List[ScanResult]:
+    """サブプロセスの出力を少しずつ読みながら解析する
+    
+    出力全体をメモリに溜めずに1行ずつパーサーに渡し、SSIDごとに
+    最も信号の強いBSSを残します。
+    
+    Returns:
+        信号の強い順の ScanResult のリスト
+    """
+    collected = StrongestBySsid()
+    feed = parser.feed
+    while True:
+        line = await stream.readline()
+        if not line:
+            break
+        result = feed(line.decode("utf-8", errors="replace"))
+        if result is not None:
+            collected.add(result)
+    result = parser.close()
+    if result is not None:
+        collected.add(result)
+    return collected.results()
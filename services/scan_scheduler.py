@@ -0,0 +1,183 @@
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional
+from models.scan_result import ScanResult
+from services.wpa_ctrl import EVENT_DISCONNECTED, EVENT_SCAN_RESULTS, WpaEvent
+
+# 信号強度がこれ以上変わったら「変化あり」とみなす（dB）
+DEFAULT_SIGNAL_CHANGE_DB = 6.0
+
+# メトリクスを集計する期間（秒）
+_METRICS_WINDOW = 3600.0
+
+
+def scan_changed(previous: Optional[List[ScanResult]], current: List[ScanResult],
+                 signal_change_db: float = DEFAULT_SIGNAL_CHANGE_DB) -> bool:
+    """2回のスキャン結果で、見えるSSIDか信号強度が変わったか
+    
+    Args:
+        previous: 前回の結果（初回はNone）
+        current: 今回の結果
+        signal_change_db: 変化とみなす信号強度の差（dB）
+    """
+    if previous is None:
+        return True
+    before: Dict[str, Optional[float]] = {r.ssid: r.signal_dbm for r in previous}
+    if len(before) != len(current):
+        return True
+    for result in current:
+        if result.ssid not in before:
+            return True
+        old = before[result.ssid]
+        new = result.signal_dbm
+        if (old is None) != (new is None):
+            return True
+        if old is not None and abs(new - old) >= signal_change_db:
+            return True
+    return False
+
+
+class AdaptiveScanScheduler:
+    """周囲の変化に合わせて間隔を変えながら定期的にスキャンするスケジューラ
+    
+    最初は base_interval 秒の間隔で、見えるSSIDや信号強度が変わった場合や
+    Wi-Fiに接続していない場合は min_interval 秒の短い間隔でスキャンし、
+    結果が変わらない間は間隔を max_interval 秒まで倍々に延ばします。OSのスキャン制限に掛からないよう、
+    前回のスキャン（アプリの他の場所で行ったものを含む）から min_spacing 秒
+    経っていない場合はスキャンせず、その結果を使います。
+    
+    WiFiManager が wpa_supplicant のイベントを監視していない場合は、
+    スキャンのたびに EVENT_SCAN_RESULTS を配信します。
+    """
+    
+    def __init__(self, wifi_manager, base_interval: float = 300.0, min_interval: float = 30.0,
+                 max_interval: float = 1800.0, min_spacing: float = 30.0,
+                 signal_change_db: float = DEFAULT_SIGNAL_CHANGE_DB):
+        """
+        Args:
+            wifi_manager: WiFiManager
+            base_interval: 最初のスキャン間隔（秒）。通常は user_settings.scan_interval_seconds
+            min_interval: 変化があるとき・未接続のときの間隔（秒）
+            max_interval: 変化がないときに延ばす間隔の上限（秒）
+            min_spacing: スキャンとスキャンの最小の間隔（秒）
+            signal_change_db: 変化とみなす信号強度の差（dB）
+        
+        Raises:
+            ValueError: 間隔の指定が正しくない場合
+        """
+        if not 0 < min_interval <= max_interval:
+            raise ValueError("min_interval は 0 より大きく max_interval 以下にしてください")
+        self.wifi_manager = wifi_manager
+        self.min_interval = max(min_interval, min_spacing)
+        self.max_interval = max(max_interval, self.min_interval)
+        self.min_spacing = min_spacing
+        self.signal_change_db = signal_change_db
+        self.base_interval = min(max(base_interval, self.min_interval), self.max_interval)
+        self.interval = self.base_interval
+        self.scans_performed = 0
+        self.scans_skipped = 0
+        self._performed_at: Deque[float] = deque()
+        self._skipped_at: Deque[float] = deque()
+        self._last_results: Optional[List[ScanResult]] = None
+        self._lock = threading.Lock()
+        self._wake_event = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._remove_listener: Optional[Callable[[], None]] = None
+    
+    def start(self):
+        """バックグラウンドでのスキャンを開始する（最初のスキャンはすぐに行う）"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        # 切断されたらすぐにスキャンして接続先を探す
+        self._remove_listener = self.wifi_manager.add_event_listener(
+            lambda event: self.trigger(), [EVENT_DISCONNECTED]
+        )
+        self._thread = threading.Thread(target=self._run, name="adaptive-scan", daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        """スキャンを停止する"""
+        self._stop_event.set()
+        self._wake_event.set()
+        if self._remove_listener is not None:
+            self._remove_listener()
+            self._remove_listener = None
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+    
+    def trigger(self):
+        """次のスキャンを前倒しする（min_spacing は守る）"""
+        with self._lock:
+            self.interval = self.min_interval
+        self._wake_event.set()
+    
+    def _run(self):
+        while not self._stop_event.is_set():
+            # スキャンの前に消しておき、スキャン中の trigger() も次の待機で拾う
+            self._wake_event.clear()
+            try:
+                self.tick()
+            except Exception as e:
+                print(f"定期スキャンのエラー: {e}")
+            self._wake_event.wait(self.interval)
+    
+    def tick(self) -> bool:
+        """1回分のスキャンを行い、次の間隔を決める
+        
+        Returns:
+            スキャンした場合True（min_spacing 以内の結果を使った場合はFalse）
+        """
+        snapshot = self.wifi_manager.scan_cache.peek()
+        skipped = snapshot is not None and snapshot.age < self.min_spacing
+        if not skipped:
+            snapshot = self.wifi_manager.start_scan(force_refresh=True).result()
+        connected = self.wifi_manager.get_current_network() is not None
+        
+        with self._lock:
+            now = time.monotonic()
+            if skipped:
+                self.scans_skipped += 1
+                self._skipped_at.append(now)
+            else:
+                self.scans_performed += 1
+                self._performed_at.append(now)
+            previous = self._last_results
+            self._last_results = snapshot.results
+            if not connected or (previous is not None and scan_changed(
+                    previous, snapshot.results, self.signal_change_db)):
+                self.interval = self.min_interval
+            elif previous is None:
+                # 比べる結果がない最初のスキャンの後は基準の間隔
+                self.interval = self.base_interval
+            else:
+                self.interval = min(self.interval * 2, self.max_interval)
+        
+        if not skipped and self.wifi_manager.event_source != "wpa_ctrl":
+            # wpa_supplicant のイベントが届かない環境では、代わりにスキャン完了を知らせる
+            self.wifi_manager.event_dispatcher.publish(WpaEvent(EVENT_SCAN_RESULTS))
+        return not skipped
+    
+    def metrics(self) -> dict:
+        """スキャンの実行状況を返す（表示・診断用）
+        
+        Returns:
+            scans_performed / scans_skipped（起動からの合計）、
+            scans_performed_per_hour / scans_skipped_per_hour（直近1時間の回数）、
+            interval（現在のスキャン間隔）を含む辞書
+        """
+        with self._lock:
+            cutoff = time.monotonic() - _METRICS_WINDOW
+            for timestamps in (self._performed_at, self._skipped_at):
+                while timestamps and timestamps[0] < cutoff:
+                    timestamps.popleft()
+            return {
+                "scans_performed": self.scans_performed,
+                "scans_skipped": self.scans_skipped,
+                "scans_performed_per_hour": len(self._performed_at),
+                "scans_skipped_per_hour": len(self._skipped_at),
+                "interval": self.interval,
+            }
@@ -0,0 +1,317 @@
+"""WiFiManager の負荷試験用のシミュレーション
+
+実機がなくても、大量のネットワーク・遅いスキャン・失敗する接続などの状況で
+UIや各エンジンの動作を確認できるよう、スキャンと接続を模擬します。
+    
+    # 300件のネットワーク、スキャンに1〜3秒、10%の確率でスキャン失敗
+    MY_CONNECT_WIFI_SIMULATOR="synthetic:networks=300,scan_latency=1,scan_jitter=2,scan_failure_rate=0.1" python main.py
+    
+    # 記録したスキャン結果を再生
+    MY_CONNECT_WIFI_SIMULATOR="replay:path=trace.jsonl" python main.py
+"""
+import asyncio
+import inspect
+import os
+import random
+import threading
+import time
+from typing import Callable, List, Optional, Union
+from models.scan_result import ScanResult
+from services import json_codec
+from services.scan_parser import StrongestBySsid
+from services.wifi_connect import CONNECT_ASSOCIATING, CONNECT_AUTHENTICATING, CONNECT_OBTAINING_IP
+
+# シミュレーションを選ぶ環境変数（値は create_simulator() の spec）
+SIMULATOR_ENV = "MY_CONNECT_WIFI_SIMULATOR"
+
+# タイムアウトを模擬するときにスキャンを止めておく時間（秒）
+_HANG_SECONDS = 3600.0
+
+
+class SimulatedWiFi:
+    """スキャンと接続のシミュレーションの基底クラス
+    
+    遅延・タイムアウト・失敗の注入と、接続状態の管理を行います。
+    サブクラスは _next_results() でスキャン結果を返します。
+    """
+    
+    kind = "simulated"
+    
+    def __init__(self, scan_latency: float = 0.0, scan_jitter: float = 0.0,
+                 scan_timeout_rate: float = 0.0, scan_failure_rate: float = 0.0,
+                 connect_latency: float = 0.0, connect_failure_rate: float = 0.0,
+                 seed: Optional[int] = None):
+        """
+        Args:
+            scan_latency: スキャンにかかる時間（秒）
+            scan_jitter: スキャン時間に加える揺らぎの最大値（秒）
+            scan_timeout_rate: スキャンが終わらなくなる確率（呼び出し元の制限時間で打ち切られる）
+            scan_failure_rate: スキャンが失敗する確率
+            connect_latency: 接続にかかる時間（秒）
+            connect_failure_rate: 接続が失敗する確率
+            seed: 乱数のシード（同じ値なら同じ結果を再現する）
+        """
+        self.scan_latency = scan_latency
+        self.scan_jitter = scan_jitter
+        self.scan_timeout_rate = scan_timeout_rate
+        self.scan_failure_rate = scan_failure_rate
+        self.connect_latency = connect_latency
+        self.connect_failure_rate = connect_failure_rate
+        self.scan_count = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._current: Optional[str] = None
+        self._visible: frozenset = frozenset()
+    
+    def _next_results(self) -> List[ScanResult]:
+        raise NotImplementedError
+    
+    async def scan_async(self) -> List[ScanResult]:
+        """スキャンを模擬する（待機中もイベントループを止めない）
+        
+        Raises:
+            RuntimeError: 失敗を注入した場合
+        """
+        with self._lock:
+            rng = self._rng
+            latency = self.scan_latency + rng.uniform(0.0, self.scan_jitter)
+            hang = rng.random() < self.scan_timeout_rate
+            fail = rng.random() < self.scan_failure_rate
+        await asyncio.sleep(_HANG_SECONDS if hang else latency)
+        if fail:
+            raise RuntimeError("シミュレーション: スキャンに失敗しました")
+        with self._lock:
+            self.scan_count += 1
+            results = self._next_results()
+            self._visible = frozenset(result.ssid for result in results)
+            if self._current is not None and self._current not in self._visible:
+                # 接続中のネットワークが見えなくなったら切断
+                self._current = None
+        return results
+    
+    def connect(self, ssid: str, password: str) -> bool:
+        """接続を模擬する（直前のスキャンで見えていないネットワークには接続できない）"""
+        with self._lock:
+            fail = self._rng.random() < self.connect_failure_rate
+        time.sleep(self.connect_latency)
+        with self._lock:
+            if fail or ssid not in self._visible:
+                return False
+            self._current = ssid
+            return True
+    
+    async def connect_async(self, ssid: str, password: str, report: Callable[[str], None]) -> bool:
+        """接続を模擬し、段階ごとに進行状態を報告する（connect_latency を3段階に分ける）"""
+        with self._lock:
+            fail = self._rng.random() < self.connect_failure_rate
+        for state in (CONNECT_ASSOCIATING, CONNECT_AUTHENTICATING, CONNECT_OBTAINING_IP):
+            report(state)
+            await asyncio.sleep(self.connect_latency / 3)
+            if fail and state == CONNECT_AUTHENTICATING:
+                return False
+        with self._lock:
+            if ssid not in self._visible:
+                return False
+            self._current = ssid
+            return True
+    
+    def current_network(self) -> Optional[str]:
+        """接続中のSSID（接続していない場合はNone）"""
+        with self._lock:
+            return self._current
+
+
+class SyntheticWiFi(SimulatedWiFi):
+    """N件のネットワークを生成し、スキャンのたびに信号強度と見え方を変えるシミュレーション"""
+    
+    kind = "synthetic"
+    
+    def __init__(self, networks: int = 300, churn_db: float = 3.0, visibility_churn: float = 0.02,
+                 ssid_prefix: str = "SimNet", **kwargs):
+        """
+        Args:
+            networks: ネットワークの数
+            churn_db: スキャンごとの信号強度の変化の標準偏差（dB）
+            visibility_churn: スキャンごとに各ネットワークの見える・見えないが入れ替わる確率
+            ssid_prefix: SSIDの接頭辞（"SimNet-0001" など）
+            **kwargs: SimulatedWiFi の引数（遅延・失敗の注入）
+        """
+        super().__init__(**kwargs)
+        self.networks = networks
+        self.churn_db = churn_db
+        self.visibility_churn = visibility_churn
+        rng = self._rng
+        self._bss = [
+            [
+                f"{ssid_prefix}-{i:04d}",
+                ":".join(f"{b:02x}" for b in (0x02, 0, *(i + 1).to_bytes(4, "big"))),
+                rng.choice((2412, 2437, 2462, 5180, 5500, 5745)),
+                rng.uniform(-90.0, -35.0),  # 現在の信号強度
+                True,  # 見えているか
+                ("ESS",) if i % 10 == 0 else ("WPA2-PSK-CCMP", "ESS"),
+            ]
+            for i in range(networks)
+        ]
+    
+    def _next_results(self) -> List[ScanResult]:
+        rng = self._rng
+        churn_db = self.churn_db
+        visibility_churn = self.visibility_churn
+        collected = StrongestBySsid()
+        for bss in self._bss:
+            bss[3] = min(max(bss[3] + rng.gauss(0.0, churn_db), -95.0), -30.0)
+            if rng.random() < visibility_churn:
+                bss[4] = not bss[4]
+            if bss[4]:
+                collected.add(ScanResult(bss[0], bss[1], bss[2], float(round(bss[3])), bss[5]))
+        return collected.results()
+
+
+class ReplayWiFi(SimulatedWiFi):
+    """記録したスキャン結果（append_scan_trace() の形式）を順に返すシミュレーション
+    
+    トレースファイルはJSON Linesで、1行が1回分のスキャン結果です。
+    行に "latency" があれば、その行のスキャン時間として使います。
+    """
+    
+    kind = "replay"
+    
+    def __init__(self, path: str, loop: bool = True, **kwargs):
+        """
+        Args:
+            path: トレースファイルのパス
+            loop: Trueの場合は最後まで再生したら最初に戻る（Falseの場合は最後の結果を返し続ける）
+            **kwargs: SimulatedWiFi の引数（遅延・失敗の注入）
+        
+        Raises:
+            OSError: ファイルを読めない場合
+            ValueError: トレースが空、または形式が正しくない場合
+        """
+        super().__init__(**kwargs)
+        self.path = path
+        self.loop = loop
+        self._frames: List[List[ScanResult]] = []
+        self._latencies: List[Optional[float]] = []
+        with open(path, "r", encoding="utf-8") as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json_codec.loads(line)
+                    self._frames.append([
+                        ScanResult(
+                            r["ssid"], r["bssid"], r.get("freq"), r.get("signal_dbm"), tuple(r.get("flags", ())),
+                        )
+                        for r in record["results"]
+                    ])
+                except (KeyError, TypeError, ValueError) as e:
+                    raise ValueError(f"{path}:{line_number}: スキャン結果の形式が正しくありません: {e}")
+                self._latencies.append(record.get("latency"))
+        if not self._frames:
+            raise ValueError(f"{path}: スキャン結果がありません")
+        self._position = 0
+    
+    def _frame_index(self) -> int:
+        position = self._position
+        if position >= len(self._frames):
+            position = 0 if self.loop else len(self._frames) - 1
+        return position
+    
+    async def scan_async(self) -> List[ScanResult]:
+        latency = self._latencies[self._frame_index()]
+        if latency is not None:
+            await asyncio.sleep(latency)
+        return await super().scan_async()
+    
+    def _next_results(self) -> List[ScanResult]:
+        position = self._frame_index()
+        self._position = position + 1
+        return list(self._frames[position])
+
+
+def append_scan_trace(path: str, results: List[ScanResult], latency: Optional[float] = None):
+    """スキャン結果をトレースファイルに1行追記する（ReplayWiFi で再生できる形式）
+    
+    Args:
+        path: トレースファイルのパス
+        results: スキャン結果
+        latency: そのスキャンにかかった時間（秒）
+    """
+    record = {
+        "results": [
+            {
+                "ssid": r.ssid,
+                "bssid": r.bssid,
+                "freq": r.freq,
+                "signal_dbm": r.signal_dbm,
+                "flags": list(r.flags),
+            }
+            for r in results
+        ],
+    }
+    if latency is not None:
+        record["latency"] = latency
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json_codec.dumps(record) + "\n")
+
+
+_SIMULATORS = {
+    SyntheticWiFi.kind: SyntheticWiFi,
+    ReplayWiFi.kind: ReplayWiFi,
+}
+
+
+def _option_types(cls) -> dict:
+    types = {}
+    for klass in reversed(cls.__mro__):
+        init = klass.__dict__.get("__init__")
+        if init is None:
+            continue
+        for name, parameter in inspect.signature(init).parameters.items():
+            if parameter.default is not inspect.Parameter.empty:
+                types[name] = type(parameter.default) if parameter.default is not None else int
+            elif name not in ("self", "kwargs"):
+                types[name] = str
+    return types
+
+
+def _parse_option(value: str, option_type: type) -> Union[str, int, float, bool]:
+    if option_type is bool:
+        if value.lower() in ("1", "true", "yes", "on"):
+            return True
+        if value.lower() in ("0", "false", "no", "off"):
+            return False
+        raise ValueError(f"真偽値ではありません: {value}")
+    return option_type(value)
+
+
+def create_simulator(spec: str) -> SimulatedWiFi:
+    """"種類:キー=値,キー=値" 形式の指定からシミュレーションを作る
+    
+    Example:
+        create_simulator("synthetic:networks=300,scan_latency=2,connect_failure_rate=0.3")
+        create_simulator("replay:path=trace.jsonl,loop=false")
+    
+    Raises:
+        ValueError: 種類やオプションが正しくない場合
+    """
+    kind, _, options = spec.strip().partition(":")
+    cls = _SIMULATORS.get(kind)
+    if cls is None:
+        raise ValueError(f"不明なシミュレーションです: {kind}（{', '.join(_SIMULATORS)} のいずれか）")
+    types = _option_types(cls)
+    kwargs = {}
+    for option in filter(None, (o.strip() for o in options.split(","))):
+        key, sep, value = option.partition("=")
+        if not sep or key not in types:
+            raise ValueError(f"{kind} のオプションが正しくありません: {option}")
+        kwargs[key] = _parse_option(value, types[key])
+    return cls(**kwargs)
+
+
+def simulator_from_env() -> Optional[SimulatedWiFi]:
+    """環境変数 MY_CONNECT_WIFI_SIMULATOR が設定されていればシミュレーションを作る"""
+    spec = os.environ.get(SIMULATOR_ENV)
+    if not spec:
+        return None
+    return create_simulator(spec)
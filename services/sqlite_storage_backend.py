@@ -0,0 +1,166 @@
+import os
+import sqlite3
+import threading
+from typing import Dict, List, Optional
+from models.wifi_config import parse_epoch_day
+from services import json_codec
+from services.config_journal import fsync_directory
+from services.storage_backend import StorageBackend, JsonStorageBackend, default_config
+
+
+class SQLiteStorageBackend(StorageBackend):
+    """SQLite（WALモード）に保存するバックエンド
+    
+    Wi-Fi設定は1行1レコードで保存し、id（主キー）と priority にインデックスを
+    張るため、1件の更新や優先順位順の読み込みで他の行を読み書きすることはありません。
+    IDやSSIDでの検索は StorageManager がメモリ上の WiFiRepository で行います。
+    user_settings / license_info などのセクションは settings テーブルにJSONとして保存します。
+    """
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS wifi_configs (
+            id TEXT PRIMARY KEY,
+            ssid TEXT NOT NULL,
+            password TEXT NOT NULL,
+            priority INTEGER NOT NULL,
+            ignore_today INTEGER NOT NULL DEFAULT 0,
+            ignore_until_manual_reset INTEGER NOT NULL DEFAULT 0,
+            last_ignored_date INTEGER
+        );
+        CREATE INDEX IF NOT EXISTS idx_wifi_configs_priority ON wifi_configs (priority);
+        CREATE TABLE IF NOT EXISTS settings (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        );
+    """
+    
+    COLUMNS = "id, ssid, password, priority, ignore_today, ignore_until_manual_reset, last_ignored_date"
+    
+    def __init__(self, db_file: str):
+        self.db_file = db_file
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(db_file, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self.SCHEMA)
+    
+    def signature(self) -> int:
+        """他の接続（別プロセス）がコミットすると変わる PRAGMA data_version の値"""
+        with self._lock:
+            return self._conn.execute("PRAGMA data_version").fetchone()[0]
+    
+    @staticmethod
+    def _row_to_record(row) -> dict:
+        return {
+            "id": row[0],
+            "ssid": row[1],
+            "password": row[2],
+            "priority": row[3],
+            "status_flags": {
+                "ignore_today": bool(row[4]),
+                "ignore_until_manual_reset": bool(row[5]),
+                # 旧スキーマ（TEXT列）では数値も文字列で返るため変換する
+                "last_ignored_date": parse_epoch_day(row[6]),
+            },
+        }
+    
+    @staticmethod
+    def _record_to_row(record: dict) -> tuple:
+        flags = record.get("status_flags", {})
+        return (
+            record["id"],
+            record["ssid"],
+            record["password"],
+            record["priority"],
+            int(bool(flags.get("ignore_today", False))),
+            int(bool(flags.get("ignore_until_manual_reset", False))),
+            flags.get("last_ignored_date"),
+        )
+    
+    def load(self) -> dict:
+        with self._lock:
+            config = default_config()
+            for key, value in self._conn.execute("SELECT key, value FROM settings"):
+                config[key] = json_codec.loads(value)
+            # 優先順位順に読み込む（priorityインデックスを使用）
+            config["wifi_configs"] = [
+                self._row_to_record(row)
+                for row in self._conn.execute(f"SELECT {self.COLUMNS} FROM wifi_configs ORDER BY priority")
+            ]
+            return config
+    
+    def write(self, puts: List[dict], deletes: List[str], sections: Dict[str, object]):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                if puts:
+                    self._conn.executemany(
+                        f"INSERT OR REPLACE INTO wifi_configs ({self.COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        [self._record_to_row(record) for record in puts],
+                    )
+                if deletes:
+                    self._conn.executemany(
+                        "DELETE FROM wifi_configs WHERE id = ?",
+                        [(wifi_id,) for wifi_id in deletes],
+                    )
+                if sections:
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)",
+                        [(key, json_codec.dumps(value)) for key, value in sections.items()],
+                    )
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+    
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def migrate_json_to_sqlite(config_file: str, db_file: str, journal_file: Optional[str] = None) -> int:
+    """既存の config.json（とジャーナル）をSQLiteデータベースへ移行する
+    
+    一時ファイル（`<db_file>.tmp`）に1トランザクションで書き込み、コミットして
+    閉じた後で db_file へリネームします。途中で失敗しても空の db_file は残らず、
+    次回の起動で移行をやり直します。完了後は元のファイルを `*.migrated` へ
+    リネームするため、2回目以降は何もしません。
+    
+    Returns:
+        移行したWi-Fi設定の件数
+    """
+    if not os.path.exists(config_file):
+        return 0
+    
+    if journal_file is not None and not os.path.exists(journal_file):
+        journal_file = None
+    source = JsonStorageBackend(config_file, journal_file)
+    config = source.load()
+    source.close()
+    
+    tmp_file = f"{db_file}.tmp"
+    _remove_database(tmp_file)
+    backend = SQLiteStorageBackend(tmp_file)
+    try:
+        sections = {key: value for key, value in config.items() if key != "wifi_configs"}
+        backend.write(config["wifi_configs"], [], sections)
+    except BaseException:
+        backend.close()
+        _remove_database(tmp_file)
+        raise
+    # 最後の接続を閉じるとWALがデータベース本体に書き戻される
+    backend.close()
+    os.replace(tmp_file, db_file)
+    fsync_directory(db_file)
+    
+    os.replace(config_file, f"{config_file}.migrated")
+    if journal_file is not None:
+        os.replace(journal_file, f"{journal_file}.migrated")
+    return len(config["wifi_configs"])
+
+
+def _remove_database(db_file: str):
+    """SQLiteのデータベースファイルとWAL・共有メモリのファイルを削除する"""
+    for path in (db_file, f"{db_file}-wal", f"{db_file}-shm"):
+        if os.path.exists(path):
+            os.remove(path)
@@ -0,0 +1,267 @@
+import copy
+import os
+import threading
+from typing import Dict, Hashable, List, Optional, Tuple
+from services import json_codec
+from services.config_journal import ConfigJournal, atomic_write_text, fsync_directory
+
+
+def default_config() -> dict:
+    """デフォルト設定を返す"""
+    return {
+        "user_settings": {
+            "scan_interval_seconds": 300,
+            "notifications_enabled": True
+        },
+        "wifi_configs": [],
+        "license_info": {
+            "is_pro_unlocked": False,
+            "activated_keys": []
+        }
+    }
+
+
+class StorageBackend:
+    """StorageManager の永続化バックエンドの基底クラス
+    
+    バックエンドはWi-Fi設定を「レコード」（WiFiConfig.to_dict() 形式の辞書で、
+    パスワードは暗号化済み）として扱い、それ以外のトップレベルのキー
+    （user_settings, license_info など）を「セクション」として扱います。
+    """
+    
+    def signature(self) -> Optional[Hashable]:
+        """保存データの変更検出用の値（外部から変更されると値が変わる）"""
+        raise NotImplementedError
+    
+    def load(self) -> dict:
+        """保存されている設定全体を返す（戻り値は変更しないこと）
+        
+        Returns:
+            default_config() と同じ構造の辞書。wifi_configs のパスワードは暗号化済み
+        """
+        raise NotImplementedError
+    
+    def write(self, puts: List[dict], deletes: List[str], sections: Dict[str, object]):
+        """変更をアトミックに書き込む
+        
+        Args:
+            puts: 追加・更新するWi-Fiレコード（idで上書き）
+            deletes: 削除するWi-FiのID
+            sections: 置き換えるセクション（キー → 値）
+        """
+        raise NotImplementedError
+    
+    def close(self):
+        """リソースを解放する"""
+        pass
+
+
+class JsonStorageBackend(StorageBackend):
+    """config.json に保存するバックエンド
+    
+    journal_file を指定するとジャーナルモードとなり、変更は1回の書き込みにつき
+    1レコードとしてジャーナルへ追記されます。ジャーナルが journal_compact_threshold
+    バイトを超えるとバックグラウンドでスナップショット（config.json）へ圧縮します。
+    ジャーナルモードの書き込みはレコードの追記とメモリ上の辞書の差し替えだけで、
+    保存件数に依存しません。
+    
+    非ジャーナルモードではジャーナルを読まないため、ジャーナルモードで書かれた
+    ジャーナルが残っている場合は fold_journal() でスナップショットへ反映してください。
+    """
+    
+    def __init__(self, config_file: str, journal_file: Optional[str] = None,
+                 journal_compact_threshold: int = 256 * 1024):
+        self.config_file = config_file
+        self.journal_file = journal_file
+        self.journal_compact_threshold = journal_compact_threshold
+        self._journal = ConfigJournal(journal_file) if journal_file else None
+        self._journal_seq = 0
+        
+        # 直近に読み書きした内容（パスワードは暗号化済み）
+        self._sections: Optional[dict] = None
+        self._records: Dict[str, dict] = {}
+        self._loaded_signature = None
+        
+        self._lock = threading.RLock()
+        self._snapshot_lock = threading.RLock()
+        self._compaction_thread: Optional[threading.Thread] = None
+    
+    @staticmethod
+    def _stat_signature(path: str) -> Optional[Tuple[int, int, int]]:
+        """ファイルの (mtime, サイズ, inode) を返す。存在しない場合はNone"""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+    
+    def signature(self) -> Optional[tuple]:
+        """設定ファイル（ジャーナルモードではジャーナルも含む）の stat シグネチャ"""
+        signature = self._stat_signature(self.config_file)
+        if self._journal is None:
+            return signature
+        journal_signature = self._stat_signature(self.journal_file)
+        if signature is None and journal_signature is None:
+            return None
+        return (signature, journal_signature)
+    
+    def load(self) -> dict:
+        with self._lock:
+            self._ensure_loaded()
+            return self._as_config()
+    
+    def _ensure_loaded(self):
+        """ファイルが外部から変更されていれば読み直す（設定全体の辞書は作らない）"""
+        signature = self.signature()
+        if self._sections is None or signature != self._loaded_signature:
+            self._read()
+            # 破損した末尾を切り詰めた場合に備えて取り直す
+            self._loaded_signature = self.signature()
+    
+    def _as_config(self) -> dict:
+        config = dict(self._sections)
+        config["wifi_configs"] = list(self._records.values())
+        return config
+    
+    def _read(self):
+        """スナップショットとジャーナルを読み込む"""
+        if os.path.exists(self.config_file):
+            with open(self.config_file, 'rb') as f:
+                config = json_codec.loads(f.read())
+        else:
+            config = default_config()
+        
+        self._journal_seq = config.pop("journal_seq", 0)
+        records = {}
+        for wifi in config.pop("wifi_configs", []):
+            records[wifi["id"]] = wifi
+        self._sections = config
+        self._records = records
+        
+        if self._journal is not None:
+            self._replay_journal(self._journal)
+    
+    def _replay_journal(self, journal: ConfigJournal) -> int:
+        """スナップショットにジャーナルの変更を適用する
+        
+        スナップショットに反映済み（journal_seq以下）のレコードは読み飛ばします。
+        
+        Returns:
+            適用したレコードの件数
+        """
+        applied = 0
+        for record in journal.replay():
+            seq = record.get("seq", 0)
+            if seq <= self._journal_seq:
+                continue
+            self._journal_seq = seq
+            self._apply(record.get("put", []), record.get("delete", []), record.get("set", {}))
+            applied += 1
+        return applied
+    
+    def _apply(self, puts: List[dict], deletes: List[str], sections: Dict[str, object]):
+        for wifi in puts:
+            self._records[wifi["id"]] = wifi
+        for wifi_id in deletes:
+            self._records.pop(wifi_id, None)
+        self._sections.update(sections)
+    
+    def write(self, puts: List[dict], deletes: List[str], sections: Dict[str, object]):
+        with self._lock:
+            self._ensure_loaded()
+            self._apply(puts, deletes, copy.deepcopy(sections))
+            try:
+                if self._journal is None:
+                    atomic_write_text(self.config_file, self._serialize())
+                else:
+                    # 1回の書き込みを1レコードにまとめる（途中で切れたレコードは破棄されるためアトミック）
+                    self._journal_seq += 1
+                    record = {"seq": self._journal_seq}
+                    if puts:
+                        record["put"] = puts
+                    if deletes:
+                        record["delete"] = deletes
+                    if sections:
+                        record["set"] = sections
+                    self._journal.append(record)
+            except Exception:
+                self._sections = None
+                raise
+            self._loaded_signature = self.signature()
+            
+            if self._journal is not None and self._journal.size() > self.journal_compact_threshold:
+                self._start_compaction()
+    
+    def _serialize(self) -> str:
+        config_to_save = self._as_config()
+        if self._journal is not None or self._journal_seq:
+            # 非ジャーナルモードでも引き継ぎ、後でジャーナルモードで開いたときに
+            # 反映済みのレコードを再適用しないようにする
+            config_to_save["journal_seq"] = self._journal_seq
+        return json_codec.dumps(config_to_save, indent=True)
+    
+    def _start_compaction(self):
+        """バックグラウンドでジャーナル圧縮を開始（実行中なら何もしない）"""
+        if self._compaction_thread is not None and self._compaction_thread.is_alive():
+            return
+        self._compaction_thread = threading.Thread(target=self.compact_journal, daemon=True)
+        self._compaction_thread.start()
+    
+    def compact_journal(self):
+        """ジャーナルの内容をスナップショットへ書き出し、反映済みのレコードを破棄する
+        
+        スナップショットの書き込み中も他スレッドからの追記は継続できます。
+        """
+        if self._journal is None:
+            return
+        
+        try:
+            with self._snapshot_lock:
+                with self._lock:
+                    self._ensure_loaded()
+                    offset = self._journal.size()
+                    text = self._serialize()
+                
+                atomic_write_text(self.config_file, text)
+                
+                with self._lock:
+                    self._journal.discard_before(offset)
+                    self._loaded_signature = self.signature()
+        except Exception as e:
+            print(f"ジャーナル圧縮エラー: {e}")
+    
+    def fold_journal(self, journal_file: str) -> int:
+        """ジャーナルモードで書かれたジャーナルをスナップショットへ反映し、ジャーナルを削除する
+        
+        非ジャーナルモードで開く前に呼びます。残したままにすると、この間の変更が
+        ジャーナルに載らないため、後でジャーナルモードで開いたときに古いレコードが
+        新しい内容を上書きしてしまいます。
+        
+        Args:
+            journal_file: ジャーナルのパス（存在しなければ何もしない）
+        
+        Returns:
+            スナップショットへ反映したレコードの件数
+        """
+        if not os.path.exists(journal_file):
+            return 0
+        
+        with self._lock:
+            self._ensure_loaded()
+            journal = ConfigJournal(journal_file)
+            try:
+                applied = self._replay_journal(journal)
+            finally:
+                journal.close()
+            if applied:
+                atomic_write_text(self.config_file, self._serialize())
+            os.remove(journal_file)
+            fsync_directory(journal_file)
+            self._loaded_signature = self.signature()
+            return applied
+    
+    def close(self):
+        if self._compaction_thread is not None:
+            self._compaction_thread.join()
+        if self._journal is not None:
+            self._journal.close()
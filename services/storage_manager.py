@@ -1,14 +1,33 @@
-import json
+import copy
 import os
-import base64
-from typing import List, Optional
-from models.wifi_config import WiFiConfig
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+from models.wifi_config import (
+    WiFiConfig, EncryptedPassword, reveal_password, parse_epoch_day, today_epoch_day,
+)
+from services.storage_backend import StorageBackend, JsonStorageBackend, default_config
+from services.password_cipher import get_password_cipher
+from services.priority_index import PRIORITY_STEP
+from services.wifi_repository import WiFiRepository
+from services.write_behind import WriteBehindQueue
 
 
 class StorageManager:
     """ローカルストレージ管理クラス（Android対応版）"""
     
-    def __init__(self, storage_dir: str = None):
+    def __init__(self, storage_dir: str = None, journaled: bool = False,
+                 journal_compact_threshold: int = 256 * 1024,
+                 backend: Union[str, StorageBackend] = "json",
+                 write_behind_delay: float = 0.5):
+        """
+        Args:
+            storage_dir: 保存先ディレクトリ
+            journaled: Trueの場合、変更を config.journal に追記するジャーナルモードで動作（JSONのみ）
+            journal_compact_threshold: ジャーナルがこのバイト数を超えたらスナップショットへ圧縮
+            backend: "json"、"sqlite"、または StorageBackend のインスタンス
+            write_behind_delay: schedule_wifi_update の変更をまとめて書き込むまでの待ち時間（秒）
+        """
         # デフォルトではアプリのデータディレクトリを使用
         if storage_dir is None:
             storage_dir = os.path.join(os.path.expanduser("~"), ".my_connect_wifi")
@@ -25,114 +44,736 @@ class StorageManager:
             self.storage_dir = storage_dir
             self.config_file = os.path.join(storage_dir, "config.json")
             os.makedirs(storage_dir, exist_ok=True)
+        
+        self.journal_file = os.path.join(self.storage_dir, "config.journal")
+        self.db_file = os.path.join(self.storage_dir, "config.db")
+        self.key_file = os.path.join(self.storage_dir, "encryption.key")
+        self._cipher = get_password_cipher(self.key_file)
+        self.backend = self._create_backend(backend, journaled, journal_compact_threshold)
+        self._lock = threading.RLock()
+        
+        # 設定キャッシュ（バックエンドのシグネチャが変わるまで再読み込みしない）
+        self._cached_config: Optional[dict] = None
+        self._cached_wifi_configs: Optional[WiFiRepository] = None
+        self._cached_signature: Optional[tuple] = None
+        # キャッシュの wifi_configs でのIDごとの位置（1件の更新でリストを作り直さないため）
+        self._cached_positions: Optional[Dict[str, int]] = None
+        self.cache_hits = 0
+        self.cache_misses = 0
+        
+        # トランザクション中にステージングされた変更（コミット時に1回だけ書き込む）
+        self._tx_depth = 0
+        self._tx_config: Optional[dict] = None
+        self._tx_wifi_configs: Optional[List[WiFiConfig]] = None
+        
+        # 連続したUI操作による更新をまとめて書き込むキュー
+        self._write_behind = WriteBehindQueue(self._flush_wifi_updates, write_behind_delay)
+    
+    def _create_backend(self, backend: Union[str, StorageBackend], journaled: bool,
+                        journal_compact_threshold: int) -> StorageBackend:
+        """バックエンドを生成する（SQLiteの場合は既存のconfig.jsonを初回のみ移行）"""
+        if isinstance(backend, StorageBackend):
+            return backend
+        
+        if backend == "json":
+            json_backend = JsonStorageBackend(
+                self.config_file,
+                self.journal_file if journaled else None,
+                journal_compact_threshold,
+            )
+            if not journaled and os.path.exists(self.journal_file):
+                # 以前ジャーナルモードで書かれた変更を取り込んでから非ジャーナルモードで使う
+                count = json_backend.fold_journal(self.journal_file)
+                if count:
+                    print(f"config.journal の {count} 件の変更を config.json へ反映しました")
+            return json_backend
+        
+        if backend == "sqlite":
+            from services.sqlite_storage_backend import SQLiteStorageBackend, migrate_json_to_sqlite
+            if not os.path.exists(self.db_file) and os.path.exists(self.config_file):
+                count = migrate_json_to_sqlite(self.config_file, self.db_file, self.journal_file)
+                print(f"config.json から {count} 件のWi-Fi設定をSQLiteへ移行しました")
+            return SQLiteStorageBackend(self.db_file)
+        
+        raise ValueError(f"不明なストレージバックエンドです: {backend}")
     
     def _encrypt_password(self, password: str) -> str:
-        """パスワードを簡易暗号化（Base64）"""
-        return base64.b64encode(password.encode()).decode()
+        """パスワードを暗号化（AEAD）"""
+        return self._cipher.encrypt(password)
     
     def _decrypt_password(self, encrypted_password: str) -> str:
-        """パスワードを復号化"""
+        """パスワードを復号化
+        
+        Raises:
+            ValueError: 改ざん・破損している、または別のキーで暗号化されていて復号化できない場合
+        """
         try:
-            return base64.b64decode(encrypted_password.encode()).decode()
-        except Exception:
-            return ""
+            return self._cipher.decrypt(encrypted_password)
+        except Exception as e:
+            # 空のパスワードとして扱うと、改ざんやキーの不一致に気付けないまま接続してしまう
+            print(f"パスワード復号化エラー: {e}")
+            raise ValueError(
+                "保存されたパスワードを復号化できません（改ざん・破損、または暗号化キーの不一致）"
+            ) from e
     
-    def load_config(self) -> dict:
-        """設定ファイルを読み込む"""
-        if not os.path.exists(self.config_file):
-            return self._get_default_config()
+    def _seal_password(self, password) -> str:
+        """保存用の暗号化済み文字列を返す
         
+        このStorageManagerが読み込んだ EncryptedPassword はそのまま書き戻し、
+        復号化→再暗号化は行いません（旧形式のBase64と、AES-GCMを使える場合の
+        HMAC方式のトークンのみ暗号化し直します）。
+        """
+        if (
+            isinstance(password, EncryptedPassword)
+            and password.decrypt == self._decrypt_password
+            and not self._cipher.needs_reencryption(password.token)
+        ):
+            return password.token
+        return self._encrypt_password(reveal_password(password))
+    
+    def _sealed_wifi(self, wifi: dict, current: Optional[dict]) -> dict:
+        """平文のパスワードを持つWi-Fi設定の辞書を、保存済みの記録と比べられる形にする
+        
+        パスワード以外が current と同じで、パスワードも current を復号化したものと
+        同じ場合は current の EncryptedPassword を使います（暗号化のたびに値が変わるため）。
+        それ以外の平文はそのまま返し、書き込み時に暗号化します。
+        """
+        password = wifi.get("password")
+        if (
+            current is None
+            or not isinstance(password, str)
+            or not isinstance(current.get("password"), EncryptedPassword)
+        ):
+            return wifi
+        if dict(wifi, password=None) != dict(current, password=None):
+            return wifi
         try:
-            with open(self.config_file, 'r', encoding='utf-8') as f:
-                config = json.load(f)
+            if current["password"].reveal() != password:
+                return wifi
+        except ValueError:
+            # 保存済みのものが復号化できない場合は、渡された平文で暗号化し直す
+            return wifi
+        return dict(wifi, password=current["password"])
+    
+    def _load_cached_config(self) -> dict:
+        """キャッシュ済みの設定を返す（呼び出し側で変更しないこと）
+        
+        バックエンドが変更されていなければ読み込みを行わずにキャッシュを返し、
+        変更されていれば読み込んでキャッシュを更新します。
+        """
+        with self._lock:
+            signature = self.backend.signature()
+            if self._cached_config is not None and signature == self._cached_signature:
+                self.cache_hits += 1
+                return self._cached_config
             
-            # パスワードを復号化
-            for wifi in config.get("wifi_configs", []):
-                wifi["password"] = self._decrypt_password(wifi["password"])
+            self.cache_misses += 1
+            self._cached_wifi_configs = None
+            self._cached_positions = None
+            try:
+                raw = self.backend.load()
+                config = copy.deepcopy({k: v for k, v in raw.items() if k != "wifi_configs"})
+                
+                # パスワードは暗号化されたまま保持し、必要になった時点で復号化する
+                config["wifi_configs"] = [
+                    dict(wifi, password=EncryptedPassword(wifi["password"], self._decrypt_password))
+                    for wifi in raw.get("wifi_configs", [])
+                ]
+            except Exception as e:
+                print(f"設定ファイル読み込みエラー: {e}")
+                self.invalidate_cache()
+                return self._get_default_config()
             
+            self._cached_config = config
+            self._cached_signature = signature
             return config
-        except Exception as e:
-            print(f"設定ファイル読み込みエラー: {e}")
-            return self._get_default_config()
+    
+    def load_config(self) -> dict:
+        """設定ファイルを読み込む（パスワードは復号化済み）
+        
+        Raises:
+            ValueError: 復号化できないパスワードがある場合
+        """
+        config = copy.deepcopy(self._load_cached_config())
+        for wifi in config.get("wifi_configs", []):
+            wifi["password"] = reveal_password(wifi["password"])
+        return config
+    
+    def upgrade_password_encryption(self) -> int:
+        """旧形式（Base64のみ・AES-GCMを使える場合のHMAC方式）で保存されているパスワードを
+        1回の書き込みで暗号化し直す
+        
+        Returns:
+            暗号化し直した件数
+        """
+        with self._lock:
+            config = self._load_cached_config()
+            legacy = [
+                wifi for wifi in config.get("wifi_configs", [])
+                if isinstance(wifi["password"], EncryptedPassword)
+                and self._cipher.needs_reencryption(wifi["password"].token)
+            ]
+            if legacy:
+                tokens = self._cipher.encrypt_many(
+                    self._cipher.decrypt_many([wifi["password"].token for wifi in legacy])
+                )
+                upgraded = {
+                    wifi["id"]: dict(wifi, password=EncryptedPassword(token, self._decrypt_password))
+                    for wifi, token in zip(legacy, tokens)
+                }
+                wifi_dicts = [upgraded.get(wifi["id"], wifi) for wifi in config["wifi_configs"]]
+                self._write_changes(dict(config, wifi_configs=wifi_dicts), list(upgraded.values()), [], {})
+                self._cached_wifi_configs = None
+            return len(legacy)
+    
+    def upgrade_ignore_dates(self) -> int:
+        """旧形式（ISO 8601文字列）の last_ignored_date をエポック日に変換して1回で書き込む
+        
+        Returns:
+            変換した件数
+        """
+        with self._lock:
+            config = self._load_cached_config()
+            upgraded = {}
+            for wifi in config.get("wifi_configs", []):
+                flags = wifi.get("status_flags", {})
+                if isinstance(flags.get("last_ignored_date"), str):
+                    last_ignored_date = parse_epoch_day(flags["last_ignored_date"])
+                    upgraded[wifi["id"]] = dict(
+                        wifi, status_flags=dict(flags, last_ignored_date=last_ignored_date)
+                    )
+            if upgraded:
+                wifi_dicts = [upgraded.get(wifi["id"], wifi) for wifi in config["wifi_configs"]]
+                self._write_changes(dict(config, wifi_configs=wifi_dicts), list(upgraded.values()), [], {})
+                self._cached_wifi_configs = None
+            return len(upgraded)
     
     def save_config(self, config: dict):
         """設定ファイルを保存"""
-        # パスワードを暗号化
-        config_to_save = config.copy()
-        config_to_save["wifi_configs"] = []
-        for wifi in config.get("wifi_configs", []):
-            wifi_copy = wifi.copy()
-            wifi_copy["password"] = self._encrypt_password(wifi["password"])
-            config_to_save["wifi_configs"].append(wifi_copy)
+        with self._lock:
+            if self._tx_depth:
+                self._tx_config = copy.deepcopy(config)
+                self._tx_wifi_configs = [
+                    WiFiConfig.from_dict(wifi_data) for wifi_data in config.get("wifi_configs", [])
+                ]
+                return
+            
+            self._commit_config(copy.deepcopy(config))
+            self._cached_wifi_configs = None
+    
+    def _commit_config(self, config: dict):
+        """現在のキャッシュとの差分だけをバックエンドに書き込む
         
-        with open(self.config_file, 'w', encoding='utf-8') as f:
-            json.dump(config_to_save, f, indent=2, ensure_ascii=False)
+        Args:
+            config: 新しい設定（以後キャッシュとして保持されるため呼び出し側で変更しないこと）
+        """
+        with self._lock:
+            current = self._load_cached_config()
+            sections = {
+                key: value for key, value in config.items()
+                if key != "wifi_configs" and current.get(key) != value
+            }
+            current_wifi = {wifi["id"]: wifi for wifi in current.get("wifi_configs", [])}
+            # 平文のパスワードは暗号化済みの形にそろえてから比べる（変わっていなければ保存済みの値を使う）
+            new_wifi = [self._sealed_wifi(wifi, current_wifi.get(wifi["id"])) for wifi in config.get("wifi_configs", [])]
+            config["wifi_configs"] = new_wifi
+            new_ids = {wifi["id"] for wifi in new_wifi}
+            puts = [
+                wifi for wifi in new_wifi
+                if current_wifi.get(wifi["id"]) is not wifi and current_wifi.get(wifi["id"]) != wifi
+            ]
+            deletes = [wifi_id for wifi_id in current_wifi if wifi_id not in new_ids]
+            self._write_changes(config, puts, deletes, sections)
     
-    def _get_default_config(self) -> dict:
-        """デフォルト設定を返す"""
-        return {
-            "user_settings": {
-                "scan_interval_seconds": 300,
-                "notifications_enabled": True
-            },
-            "wifi_configs": [],
-            "license_info": {
-                "is_pro_unlocked": False,
-                "activated_keys": []
+    def _write_changes(self, config: dict, puts: List[dict], deletes: List[str],
+                       sections: Dict[str, object]):
+        """変更をバックエンドに書き込み、キャッシュを config に置き換える
+        
+        Args:
+            config: 書き込み後の設定
+            puts: 追加・更新するWi-Fi設定（パスワードは平文または EncryptedPassword）
+            deletes: 削除するWi-FiのID
+            sections: 置き換えるセクション
+        """
+        with self._lock:
+            if not puts and not deletes and not sections:
+                return
+            
+            records = [
+                dict(wifi, password=self._seal_password(wifi["password"]))
+                for wifi in puts
+            ]
+            try:
+                self.backend.write(records, list(deletes), sections)
+            except Exception:
+                self.invalidate_cache()
+                raise
+            
+            # キャッシュにも平文ではなく暗号化済みのパスワードを保持する
+            sealed = {
+                record["id"]: dict(record, password=EncryptedPassword(record["password"], self._decrypt_password))
+                for record in records
+            }
+            if sealed:
+                config = dict(config, wifi_configs=[
+                    sealed.get(wifi["id"], wifi) for wifi in config.get("wifi_configs", [])
+                ])
+            self._cached_config = config
+            self._cached_positions = None
+            self._cached_signature = self.backend.signature()
+    
+    def _write_wifi_records(self, puts: List[dict], deletes: List[str]):
+        """Wi-Fi設定の追加・更新・削除だけを書き込み、キャッシュの該当する要素をその場で差し替える
+        
+        設定全体のリストを作り直さないため、1件の追加・更新は保存件数に依存しません
+        （削除は後ろの要素を詰めるため件数に比例します）。
+        
+        Args:
+            puts: 追加・更新するWi-Fi設定（パスワードは平文または EncryptedPassword）
+            deletes: 削除するWi-FiのID
+        """
+        with self._lock:
+            config = self._load_cached_config()
+            records = [
+                dict(wifi, password=self._seal_password(wifi["password"]))
+                for wifi in puts
+            ]
+            try:
+                self.backend.write(records, list(deletes), {})
+            except Exception:
+                self.invalidate_cache()
+                raise
+            
+            if config is not self._cached_config:
+                # 読み込みに失敗してキャッシュがない場合は、次回の読み込みに任せる
+                return
+            wifi_dicts = config["wifi_configs"]
+            positions = self._get_cached_positions()
+            for record in records:
+                index = positions.get(record["id"])
+                sealed = dict(record, password=EncryptedPassword(record["password"], self._decrypt_password))
+                if index is None:
+                    positions[record["id"]] = len(wifi_dicts)
+                    wifi_dicts.append(sealed)
+                else:
+                    wifi_dicts[index] = sealed
+            if deletes:
+                removed = set(deletes)
+                wifi_dicts[:] = [wifi for wifi in wifi_dicts if wifi["id"] not in removed]
+                self._cached_positions = None
+            self._cached_signature = self.backend.signature()
+    
+    def _get_cached_positions(self) -> Dict[str, int]:
+        """キャッシュの wifi_configs でのIDごとの位置を返す（キャッシュを読み直した後の初回のみ全件から作成）"""
+        if self._cached_positions is None:
+            self._cached_positions = {
+                wifi["id"]: i for i, wifi in enumerate(self._cached_config["wifi_configs"])
             }
+        return self._cached_positions
+    
+    def _write_wifi_change(self, wifi: Optional[WiFiConfig] = None, wifi_id: Optional[str] = None):
+        """Wi-Fi設定1件の追加・更新（wifi）または削除（wifi_id）を書き込む
+        
+        バックエンドには変更した1件だけを渡し、キャッシュもその場で更新します。
+        """
+        if wifi is not None:
+            self._write_wifi_puts([wifi])
+            return
+        
+        with self._lock:
+            self._write_wifi_records([], [wifi_id])
+            if self._cached_wifi_configs is not None:
+                self._cached_wifi_configs.remove(wifi_id)
+    
+    def _write_wifi_puts(self, wifis: List[WiFiConfig]):
+        """複数のWi-Fi設定の追加・更新を1回で書き込み、キャッシュをその場で更新する"""
+        with self._lock:
+            versions = [(wifi, wifi.version) for wifi in wifis]
+            puts = {wifi.id: wifi.to_dict() for wifi in wifis}
+            self._write_wifi_records(list(puts.values()), [])
+            
+            for wifi, version in versions:
+                wifi.mark_clean(version)
+                if self._cached_wifi_configs is not None:
+                    self._cached_wifi_configs.put(wifi)
+    
+    def _serialize_wifi_configs(self, wifi_configs: List[WiFiConfig]) -> Tuple[List[dict], List[Tuple[WiFiConfig, int]]]:
+        """WiFiConfigのリストを保存用の辞書に変換する
+        
+        保存後に変更されていないWiFiConfigはキャッシュ済みの辞書を再利用し、
+        to_dict() を呼びません。
+        
+        Returns:
+            (辞書のリスト, 書き込み後に mark_clean する (WiFiConfig, バージョン) のリスト)
+        """
+        current = {wifi["id"]: wifi for wifi in self._load_cached_config().get("wifi_configs", [])}
+        wifi_dicts = []
+        serialized = []
+        for wifi in wifi_configs:
+            cached = current.get(wifi.id)
+            if cached is not None and not wifi.is_dirty:
+                wifi_dicts.append(cached)
+            else:
+                serialized.append((wifi, wifi.version))
+                wifi_dicts.append(wifi.to_dict())
+        return wifi_dicts, serialized
+    
+    def compact_journal(self):
+        """ジャーナルをスナップショットへ圧縮する（JSONジャーナルモード以外では何もしない）"""
+        if isinstance(self.backend, JsonStorageBackend):
+            self.backend.compact_journal()
+    
+    def schedule_wifi_update(self, wifi: WiFiConfig):
+        """Wi-Fi設定の更新を遅延書き込みで予約する
+        
+        メモリ上のキャッシュには即座に反映し、ディスクへの書き込みは
+        短い待ち時間の後にバックグラウンドでまとめて行います。
+        同じWi-Fiへの連続した更新は最後の1回分だけが書き込まれます。
+        """
+        with self._lock:
+            if self._cached_wifi_configs is not None and wifi.id in self._cached_wifi_configs:
+                self._cached_wifi_configs.put(wifi)
+        self._write_behind.schedule(wifi.id, wifi)
+    
+    def flush(self):
+        """遅延書き込み待ちの更新を今すぐ書き込む"""
+        self._write_behind.flush()
+    
+    def _flush_wifi_updates(self, wifi_configs: List[WiFiConfig]):
+        with self.transaction():
+            for wifi in wifi_configs:
+                self._update_wifi_config(wifi)
+    
+    def _apply_pending_updates(self, repository: WiFiRepository) -> WiFiRepository:
+        """遅延書き込み待ちの更新をリポジトリに重ねる（キャッシュを読み直した場合のみ必要）"""
+        for wifi_id, wifi in self._write_behind.pending().items():
+            if wifi_id in repository and repository.get(wifi_id) is not wifi:
+                repository.put(wifi)
+        return repository
+    
+    def close(self):
+        """遅延書き込みを反映してからバックエンドを閉じる"""
+        self.flush()
+        self.backend.close()
+    
+    def invalidate_cache(self):
+        """キャッシュを破棄し、次回アクセス時にファイルから再読み込みさせる"""
+        self._cached_config = None
+        self._cached_wifi_configs = None
+        self._cached_signature = None
+        self._cached_positions = None
+    
+    @contextmanager
+    def transaction(self):
+        """複数の変更をまとめて1回の書き込みでコミットするトランザクション
+        
+        ブロック内での add/update/delete/save_wifi_configs/renumber_priorities/
+        ライセンス・ユーザー設定の変更はメモリ上にステージングされ、ブロックを抜けた時点で
+        1回のアトミックな書き込み（JSONでは一時ファイル + os.replace、ジャーナル
+        モードでは1レコードの追記、SQLiteでは1トランザクション）で保存されます。
+        例外が発生した場合は全ての変更を破棄します。ネストした場合は最も外側で
+        コミットされます。
+        
+        Example:
+            with storage_manager.transaction():
+                for wifi in imported:
+                    storage_manager.add_wifi_config(wifi)
+        """
+        with self._lock:
+            if self._tx_depth == 0:
+                self._tx_config = dict(self._load_cached_config())
+                self._tx_wifi_configs = self.get_wifi_configs()
+            self._tx_depth += 1
+            try:
+                yield self
+            except BaseException:
+                self._tx_depth -= 1
+                if self._tx_depth == 0:
+                    self._discard_transaction()
+                    # 呼び出し側がキャッシュ中のWiFiConfigを直接変更している可能性があるため破棄
+                    self.invalidate_cache()
+                raise
+            else:
+                self._tx_depth -= 1
+                if self._tx_depth == 0:
+                    self._commit_transaction()
+    
+    def _commit_transaction(self):
+        config, wifi_configs = self._tx_config, self._tx_wifi_configs
+        self._discard_transaction()
+        config["wifi_configs"], serialized = self._serialize_wifi_configs(wifi_configs)
+        self._commit_config(config)
+        self._cached_wifi_configs = WiFiRepository(wifi_configs)
+        for wifi, version in serialized:
+            wifi.mark_clean(version)
+    
+    def _discard_transaction(self):
+        self._tx_config = None
+        self._tx_wifi_configs = None
+    
+    def apply_batch(self, ops: Iterable[Tuple[Any, ...]]):
+        """変更操作のリストを1つのトランザクションとして適用する
+        
+        Args:
+            ops: ("add", WiFiConfig) / ("update", WiFiConfig) / ("delete", wifi_id) /
+                 ("renumber", [wifi_id, ...] または None) / ("license", license_info) /
+                 ("activate_key", key) / ("settings", user_settings) のタプルのリスト
+        
+        Raises:
+            ValueError: 未知の操作が含まれていた場合（変更は全て破棄されます）
+        """
+        handlers = {
+            "add": self.add_wifi_config,
+            "update": self.update_wifi_config,
+            "delete": self.delete_wifi_config,
+            "renumber": self.renumber_priorities,
+            "license": self.save_license_info,
+            "activate_key": self.add_activated_key,
+            "settings": self.save_user_settings,
         }
+        with self.transaction():
+            for op, *args in ops:
+                handler = handlers.get(op)
+                if handler is None:
+                    raise ValueError(f"不明な操作です: {op}")
+                handler(*args)
+    
+    def _current_config(self) -> dict:
+        """トランザクション中ならステージング中の設定、それ以外はキャッシュを返す"""
+        if self._tx_depth:
+            return self._tx_config
+        return self._load_cached_config()
+    
+    def get_cache_stats(self) -> dict:
+        """キャッシュのヒット/ミス回数を返す"""
+        return {
+            "hits": self.cache_hits,
+            "misses": self.cache_misses,
+        }
+    
+    def _get_default_config(self) -> dict:
+        """デフォルト設定を返す"""
+        return default_config()
     
     def get_wifi_configs(self) -> List[WiFiConfig]:
-        """Wi-Fi設定リストを取得"""
-        config = self.load_config()
-        wifi_list = []
-        for wifi_data in config.get("wifi_configs", []):
-            wifi_list.append(WiFiConfig.from_dict(wifi_data))
+        """Wi-Fi設定リストを取得
+        
+        Note: 返されるWiFiConfigはキャッシュと共有されます。
+        変更した場合は update_wifi_config で保存してください。
+        """
+        with self._lock:
+            if self._tx_depth:
+                return sorted(self._tx_wifi_configs, key=lambda x: x.priority)
+            return self._get_wifi_repository().to_list()
+    
+    def get_wifi_config(self, wifi_id: str) -> Optional[WiFiConfig]:
+        """IDでWi-Fi設定を取得（見つからない場合はNone）"""
+        with self._lock:
+            return self._get_wifi_repository().get(wifi_id)
+    
+    def find_wifi_configs_by_ssid(self, ssid: str) -> List[WiFiConfig]:
+        """SSIDが一致するWi-Fi設定を優先順位順に返す"""
+        with self._lock:
+            return self._get_wifi_repository().find_by_ssid(ssid)
+    
+    def match_scanned_networks(self, scanned_ssids: Iterable[str]) -> List[WiFiConfig]:
+        """スキャンで見つかったSSIDに一致する保存済みWi-Fi設定を優先順位順に返す"""
+        with self._lock:
+            return self._get_wifi_repository().match_scan(scanned_ssids)
+    
+    def best_scanned_network(self, scanned_ssids: Iterable[str], today: Optional[int] = None) -> Optional[WiFiConfig]:
+        """スキャンで見つかったSSIDのうち、接続候補として最も優先順位の高い保存済みWi-Fiを返す
         
-        # 優先順位でソート
-        wifi_list.sort(key=lambda x: x.priority)
-        return wifi_list
+        「今日だけ無視」「永続的に無視」のWi-Fiは候補から外します。
+        """
+        with self._lock:
+            return self._get_wifi_repository().best_match(scanned_ssids, today)
+    
+    def get_next_priority(self) -> int:
+        """新しく追加するWi-Fiの優先順位（現在の最大値 + PRIORITY_STEP）を返す"""
+        with self._lock:
+            return self._get_wifi_repository().next_priority()
+    
+    def _get_wifi_repository(self) -> WiFiRepository:
+        """現在のWi-Fi設定のリポジトリを返す（呼び出し側で変更しないこと）
+        
+        トランザクション中はステージング中の設定から作成し、それ以外は
+        遅延書き込み待ちの更新を反映したキャッシュを返します。
+        """
+        if self._tx_depth:
+            return WiFiRepository(self._tx_wifi_configs)
+        return self._apply_pending_updates(self._get_cached_wifi_configs())
+    
+    def _get_cached_wifi_configs(self) -> WiFiRepository:
+        config = self._load_cached_config()
+        if self._cached_wifi_configs is None or self._cached_config is not config:
+            # 全件をまとめて検証してから生成する
+            wifi_list = WiFiConfig.from_dicts(config.get("wifi_configs", []))
+            for wifi in wifi_list:
+                wifi.mark_clean()
+            
+            # 優先順位・ID・SSIDのインデックスを作成（以後は差分だけ更新する）
+            repository = WiFiRepository(wifi_list)
+            if self._cached_config is config:
+                self._cached_wifi_configs = repository
+            return repository
+        
+        return self._cached_wifi_configs
     
     def save_wifi_configs(self, wifi_configs: List[WiFiConfig]):
         """Wi-Fi設定リストを保存"""
-        config = self.load_config()
-        config["wifi_configs"] = [wifi.to_dict() for wifi in wifi_configs]
-        self.save_config(config)
+        with self._lock:
+            if self._tx_depth:
+                self._tx_wifi_configs = list(wifi_configs)
+                return
+            
+            config = dict(self._load_cached_config())
+            config["wifi_configs"], serialized = self._serialize_wifi_configs(wifi_configs)
+            self._commit_config(config)
+            self._cached_wifi_configs = WiFiRepository(wifi_configs)
+            for wifi, version in serialized:
+                wifi.mark_clean(version)
     
     def add_wifi_config(self, wifi: WiFiConfig):
         """Wi-Fi設定を追加"""
-        configs = self.get_wifi_configs()
-        configs.append(wifi)
-        self.save_wifi_configs(configs)
+        with self._lock:
+            if not self._tx_depth:
+                self._write_wifi_change(wifi=wifi)
+                return
+            
+            configs = self.get_wifi_configs()
+            configs.append(wifi)
+            self.save_wifi_configs(configs)
     
     def delete_wifi_config(self, wifi_id: str):
         """Wi-Fi設定を削除"""
-        configs = self.get_wifi_configs()
-        configs = [w for w in configs if w.id != wifi_id]
-        self.save_wifi_configs(configs)
+        self._write_behind.discard(wifi_id)
+        with self._lock:
+            if not self._tx_depth:
+                if wifi_id in self._get_wifi_repository():
+                    self._write_wifi_change(wifi_id=wifi_id)
+                return
+            
+            configs = self.get_wifi_configs()
+            configs = [w for w in configs if w.id != wifi_id]
+            self.save_wifi_configs(configs)
     
     def update_wifi_config(self, wifi: WiFiConfig):
         """Wi-Fi設定を更新"""
-        configs = self.get_wifi_configs()
-        for i, w in enumerate(configs):
-            if w.id == wifi.id:
-                configs[i] = wifi
-                break
-        self.save_wifi_configs(configs)
+        self._write_behind.discard(wifi.id)
+        self._update_wifi_config(wifi)
+    
+    def _update_wifi_config(self, wifi: WiFiConfig):
+        with self._lock:
+            if not self._tx_depth:
+                # 保存後に変更されていなければ書き込みを省略
+                if wifi.is_dirty and wifi.id in self._get_wifi_repository():
+                    self._write_wifi_change(wifi=wifi)
+                return
+            
+            configs = self.get_wifi_configs()
+            for i, w in enumerate(configs):
+                if w.id == wifi.id:
+                    configs[i] = wifi
+                    break
+            self.save_wifi_configs(configs)
+    
+    def expire_ignore_today(self, today: Optional[int] = None) -> List[WiFiConfig]:
+        """前日以前に設定された「今日だけ無視」を1回のトランザクションでまとめて解除する
+        
+        Args:
+            today: 今日のエポック日（省略時は today_epoch_day()）
+        
+        Returns:
+            フラグを解除したWiFiConfigのリスト
+        """
+        if today is None:
+            today = today_epoch_day()
+        with self._lock:
+            expired = [wifi for wifi in self.get_wifi_configs() if wifi.is_ignore_today_expired(today)]
+            if expired:
+                with self.transaction():
+                    for wifi in expired:
+                        wifi.clear_ignore_today()
+                    self.save_wifi_configs(self.get_wifi_configs())
+        return expired
+    
+    def move_wifi_config(self, wifi_id: str, position: int):
+        """Wi-Fiを優先順位順の指定した位置へ移動する（ドラッグでの並べ替え用）
+        
+        通常は移動したWi-Fiだけを書き込みます（PriorityIndex.move を参照）。
+        
+        Args:
+            wifi_id: 移動するWi-FiのID
+            position: 移動先の位置（0始まり）
+        """
+        with self._lock:
+            repository = self._get_wifi_repository()
+            if wifi_id not in repository:
+                return
+            changed = repository.move(wifi_id, position)
+            for wifi in changed:
+                self._write_behind.discard(wifi.id)
+            if self._tx_depth:
+                self.save_wifi_configs(repository.to_list())
+            elif changed:
+                self._write_wifi_puts(changed)
+    
+    def renumber_priorities(self, ordered_ids: Optional[List[str]] = None):
+        """優先順位を PRIORITY_STEP 間隔で振り直す
+        
+        優先順位が変わらないWi-Fiは書き込みません。
+        
+        Args:
+            ordered_ids: 新しい並び順のIDリスト。省略時は現在の優先順位順。
+                         含まれないWi-Fiは末尾に現在の順序で並べます。
+        """
+        with self.transaction():
+            configs = self.get_wifi_configs()
+            if ordered_ids is not None:
+                order = {wifi_id: i for i, wifi_id in enumerate(ordered_ids)}
+                configs.sort(key=lambda w: order.get(w.id, len(order)))
+            for i, wifi in enumerate(configs, start=1):
+                if wifi.priority != i * PRIORITY_STEP:
+                    wifi.priority = i * PRIORITY_STEP
+            self.save_wifi_configs(configs)
+    
+    def get_user_settings(self) -> dict:
+        """ユーザー設定を取得"""
+        with self._lock:
+            config = self._current_config()
+            return copy.deepcopy(config.get("user_settings", default_config()["user_settings"]))
+    
+    def save_user_settings(self, user_settings: dict):
+        """ユーザー設定を保存"""
+        with self._lock:
+            config = dict(self._current_config())
+            config["user_settings"] = copy.deepcopy(user_settings)
+            if self._tx_depth:
+                self._tx_config = config
+                return
+            
+            self._write_changes(config, [], [], {"user_settings": config["user_settings"]})
     
     def get_license_info(self) -> dict:
         """ライセンス情報を取得"""
-        config = self.load_config()
-        return config.get("license_info", {
-            "is_pro_unlocked": False,
-            "activated_keys": []
-        })
+        with self._lock:
+            config = self._current_config()
+            return copy.deepcopy(config.get("license_info", {
+                "is_pro_unlocked": False,
+                "activated_keys": []
+            }))
     
     def save_license_info(self, license_info: dict):
         """ライセンス情報を保存"""
-        config = self.load_config()
-        config["license_info"] = license_info
-        self.save_config(config)
+        with self._lock:
+            config = dict(self._current_config())
+            config["license_info"] = copy.deepcopy(license_info)
+            if self._tx_depth:
+                self._tx_config = config
+                return
+            
+            self._write_changes(config, [], [], {"license_info": config["license_info"]})
     
     def add_activated_key(self, key: str):
         """アクティベート済みキーを追加（ローカル版）"""
@@ -0,0 +1,199 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Awaitable, Callable, List, Optional
+
+# 接続試行の進行状態
+CONNECT_PENDING = "pending"  # 開始待ち
+CONNECT_ASSOCIATING = "associating"  # アクセスポイントに接続中
+CONNECT_AUTHENTICATING = "authenticating"  # 認証中（パスワードの確認）
+CONNECT_OBTAINING_IP = "obtaining_ip"  # IPアドレスの取得中
+CONNECT_CONNECTED = "connected"  # 接続完了
+CONNECT_FAILED = "failed"  # 失敗（制限時間切れを含む）
+CONNECT_CANCELLED = "cancelled"  # キャンセル（新しい接続試行に置き換えられた場合を含む）
+
+TERMINAL_STATES = frozenset((CONNECT_CONNECTED, CONNECT_FAILED, CONNECT_CANCELLED))
+
+# 失敗・キャンセルの理由
+REASON_TIMEOUT = "timeout"
+REASON_CANCELLED = "cancelled"
+REASON_SUPERSEDED = "superseded"
+
+# 進行状態を報告する関数（接続処理に渡される）
+ProgressReporter = Callable[[str], None]
+
+
+@dataclass(frozen=True)
+class ConnectProgress:
+    """接続試行の進行状態の変化"""
+    state: str  # CONNECT_ASSOCIATING など
+    ssid: str
+    reason: Optional[str] = None  # 失敗・キャンセルの理由（REASON_TIMEOUT やエラーメッセージ）
+    at: float = field(default_factory=time.monotonic)
+    
+    @property
+    def is_terminal(self) -> bool:
+        """これ以上状態が変わらないか"""
+        return self.state in TERMINAL_STATES
+
+
+class ConnectAttempt:
+    """1回の接続試行のハンドル
+    
+    WiFiManager.connect_async() が返します。接続はワーカースレッドのイベントループで
+    行うため、UIのスレッドを止めません。どのスレッドからでも cancel() でき、
+    進行状態はリスナー（接続処理のスレッドで呼ばれる）か iter_progress() で受け取れます。
+    """
+    
+    def __init__(self, ssid: str, interface: str, timeout: Optional[float]):
+        """
+        Args:
+            ssid: 接続先のSSID
+            interface: 接続するインターフェース
+            timeout: 接続全体の制限時間（秒。Noneの場合は制限しない）
+        """
+        self.ssid = ssid
+        self.interface = interface
+        self.timeout = timeout
+        self.history: List[ConnectProgress] = [ConnectProgress(CONNECT_PENDING, ssid)]
+        self._future: Future = Future()
+        self._listeners: List[Callable[[ConnectProgress], None]] = []
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self._cancel_reason: Optional[str] = None
+    
+    @property
+    def state(self) -> str:
+        """現在の進行状態"""
+        return self.history[-1].state
+    
+    @property
+    def reason(self) -> Optional[str]:
+        """失敗・キャンセルの理由（それ以外はNone）"""
+        return self.history[-1].reason
+    
+    def add_progress_listener(self, callback: Callable[[ConnectProgress], None]) -> Callable[[], None]:
+        """進行状態の変化を受け取るコールバックを登録する
+        
+        登録より前の変化は history で確認できます。
+        
+        Returns:
+            登録を解除する関数
+        """
+        with self._lock:
+            self._listeners = self._listeners + [callback]
+        
+        def remove():
+            with self._lock:
+                self._listeners = [c for c in self._listeners if c is not callback]
+        return remove
+    
+    def _report(self, state: str, reason: Optional[str] = None):
+        progress = ConnectProgress(state, self.ssid, reason)
+        with self._lock:
+            if self.history[-1].is_terminal or self.history[-1].state == state:
+                return
+            self.history.append(progress)
+            listeners = self._listeners
+        for callback in listeners:
+            try:
+                callback(progress)
+            except Exception as e:
+                print(f"接続状態の通知エラー: {e}")
+    
+    def cancel(self, reason: str = REASON_CANCELLED) -> bool:
+        """接続試行をキャンセルする
+        
+        Returns:
+            キャンセルできた場合True（すでに終わっていた場合はFalse）
+        """
+        with self._lock:
+            # 終了状態を報告した後（結果の記録前）も、終わった試行として扱う
+            if self._future.done() or self._cancel_reason is not None or self.history[-1].is_terminal:
+                return False
+            self._cancel_reason = reason
+            # _run は同じロックの中で _task を消してから終わるため、ここではループがまだ閉じていない
+            if self._task is not None:
+                self._loop.call_soon_threadsafe(self._task.cancel)
+        return True
+    
+    def done(self) -> bool:
+        """接続試行が終わったか"""
+        return self._future.done()
+    
+    def result(self, timeout: Optional[float] = None) -> bool:
+        """接続試行の終了を待つ（ブロックする）
+        
+        Returns:
+            接続できた場合True
+        
+        Raises:
+            TimeoutError: timeout 秒以内に終わらなかった場合
+        """
+        return self._future.result(timeout)
+    
+    async def wait(self) -> bool:
+        """接続試行の終了を待つ（イベントループを止めない）
+        
+        呼び出し元がキャンセルされても接続試行はキャンセルされません。
+        """
+        return await asyncio.shield(asyncio.wrap_future(self._future))
+    
+    async def iter_progress(self) -> AsyncIterator[ConnectProgress]:
+        """進行状態を順に返す非同期イテレーター（これまでの状態から始め、終了状態で止まる）"""
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        
+        def listener(progress: ConnectProgress):
+            loop.call_soon_threadsafe(queue.put_nowait, progress)
+        
+        # 登録とこれまでの状態の取得を同時に行い、取りこぼしも重複も起きないようにする
+        with self._lock:
+            self._listeners = self._listeners + [listener]
+            seen = list(self.history)
+        try:
+            for progress in seen:
+                yield progress
+                if progress.is_terminal:
+                    return
+            while True:
+                progress = await queue.get()
+                yield progress
+                if progress.is_terminal:
+                    return
+        finally:
+            with self._lock:
+                self._listeners = [c for c in self._listeners if c is not listener]
+    
+    async def _run(self, connect: Callable[[ProgressReporter], Awaitable[bool]]) -> bool:
+        """接続処理を制限時間付きで実行し、結果を記録する（ワーカースレッドで呼ばれる）"""
+        with self._lock:
+            self._loop = asyncio.get_running_loop()
+            self._task = asyncio.current_task()
+            cancel_reason = self._cancel_reason
+        try:
+            if cancel_reason is not None:
+                raise asyncio.CancelledError()
+            connected = await asyncio.wait_for(connect(self._report), self.timeout)
+        except asyncio.CancelledError:
+            self._report(CONNECT_CANCELLED, self._cancel_reason or REASON_CANCELLED)
+            connected = False
+        except asyncio.TimeoutError:
+            self._report(CONNECT_FAILED, REASON_TIMEOUT)
+            connected = False
+        except Exception as e:
+            self._report(CONNECT_FAILED, str(e))
+            connected = False
+        else:
+            if connected:
+                self._report(CONNECT_CONNECTED)
+            else:
+                self._report(CONNECT_FAILED)
+        with self._lock:
+            self._loop = None
+            self._task = None
+            self._future.set_result(connected)
+        return connected
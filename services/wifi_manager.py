@@ -1,5 +1,325 @@
+import asyncio
 import platform
-from typing import List, Optional
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple, Union
+from models.scan_result import ScanResult
+from models.wifi_config import EncryptedPassword, reveal_password
+from services.wifi_connect import (
+    CONNECT_ASSOCIATING, CONNECT_AUTHENTICATING, CONNECT_OBTAINING_IP, REASON_SUPERSEDED,
+    ConnectAttempt, ProgressReporter,
+)
+from services.simulated_wifi import SimulatedWiFi, create_simulator, simulator_from_env
+from services.scan_parser import IwScanParser, ScanParser, WpaCliScanParser, read_scan_results
+from services.wpa_ctrl import (
+    EVENT_CONNECTED, EVENT_DISCONNECTED, EVENT_SCAN_RESULTS,
+    EventDispatcher, WpaCtrlClient, WpaEvent, WpaEventMonitor, find_ctrl_socket,
+)
+
+# スキャン全体の制限時間（秒）
+SCAN_TIMEOUT = 8.0
+
+# スキャン方法の判定で1つの方法を試す制限時間（秒）。3つの方法を順に試しても SCAN_TIMEOUT に収まる長さ
+PROBE_TIMEOUT = 2.5
+
+# スキャン結果を再利用する時間（秒）。user_settings.scan_interval_seconds の既定値と同じ
+DEFAULT_SCAN_CACHE_TTL = 300.0
+
+# イベント監視できない環境で接続状態を確認する間隔（秒）。スキャンしないので短くてよい
+CONNECTION_POLL_INTERVAL = 15.0
+
+# 接続全体の制限時間（秒）
+CONNECT_TIMEOUT = 30.0
+
+# wpa_supplicant の状態（STATUS の wpa_state）→ 接続試行の進行状態
+_WPA_STATE_PROGRESS = {
+    "SCANNING": CONNECT_ASSOCIATING,
+    "AUTHENTICATING": CONNECT_ASSOCIATING,
+    "ASSOCIATING": CONNECT_ASSOCIATING,
+    "ASSOCIATED": CONNECT_AUTHENTICATING,
+    "4WAY_HANDSHAKE": CONNECT_AUTHENTICATING,
+    "GROUP_HANDSHAKE": CONNECT_AUTHENTICATING,
+    "COMPLETED": CONNECT_OBTAINING_IP,
+}
+
+# 接続試行を実行するスレッド（新しい試行が古い試行を置き換える間も並行して動けるように複数）
+_connect_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="wifi-connect")
+
+# 同期呼び出し用のスキャンを実行するスレッド（同時に複数のスキャンは行わない）
+_scan_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="wifi-scan")
+
+
+@dataclass(frozen=True)
+class ScanSnapshot:
+    """スキャン結果とスキャンした時刻"""
+    results: List[ScanResult]  # SSIDごとに最も信号の強いBSS（信号の強い順）
+    scanned_at: float  # time.monotonic() の値
+    
+    @property
+    def networks(self) -> List[str]:
+        """SSID名のリスト（信号の強い順）"""
+        return [result.ssid for result in self.results]
+    
+    @property
+    def age(self) -> float:
+        """スキャンしてからの経過秒数"""
+        return max(time.monotonic() - self.scanned_at, 0.0)
+
+
+class ScanCache:
+    """スキャン結果のキャッシュ
+    
+    ttl 秒以内の結果はスキャンせずに返します。スキャン中に別の呼び出しがあった
+    場合は新しくスキャンせず、実行中のスキャンの結果を共有します（single-flight）。
+    共有は concurrent.futures.Future で行うため、UIのイベントループと
+    同期呼び出し用のワーカースレッドのように、別のイベントループからの
+    呼び出しでも1回のスキャンにまとめられます。
+    
+    待っている呼び出しがすべてキャンセルされた場合のみ、スキャン自体をキャンセルします。
+    """
+    
+    def __init__(self, ttl: float = DEFAULT_SCAN_CACHE_TTL):
+        """
+        Args:
+            ttl: 結果を再利用する時間（秒）。0以下の場合はキャッシュしない
+        """
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._snapshot: Optional[ScanSnapshot] = None
+        self._inflight: Optional[Future] = None
+        self._task: Optional[asyncio.Task] = None
+        self._waiters = 0
+    
+    def peek(self) -> Optional[ScanSnapshot]:
+        """有効期限内の結果を返す（ない場合はNone）"""
+        with self._lock:
+            return self._fresh_snapshot()
+    
+    def invalidate(self):
+        """キャッシュした結果を破棄する（実行中のスキャンはそのまま）"""
+        with self._lock:
+            self._snapshot = None
+    
+    def put(self, results: List[ScanResult]) -> ScanSnapshot:
+        """スキャンせずに届いた結果（wpa_supplicant のイベントなど）を保存する"""
+        snapshot = ScanSnapshot(list(results), time.monotonic())
+        with self._lock:
+            if self.ttl > 0:
+                self._snapshot = snapshot
+        return snapshot
+    
+    def _fresh_snapshot(self) -> Optional[ScanSnapshot]:
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.age < self.ttl:
+            return snapshot
+        return None
+    
+    async def get(self, scan: Callable[[], Awaitable[List[ScanResult]]], force_refresh: bool = False) -> ScanSnapshot:
+        """キャッシュした結果を返す。期限切れの場合はスキャンする
+        
+        Args:
+            scan: スキャンを実行するコルーチン関数
+            force_refresh: Trueの場合はキャッシュを使わない（実行中のスキャンには合流する）
+            
+        Raises:
+            asyncio.CancelledError: 呼び出し元またはスキャンがキャンセルされた場合
+        """
+        with self._lock:
+            if not force_refresh:
+                snapshot = self._fresh_snapshot()
+                if snapshot is not None:
+                    return snapshot
+            inflight = self._inflight
+            if inflight is None:
+                inflight = Future()
+                self._inflight = inflight
+                self._task = asyncio.get_running_loop().create_task(self._run(scan, inflight))
+            self._waiters += 1
+        
+        try:
+            # 呼び出し元のキャンセルがスキャン自体に伝わらないよう shield で包む
+            return await asyncio.shield(asyncio.wrap_future(inflight))
+        except asyncio.CancelledError:
+            with self._lock:
+                if self._inflight is inflight and self._waiters == 1:
+                    # 最後の1人がキャンセルしたのでスキャンも止める
+                    task = self._task
+                    self._inflight = None
+                    self._task = None
+                    task.get_loop().call_soon_threadsafe(task.cancel)
+            raise
+        finally:
+            with self._lock:
+                self._waiters -= 1
+    
+    async def _run(self, scan: Callable[[], Awaitable[List[ScanResult]]], inflight: Future):
+        try:
+            results = await scan()
+        except BaseException as e:
+            self._finish(inflight)
+            if isinstance(e, asyncio.CancelledError):
+                inflight.cancel()
+            else:
+                inflight.set_exception(e)
+            return
+        snapshot = ScanSnapshot(list(results), time.monotonic())
+        with self._lock:
+            if self.ttl > 0:
+                self._snapshot = snapshot
+        self._finish(inflight)
+        inflight.set_result(snapshot)
+    
+    def _finish(self, inflight: Future):
+        with self._lock:
+            if self._inflight is inflight:
+                self._inflight = None
+                self._task = None
+
+
+@dataclass(frozen=True)
+class ProbeTiming:
+    """スキャン方法の判定で1つの方法を試した結果"""
+    backend: str
+    ok: bool
+    seconds: float
+    error: Optional[str] = None
+
+
+class ScanBackendSelector:
+    """使えるスキャン方法の判定結果と、判定をやり直すタイミングの管理
+    
+    判定で見つかった方法は、連続で failure_threshold 回失敗するまで使い続けます。
+    どの方法も使えなかった場合は、次の判定まで backoff_base 秒から倍々に
+    （最大 backoff_max 秒まで）間隔を空けます。
+    """
+    
+    def __init__(self, failure_threshold: int = 3, backoff_base: float = 30.0, backoff_max: float = 1800.0):
+        """
+        Args:
+            failure_threshold: 判定をやり直すまでの連続失敗回数
+            backoff_base: どの方法も使えなかった場合に次の判定まで待つ秒数（初回）
+            backoff_max: 次の判定まで待つ秒数の上限
+        """
+        self.failure_threshold = failure_threshold
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.backend: Optional[str] = None
+        self.timings: List[ProbeTiming] = []
+        self.probed_at: Optional[float] = None
+        self.probe_count = 0
+        self.failures = 0
+        self._failed_probes = 0
+        self._next_probe_at = 0.0
+        self._lock = threading.Lock()
+    
+    def needs_probe(self) -> bool:
+        """今スキャン方法を判定するべきか"""
+        with self._lock:
+            return self.backend is None and time.monotonic() >= self._next_probe_at
+    
+    def record_probe(self, backend: Optional[str], timings: List[ProbeTiming]):
+        """判定結果を記録する
+        
+        Args:
+            backend: 使える方法（どれも使えなかった場合はNone）
+            timings: 試した方法ごとの結果
+        """
+        with self._lock:
+            self.backend = backend
+            self.timings = list(timings)
+            self.probed_at = time.time()
+            self.probe_count += 1
+            self.failures = 0
+            if backend is None:
+                delay = min(self.backoff_base * (2 ** self._failed_probes), self.backoff_max)
+                self._failed_probes += 1
+                self._next_probe_at = time.monotonic() + delay
+            else:
+                self._failed_probes = 0
+    
+    def record_success(self):
+        """選択中の方法でスキャンできた"""
+        with self._lock:
+            self.failures = 0
+    
+    def record_failure(self):
+        """選択中の方法でスキャンできなかった（連続で閾値に達したら次回判定し直す）"""
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.failure_threshold:
+                self.backend = None
+                self.failures = 0
+                self._next_probe_at = 0.0
+    
+    def info(self) -> dict:
+        """判定状況を辞書で返す"""
+        with self._lock:
+            return {
+                "backend": self.backend,
+                "probed_at": self.probed_at,
+                "probe_count": self.probe_count,
+                "probe_timings": [
+                    {"backend": t.backend, "ok": t.ok, "seconds": t.seconds, "error": t.error}
+                    for t in self.timings
+                ],
+                "consecutive_failures": self.failures,
+                "next_probe_in": max(self._next_probe_at - time.monotonic(), 0.0) if self.backend is None else None,
+            }
+
+
+class PollingEventSource:
+    """wpa_supplicant のイベントを受け取れない環境で、接続状態を定期的に確認して
+    イベントを作るスレッド（イベント監視の代わり）
+    
+    作るイベントは接続先が変わったときの EVENT_CONNECTED / EVENT_DISCONNECTED です。
+    wpa_supplicant のイベントと違い、text にはBSSIDなどの詳細は入りません。
+    電波を使うスキャンは行いません（定期スキャンは AdaptiveScanScheduler が行い、
+    スキャンのたびに EVENT_SCAN_RESULTS を配信します）。
+    """
+    
+    def __init__(self, wifi_manager: "WiFiManager", on_event: Callable[[WpaEvent], None], interval: float):
+        """
+        Args:
+            wifi_manager: 接続状態の確認に使うWi-Fiマネージャー
+            on_event: イベントを受け取る関数（ポーリングのスレッドで呼ばれる）
+            interval: 確認する間隔（秒）
+        """
+        self.wifi_manager = wifi_manager
+        self.on_event = on_event
+        self.interval = interval
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def start(self):
+        """ポーリングを開始する"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._run, name="wifi-event-polling", daemon=True)
+            self._thread.start()
+    
+    def stop(self):
+        """ポーリングを停止する"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+    
+    def _run(self):
+        current = self.wifi_manager.get_current_network()
+        while not self._stop_event.wait(self.interval):
+            try:
+                network = self.wifi_manager.get_current_network()
+            except Exception as e:
+                print(f"Wi-Fi状態のポーリングエラー: {e}")
+                continue
+            if network != current:
+                if current is not None:
+                    self.on_event(WpaEvent(EVENT_DISCONNECTED))
+                if network is not None:
+                    self.on_event(WpaEvent(EVENT_CONNECTED))
+                current = network
 
 
 class WiFiManager:
@@ -9,91 +329,320 @@ class WiFiManager:
     開発環境（Windows/Mac等）ではモックデータを返します。
     """
     
-    def __init__(self):
+    def __init__(self, scan_cache_ttl: float = DEFAULT_SCAN_CACHE_TTL, wpa_ctrl_path: Optional[str] = None,
+                 simulator: Union[None, str, SimulatedWiFi] = None):
+        """
+        Args:
+            scan_cache_ttl: スキャン結果を再利用する時間（秒）
+            wpa_ctrl_path: wpa_supplicant の制御ソケットのパス（省略時は標準の場所から探す）
+            simulator: スキャンと接続をシミュレーションに置き換える場合に指定
+                （create_simulator() の spec でも可）。省略時は環境変数
+                MY_CONNECT_WIFI_SIMULATOR の指定に従う
+        """
         self.platform = platform.system()
         self.is_android = self.platform == "Android"
+        if isinstance(simulator, str):
+            simulator = create_simulator(simulator)
+        self.simulator: Optional[SimulatedWiFi] = simulator if simulator is not None else simulator_from_env()
+        self.scan_cache = ScanCache(scan_cache_ttl)
+        self.scan_backend = ScanBackendSelector()
+        self.wpa_ctrl_path = wpa_ctrl_path
+        self._wpa_ctrl: Optional[WpaCtrlClient] = None
+        # スキャン・接続・イベント監視の各スレッドから使われるため、作成と破棄を排他する
+        self._wpa_ctrl_lock = threading.Lock()
+        # wpa_supplicant のイベント（監視できない環境ではポーリングで作ったイベント）の配信先
+        self.event_dispatcher = EventDispatcher()
+        self._event_monitor: Optional[WpaEventMonitor] = None
+        self._event_poller: Optional[PollingEventSource] = None
+        # インターフェースごとの実行中の接続試行
+        self._connect_attempts: Dict[str, ConnectAttempt] = {}
+        self._connect_lock = threading.Lock()
+        # スキャン方法（判定時に上から順に試す）
+        self._scan_backends: Dict[str, Callable[[], Awaitable[List[ScanResult]]]] = {
+            "wpa_ctrl": self._scan_with_wpa_ctrl,
+            "iw": self._scan_with_iw,
+            "wpa_cli": self._scan_with_wpa_cli,
+        }
     
-    def scan_networks(self) -> List[str]:
-        """利用可能なWi-Fiネットワークをスキャン
+    def scan_networks(self, timeout: Optional[float] = SCAN_TIMEOUT, force_refresh: bool = False) -> List[str]:
+        """利用可能なWi-Fiネットワークをスキャン（同期版）
+        
+        scan_networks_cached() をワーカースレッドで実行して結果を待ちます。
+        呼び出し元のスレッドでイベントループが動いていても使えますが、
+        UIのイベントハンドラからは scan_networks_cached() か start_scan() を使ってください。
         
+        Args:
+            timeout: スキャン全体の制限時間（秒）
+            force_refresh: Trueの場合はキャッシュした結果を使わない
+            
         Returns:
             SSID名のリスト
+        
+        Raises:
+            asyncio.TimeoutError, RuntimeError: Androidでスキャンできなかった場合
         """
-        if self.is_android:
-            return self._scan_networks_android()
-        else:
+        return self.start_scan(timeout, force_refresh).result().networks
+    
+    def start_scan(self, timeout: Optional[float] = SCAN_TIMEOUT, force_refresh: bool = False) -> Future:
+        """ワーカースレッドでスキャンを開始する
+        
+        Returns:
+            ScanSnapshot を結果に持つ concurrent.futures.Future
+        """
+        return _scan_executor.submit(asyncio.run, self.scan_networks_cached(timeout, force_refresh))
+    
+    async def scan_networks_cached(self, timeout: Optional[float] = SCAN_TIMEOUT,
+                                   force_refresh: bool = False) -> ScanSnapshot:
+        """キャッシュを使ってスキャン結果を取得（非同期版）
+        
+        scan_cache.ttl 秒以内の結果があればスキャンせずに返し、スキャン中であれば
+        その結果を待ちます。結果の age でスキャンからの経過秒数がわかります。
+        
+        Args:
+            timeout: スキャン全体の制限時間（秒）
+            force_refresh: Trueの場合はキャッシュした結果を使わない
+        """
+        return await self.scan_cache.get(lambda: self.scan_results_async(timeout), force_refresh)
+    
+    async def scan_networks_async(self, timeout: Optional[float] = SCAN_TIMEOUT) -> List[str]:
+        """利用可能なWi-Fiネットワークをスキャン（非同期版）
+        
+        Args:
+            timeout: スキャン全体の制限時間（秒）。Noneの場合は各コマンドの制限時間のみ
+            
+        Returns:
+            SSID名のリスト（信号の強い順。Android以外の開発環境ではモックデータ）
+        
+        Raises:
+            asyncio.TimeoutError, RuntimeError: Androidでスキャンできなかった場合
+        """
+        return [result.ssid for result in await self.scan_results_async(timeout)]
+    
+    async def scan_results_async(self, timeout: Optional[float] = SCAN_TIMEOUT) -> List[ScanResult]:
+        """利用可能なWi-Fiネットワークをスキャンし、BSSID・周波数・信号強度なども返す
+        
+        外部コマンドは asyncio のサブプロセスとして実行するため、待機中も
+        イベントループを止めません。タスクがキャンセルされた場合や制限時間を
+        過ぎた場合は、実行中のコマンドを終了させます。
+        
+        Androidでスキャンできなかった場合は、モックデータではなく例外を送出します
+        （実在しないネットワークをキャッシュしたり、自動接続の候補にしたりしないため）。
+        
+        Args:
+            timeout: スキャン全体の制限時間（秒）。Noneの場合は各コマンドの制限時間のみ
+            
+        Returns:
+            SSIDごとに最も信号の強いBSSのリスト（信号の強い順。Android以外の開発環境ではモックデータ）
+            
+        Raises:
+            asyncio.CancelledError: タスクがキャンセルされた場合
+            asyncio.TimeoutError: 制限時間内にスキャンが終わらなかった場合（Android・シミュレーション）
+            RuntimeError: 使えるスキャン方法がない・スキャンに失敗した場合（Android・シミュレーション）
+        """
+        if self.simulator is not None:
+            # 負荷試験用のシミュレーション（タイムアウトや失敗は呼び出し元にそのまま伝える）
+            return await asyncio.wait_for(self.simulator.scan_async(), timeout)
+        
+        if not self.is_android:
             # 開発環境用のモックデータ
-            return self._scan_networks_mock()
+            return self._scan_results_mock()
+        
+        try:
+            return await asyncio.wait_for(self._scan_results_android(), timeout)
+        except asyncio.TimeoutError:
+            print(f"Wi-Fiスキャンが{timeout}秒以内に完了しませんでした")
+            raise
     
-    def _scan_networks_android(self) -> List[str]:
+    async def _scan_results_android(self) -> List[ScanResult]:
         """Android環境でのWi-Fiスキャン
         
-        Note: subprocessを使ってシステムのWi-Fi情報を取得します
+        Note: サブプロセスでシステムのWi-Fi情報を取得します。使えるスキャン方法は
+        最初のスキャンで判定して scan_backend に記録し、以降はその方法だけを使います。
+        
+        Raises:
+            RuntimeError: 使えるスキャン方法がない場合、選択中の方法でスキャンできなかった場合
         """
+        selector = self.scan_backend
+        backend = selector.backend
+        if backend is None:
+            if not selector.needs_probe():
+                # 判定をやり直すまでは、使えない方法を毎回試さない
+                raise RuntimeError("使えるWi-Fiスキャンの方法がありません")
+            backend, results = await self._probe_scan_backend()
+            if backend is None:
+                print("Wi-Fi scanning not available")
+                raise RuntimeError("使えるWi-Fiスキャンの方法がありません")
+            return results
+        
         try:
-            import subprocess
-            
-            # 方法1: iw または wpa_cli コマンドを試す
-            try:
-                result = subprocess.run(
-                    ['su', '-c', 'iw', 'dev', 'wlan0', 'scan'],
-                    capture_output=True,
-                    text=True,
-                    timeout=5
-                )
-                
-                if result.returncode == 0:
-                    # SSIDを抽出
-                    ssids = []
-                    for line in result.stdout.split('\n'):
-                        if 'SSID:' in line:
-                            ssid = line.split('SSID:')[1].strip()
-                            if ssid and ssid not in ssids:
-                                ssids.append(ssid)
-                    if ssids:
-                        return ssids
-            except Exception as e:
-                print(f"Method 1 failed: {e}")
-            
-            # 方法2: wpa_cliを試す
+            results = await self._scan_backends[backend]()
+        except Exception as e:
+            print(f"{backend} でのWi-Fiスキャンに失敗しました: {e!r}")
+            selector.record_failure()
+            raise RuntimeError(f"{backend} でのWi-Fiスキャンに失敗しました: {e}") from e
+        selector.record_success()
+        return results
+    
+    async def probe_scan_backend(self) -> Optional[str]:
+        """使えるスキャン方法を判定し直す
+        
+        通常は最初のスキャンで自動的に判定されます。起動時に呼んでおくと
+        最初のスキャンで判定を待たずに済みます。
+        
+        Returns:
+            使えるスキャン方法の名前（どれも使えない場合はNone）
+        """
+        if not self.is_android:
+            return None
+        backend, _ = await self._probe_scan_backend()
+        return backend
+    
+    async def _probe_scan_backend(self) -> Tuple[Optional[str], List[ScanResult]]:
+        """スキャン方法を順に試し、最初に成功した方法とそのスキャン結果を返す
+        
+        1つの方法は PROBE_TIMEOUT 秒で打ち切ります。スキャン全体の制限時間などで
+        判定自体がキャンセルされた場合も、それまでの結果を「使える方法なし」として
+        記録するため、次の判定までは毎回のスキャンで判定をやり直しません。
+        """
+        timings = []
+        for name, scan in self._scan_backends.items():
+            start = time.monotonic()
             try:
-                result = subprocess.run(
-                    ['wpa_cli', 'scan'],
-                    capture_output=True,
-                    text=True,
-                    timeout=2
-                )
-                
-                if result.returncode == 0:
-                    # スキャン結果を取得
-                    result = subprocess.run(
-                        ['wpa_cli', 'scan_results'],
-                        capture_output=True,
-                        text=True,
-                        timeout=2
-                    )
-                    
-                    if result.returncode == 0:
-                        ssids = []
-                        lines = result.stdout.split('\n')[1:]  # ヘッダーをスキップ
-                        for line in lines:
-                            parts = line.split()
-                            if len(parts) >= 5:
-                                ssid = ' '.join(parts[4:])
-                                if ssid and ssid not in ssids:
-                                    ssids.append(ssid)
-                        if ssids:
-                            return ssids
+                results = await asyncio.wait_for(scan(), PROBE_TIMEOUT)
+            except asyncio.CancelledError:
+                timings.append(ProbeTiming(name, False, time.monotonic() - start, "cancelled"))
+                self.scan_backend.record_probe(None, timings)
+                raise
             except Exception as e:
-                print(f"Method 2 failed: {e}")
-            
-            # どちらも失敗した場合、開発用モックデータを返す
-            print("Wi-Fi scanning not available, using mock data")
-            return self._scan_networks_mock()
+                print(f"Method {name} failed: {e!r}")
+                timings.append(ProbeTiming(name, False, time.monotonic() - start, repr(e)))
+                continue
+            timings.append(ProbeTiming(name, True, time.monotonic() - start))
+            self.scan_backend.record_probe(name, timings)
+            return name, results
+        self.scan_backend.record_probe(None, timings)
+        return None, []
+    
+    def _get_wpa_ctrl(self) -> Optional[WpaCtrlClient]:
+        """wpa_supplicant の制御ソケットのクライアント（ソケットがない場合はNone）
+        
+        接続は使い回します。ソケットの場所が変わった場合は作り直します。
+        """
+        path = self.wpa_ctrl_path or find_ctrl_socket()
+        if path is None:
+            return None
+        with self._wpa_ctrl_lock:
+            if self._wpa_ctrl is None or self._wpa_ctrl.ctrl_path != path:
+                if self._wpa_ctrl is not None:
+                    self._wpa_ctrl.close()
+                self._wpa_ctrl = WpaCtrlClient(path)
+            return self._wpa_ctrl
+    
+    async def _scan_with_wpa_ctrl(self) -> List[ScanResult]:
+        """wpa_supplicant の制御ソケットでスキャン（wpa_cli を起動しない）
+        
+        スキャン完了のイベントを待ってから結果を読むため、前回のスキャン結果は返しません。
+        
+        Raises:
+            RuntimeError: 制御ソケットが見つからない場合、スキャンを拒否された・失敗した場合
+            TimeoutError: SCAN_TIMEOUT 秒以内にスキャンが終わらなかった場合
+            OSError: 制御ソケットに接続できない場合
+        """
+        client = self._get_wpa_ctrl()
+        if client is None:
+            raise RuntimeError("wpa_supplicant の制御ソケットが見つかりません")
+        return await client.scan_and_wait_async(SCAN_TIMEOUT)
+    
+    async def _scan_with_iw(self) -> List[ScanResult]:
+        """`iw` コマンドでスキャン（root権限が必要）
+        
+        Raises:
+            RuntimeError: コマンドが失敗した場合
+        """
+        returncode, results = await self._run_scan_command(
+            ['su', '-c', 'iw', 'dev', 'wlan0', 'scan'], IwScanParser(), timeout=5
+        )
+        if returncode != 0:
+            raise RuntimeError(f"iw の終了コード: {returncode}")
+        return results
+    
+    async def _scan_with_wpa_cli(self) -> List[ScanResult]:
+        """`wpa_cli` コマンドでスキャン
+        
+        Raises:
+            RuntimeError: コマンドが失敗した場合
+        """
+        returncode, _ = await self._run_command(['wpa_cli', 'scan'], timeout=2)
+        if returncode != 0:
+            raise RuntimeError(f"wpa_cli scan の終了コード: {returncode}")
+        # スキャン結果を取得
+        returncode, results = await self._run_scan_command(['wpa_cli', 'scan_results'], WpaCliScanParser(), timeout=2)
+        if returncode != 0:
+            raise RuntimeError(f"wpa_cli scan_results の終了コード: {returncode}")
+        return results
+    
+    def get_scan_backend_info(self) -> dict:
+        """スキャン方法の判定状況を返す（表示・診断用）
+        
+        Returns:
+            backend（使用中の方法。開発環境では "mock"、シミュレーションではその種類）、
+            probed_at（判定した時刻）、probe_timings（方法ごとの所要時間と結果）などを含む辞書
+        """
+        info = self.scan_backend.info()
+        if self.simulator is not None:
+            info["backend"] = self.simulator.kind
+        elif not self.is_android:
+            info["backend"] = "mock"
+        return info
+    
+    async def _run_command(self, args: List[str], timeout: float) -> Tuple[int, str]:
+        """外部コマンドを実行して (終了コード, 標準出力) を返す
+        
+        Raises:
+            asyncio.TimeoutError: timeout秒以内に終了しなかった場合
+        """
+        process = await self._start_process(args)
+        try:
+            stdout, _ = await asyncio.wait_for(process.communicate(), timeout)
+        except BaseException:
+            await self._kill_process(process)
+            raise
+        return process.returncode, stdout.decode('utf-8', errors='replace')
+    
+    async def _run_scan_command(self, args: List[str], parser: ScanParser,
+                                timeout: float) -> Tuple[int, List[ScanResult]]:
+        """スキャンのコマンドを実行し、出力を読みながら解析する
+        
+        Returns:
+            (終了コード, SSIDごとに最も信号の強いBSSのリスト)
             
-        except Exception as e:
-            print(f"Wi-Fiスキャンエラー: {e}")
-            return self._scan_networks_mock()
+        Raises:
+            asyncio.TimeoutError: timeout秒以内に終了しなかった場合
+        """
+        process = await self._start_process(args)
+        
+        async def read_all():
+            results = await read_scan_results(process.stdout, parser)
+            return await process.wait(), results
+        
+        try:
+            return await asyncio.wait_for(read_all(), timeout)
+        except BaseException:
+            await self._kill_process(process)
+            raise
+    
+    async def _start_process(self, args: List[str]) -> asyncio.subprocess.Process:
+        return await asyncio.create_subprocess_exec(
+            *args,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+    
+    async def _kill_process(self, process: asyncio.subprocess.Process):
+        """タイムアウト・キャンセル時にコマンドを残さない"""
+        if process.returncode is None:
+            process.kill()
+            await process.wait()
     
     def _scan_networks_mock(self) -> List[str]:
         """開発環境用のモックスキャン"""
@@ -105,21 +654,124 @@ class WiFiManager:
             "Guest_Network"
         ]
     
-    def connect_to_network(self, ssid: str, password: str) -> bool:
+    def _scan_results_mock(self) -> List[ScanResult]:
+        """開発環境用のモックスキャン（BSSIDや信号強度は固定の値）"""
+        return [
+            ScanResult(
+                ssid=ssid,
+                bssid=f"02:00:00:00:00:{i:02x}",
+                freq=5180 if ssid.endswith("5G") else 2437,
+                signal_dbm=-40.0 - 5 * i,
+                flags=("ESS",) if "Free" in ssid else ("WPA2-PSK-CCMP", "ESS"),
+            )
+            for i, ssid in enumerate(self._scan_networks_mock())
+        ]
+    
+    def connect_to_network(self, ssid: str, password: Union[str, EncryptedPassword]) -> bool:
         """指定のWi-Fiネットワークに接続
         
         Args:
             ssid: 接続先のSSID
-            password: パスワード
+            password: パスワード（暗号化済みの場合はここで初めて復号化します）
             
         Returns:
             接続成功した場合True
         """
+        password = reveal_password(password)
+        if self.simulator is not None:
+            return self.simulator.connect(ssid, password)
         if self.is_android:
             return self._connect_to_network_android(ssid, password)
         else:
             return self._connect_to_network_mock(ssid, password)
     
+    def connect_async(self, ssid: str, password: Union[str, EncryptedPassword],
+                      timeout: Optional[float] = CONNECT_TIMEOUT, interface: str = "wlan0",
+                      on_progress: Optional[Callable] = None,
+                      supersede: bool = True) -> Optional[ConnectAttempt]:
+        """Wi-Fiへの接続をワーカースレッドで開始し、すぐにハンドルを返す
+        
+        同じインターフェースで実行中の接続試行があれば、それをキャンセル
+        （理由は REASON_SUPERSEDED）してから新しい試行を始めます。
+        supersede=False の場合は、実行中の接続試行を残して何もしません。
+        
+        Note: Android の接続処理のように内部でブロックする処理は、キャンセルや
+        制限時間切れで結果を待つのをやめるだけで、処理自体は最後まで実行されます。
+        
+        Args:
+            ssid: 接続先のSSID
+            password: パスワード（暗号化済みの場合はワーカースレッドで復号化します）
+            timeout: 接続全体の制限時間（秒）。過ぎた場合は CONNECT_FAILED（REASON_TIMEOUT）
+            interface: 接続するインターフェース
+            on_progress: 進行状態（ConnectProgress）を受け取るコールバック（ワーカースレッドで呼ばれる）
+            supersede: Falseの場合は実行中の接続試行をキャンセルしない（自動接続などで使う）
+            
+        Returns:
+            キャンセルや結果の取得に使う ConnectAttempt
+            （supersede=False で実行中の接続試行があった場合はNone）
+        """
+        attempt = ConnectAttempt(ssid, interface, timeout)
+        if on_progress is not None:
+            attempt.add_progress_listener(on_progress)
+        with self._connect_lock:
+            previous = self._connect_attempts.get(interface)
+            if not supersede and previous is not None and not previous.done():
+                return None
+            self._connect_attempts[interface] = attempt
+        if previous is not None:
+            previous.cancel(REASON_SUPERSEDED)
+        
+        future = _connect_executor.submit(
+            asyncio.run, attempt._run(lambda report: self._connect_steps(ssid, password, report))
+        )
+        future.add_done_callback(lambda _: self._forget_connect_attempt(attempt))
+        return attempt
+    
+    def _forget_connect_attempt(self, attempt: ConnectAttempt):
+        with self._connect_lock:
+            if self._connect_attempts.get(attempt.interface) is attempt:
+                del self._connect_attempts[attempt.interface]
+    
+    def get_connect_attempt(self, interface: str = "wlan0") -> Optional[ConnectAttempt]:
+        """インターフェースで実行中の接続試行（ない場合はNone）"""
+        with self._connect_lock:
+            return self._connect_attempts.get(interface)
+    
+    async def _connect_steps(self, ssid: str, password: Union[str, EncryptedPassword],
+                             report: ProgressReporter) -> bool:
+        """接続処理の本体（進行状態を report で報告し、接続できたかを返す）"""
+        password = reveal_password(password)
+        if self.simulator is not None:
+            return await self.simulator.connect_async(ssid, password, report)
+        
+        report(CONNECT_ASSOCIATING)
+        if not self.is_android:
+            report(CONNECT_AUTHENTICATING)
+            report(CONNECT_OBTAINING_IP)
+            return self._connect_to_network_mock(ssid, password)
+        
+        if not await asyncio.to_thread(self._connect_to_network_android, ssid, password):
+            return False
+        return await self._follow_wpa_state(ssid, report)
+    
+    async def _follow_wpa_state(self, ssid: str, report: ProgressReporter, poll_interval: float = 0.25) -> bool:
+        """wpa_supplicant の STATUS を確認しながら、IPアドレスを取得するまで待つ
+        
+        制限時間は呼び出し元（ConnectAttempt）が管理します。
+        """
+        client = self._get_wpa_ctrl()
+        if client is None:
+            # 状態を確認できないので、接続処理の結果をそのまま使う
+            return True
+        while True:
+            status = await client.status_async()
+            state = _WPA_STATE_PROGRESS.get(status.get("wpa_state", ""))
+            if state is not None:
+                report(state)
+            if status.get("wpa_state") == "COMPLETED" and status.get("ip_address"):
+                return status.get("ssid") == ssid
+            await asyncio.sleep(poll_interval)
+    
     def _connect_to_network_android(self, ssid: str, password: str) -> bool:
         """Android環境でのWi-Fi接続
         
@@ -153,16 +805,23 @@ class WiFiManager:
         Returns:
             接続中のSSID、接続していない場合はNone
         """
+        if self.simulator is not None:
+            return self.simulator.current_network()
         if self.is_android:
             return self._get_current_network_android()
         else:
             return self._get_current_network_mock()
     
     def _get_current_network_android(self) -> Optional[str]:
-        """Android環境での現在の接続情報取得"""
+        """Android環境での現在の接続情報取得（wpa_supplicant の STATUS を使用）"""
         try:
-            # Android実装（将来的に実装）
-            return None
+            client = self._get_wpa_ctrl()
+            if client is None:
+                return None
+            status = client.status()
+            if status.get("wpa_state") != "COMPLETED":
+                return None
+            return status.get("ssid")
         except Exception as e:
             print(f"現在のネットワーク取得エラー: {e}")
             return None
@@ -190,3 +849,102 @@ class WiFiManager:
             pass
         except Exception as e:
             print(f"設定画面オープンエラー: {e}")
+    
+    def add_event_listener(self, callback: Callable[[WpaEvent], None],
+                           events: Optional[Iterable[str]] = None) -> Callable[[], None]:
+        """Wi-Fiのイベントを受け取るコールバックを登録する
+        
+        コールバックはイベント監視（またはポーリング）のスレッドで呼ばれます。
+        EVENT_SCAN_RESULTS の時点で scan_cache は新しい結果に更新済みです。
+        
+        Args:
+            callback: WpaEvent を受け取る関数
+            events: 受け取るイベント名（EVENT_CONNECTED など。省略時はすべて）
+            
+        Returns:
+            登録を解除する関数
+        """
+        return self.event_dispatcher.subscribe(callback, events)
+    
+    def iter_events(self, events: Optional[Iterable[str]] = None) -> AsyncIterator[WpaEvent]:
+        """Wi-Fiのイベントを順に返す非同期イテレーター
+        
+        Example:
+            async for event in wifi_manager.iter_events([EVENT_CONNECTED, EVENT_DISCONNECTED]):
+                ...
+        """
+        return self.event_dispatcher.iterate(events)
+    
+    @property
+    def event_source(self) -> Optional[str]:
+        """イベントの取得方法（"wpa_ctrl"、"polling"、監視していない場合はNone）"""
+        if self._event_monitor is not None:
+            return "wpa_ctrl"
+        if self._event_poller is not None:
+            return "polling"
+        return None
+    
+    def start_event_monitor(self, poll_interval: Optional[float] = None, wait: float = 1.0) -> Optional[str]:
+        """wpa_supplicant のイベント監視を開始する
+        
+        制御ソケットにモニターとして接続し、スキャン完了・接続・切断の
+        イベントを受け取ります。接続できない環境（開発環境を含む）では、
+        poll_interval が指定されていれば接続状態のポーリングで接続・切断の
+        イベントを作ります（スキャン完了のイベントは AdaptiveScanScheduler が配信します）。
+        
+        Args:
+            poll_interval: イベント監視できない場合のポーリング間隔（秒）。Noneの場合はポーリングしない
+            wait: モニターとして接続できるまで待つ時間（秒）
+            
+        Returns:
+            event_source と同じ値
+        """
+        if self.event_source is not None:
+            return self.event_source
+        
+        path = (self.wpa_ctrl_path or find_ctrl_socket()) if self.is_android else None
+        if path is not None:
+            monitor = WpaEventMonitor(path, self._on_wpa_event)
+            if monitor.start(wait=wait):
+                self._event_monitor = monitor
+                return self.event_source
+            monitor.stop()
+            print("wpa_supplicant のイベントを監視できないため、ポーリングします")
+        
+        if poll_interval is not None and poll_interval > 0:
+            self._event_poller = PollingEventSource(self, self.event_dispatcher.publish, poll_interval)
+            self._event_poller.start()
+        return self.event_source
+    
+    def stop_event_monitor(self):
+        """イベント監視（またはポーリング）を停止する"""
+        if self._event_monitor is not None:
+            self._event_monitor.stop()
+            self._event_monitor = None
+        if self._event_poller is not None:
+            self._event_poller.stop()
+            self._event_poller = None
+    
+    def _on_wpa_event(self, event: WpaEvent):
+        """wpa_supplicant のイベントを受け取り、必要ならキャッシュを更新してから配信する"""
+        if event.name == EVENT_SCAN_RESULTS:
+            # 他のアプリやシステムが行ったスキャンの結果も、スキャンせずに取り込む
+            try:
+                client = self._get_wpa_ctrl()
+                if client is not None:
+                    self.scan_cache.put(client.scan_results())
+            except (OSError, RuntimeError) as e:
+                print(f"スキャン結果の取得エラー: {e!r}")
+        self.event_dispatcher.publish(event)
+    
+    def close(self):
+        """イベント監視と実行中の接続試行を止め、wpa_supplicant の制御ソケットなど使用中の接続を閉じる"""
+        self.stop_event_monitor()
+        with self._connect_lock:
+            attempts = list(self._connect_attempts.values())
+        for attempt in attempts:
+            attempt.cancel()
+        with self._wpa_ctrl_lock:
+            if self._wpa_ctrl is not None:
+                self._wpa_ctrl.close()
+                self._wpa_ctrl = None
@@ -0,0 +1,149 @@
+from typing import Dict, Iterable, Iterator, List, Optional
+from models.wifi_config import WiFiConfig, today_epoch_day
+from services.priority_index import PriorityIndex
+
+
+class WiFiRepository:
+    """保存済みWi-Fi設定のメモリ上のリポジトリ
+    
+    優先順位順のインデックス（PriorityIndex）に加えて `ssid -> [WiFiConfig]` の
+    ハッシュインデックスを持ち、IDでもSSIDでも定数時間で検索できます。
+    add / put / remove を通して変更する限り、インデックスは常に一致します。
+    WiFiConfig の ssid や priority を直接変更した場合は put() を呼んでください。
+    """
+    
+    def __init__(self, configs: Iterable[WiFiConfig] = ()):
+        """
+        Args:
+            configs: 初期データ（順不同）
+        """
+        configs = list(configs)
+        self._index = PriorityIndex(configs)
+        self._by_ssid: Dict[str, List[WiFiConfig]] = {}
+        self._ssid_by_id: Dict[str, str] = {}
+        for wifi in configs:
+            self._add_ssid(wifi)
+    
+    def _add_ssid(self, wifi: WiFiConfig):
+        self._by_ssid.setdefault(wifi.ssid, []).append(wifi)
+        self._ssid_by_id[wifi.id] = wifi.ssid
+    
+    def _remove_ssid(self, wifi_id: str):
+        ssid = self._ssid_by_id.pop(wifi_id, None)
+        if ssid is None:
+            return
+        bucket = [w for w in self._by_ssid.get(ssid, []) if w.id != wifi_id]
+        if bucket:
+            self._by_ssid[ssid] = bucket
+        else:
+            self._by_ssid.pop(ssid, None)
+    
+    def add(self, wifi: WiFiConfig):
+        """追加する（同じIDが登録済みの場合は置き換える）"""
+        self.put(wifi)
+    
+    def put(self, wifi: WiFiConfig):
+        """追加・更新する。SSIDや優先順位が変わっていればインデックスを付け替える"""
+        self._index.put(wifi)
+        if self._ssid_by_id.get(wifi.id) == wifi.ssid:
+            bucket = self._by_ssid[wifi.ssid]
+            for i, w in enumerate(bucket):
+                if w.id == wifi.id:
+                    bucket[i] = wifi
+                    break
+            return
+        self._remove_ssid(wifi.id)
+        self._add_ssid(wifi)
+    
+    def remove(self, wifi_id: str) -> Optional[WiFiConfig]:
+        """IDで削除する
+        
+        Returns:
+            削除したWiFiConfig（登録されていない場合はNone）
+        """
+        self._remove_ssid(wifi_id)
+        return self._index.remove(wifi_id)
+    
+    def get(self, wifi_id: str) -> Optional[WiFiConfig]:
+        """IDでWiFiConfigを取得"""
+        return self._index.get(wifi_id)
+    
+    def find_by_ssid(self, ssid: str) -> List[WiFiConfig]:
+        """SSIDが一致するWiFiConfigを優先順位順に返す"""
+        bucket = self._by_ssid.get(ssid)
+        if not bucket:
+            return []
+        if len(bucket) == 1:
+            return list(bucket)
+        sort_key = self._index.sort_key
+        return sorted(bucket, key=lambda w: sort_key(w.id))
+    
+    def match_scan(self, scanned_ssids: Iterable[str]) -> List[WiFiConfig]:
+        """スキャンで見つかったSSIDに一致する保存済みWi-Fiを優先順位順に返す
+        
+        スキャン結果1件ごとにハッシュ検索するだけなので、保存件数に依存しません。
+        
+        Args:
+            scanned_ssids: スキャンで見つかったSSID（重複可）
+        """
+        by_ssid = self._by_ssid
+        matched = []
+        for ssid in set(scanned_ssids):
+            bucket = by_ssid.get(ssid)
+            if bucket:
+                matched.extend(bucket)
+        if len(matched) > 1:
+            sort_key = self._index.sort_key
+            matched.sort(key=lambda w: sort_key(w.id))
+        return matched
+    
+    def best_match(self, scanned_ssids: Iterable[str], today: Optional[int] = None) -> Optional[WiFiConfig]:
+        """スキャンで見つかったSSIDに一致する、除外されていない最も優先順位の高いWi-Fiを返す
+        
+        一致したものを並べ替えずに1回の走査で最小を求めるため、スキャン結果の件数に
+        比例した時間で済みます。
+        
+        Args:
+            scanned_ssids: スキャンで見つかったSSID（重複可）
+            today: 今日のエポック日（省略時は today_epoch_day()）
+        """
+        if today is None:
+            today = today_epoch_day()
+        by_ssid = self._by_ssid
+        sort_key = self._index.sort_key
+        best = None
+        best_key = None
+        for ssid in scanned_ssids:
+            for wifi in by_ssid.get(ssid, ()):
+                if wifi.is_ignored(today):
+                    continue
+                key = sort_key(wifi.id)
+                if best_key is None or key < best_key:
+                    best = wifi
+                    best_key = key
+        return best
+    
+    def next_priority(self) -> int:
+        """末尾に追加する場合の優先順位（最大値 + PRIORITY_STEP）"""
+        return self._index.next_priority()
+    
+    def index_of(self, wifi_id: str) -> int:
+        """優先順位順での位置（0始まり）を返す。見つからない場合は -1"""
+        return self._index.index_of(wifi_id)
+    
+    def move(self, wifi_id: str, position: int) -> List[WiFiConfig]:
+        """Wi-Fiを指定した位置へ移動し、優先順位を変更したWiFiConfigを返す（PriorityIndex.move を参照）"""
+        return self._index.move(wifi_id, position)
+    
+    def to_list(self) -> List[WiFiConfig]:
+        """優先順位順のリスト（コピー）を返す"""
+        return self._index.to_list()
+    
+    def __contains__(self, wifi_id: str) -> bool:
+        return wifi_id in self._index
+    
+    def __len__(self) -> int:
+        return len(self._index)
+    
+    def __iter__(self) -> Iterator[WiFiConfig]:
+        return iter(self._index)
@@ -0,0 +1,506 @@
+import asyncio
+import itertools
+import os
+import re
+import socket
+import stat
+import tempfile
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Callable, Deque, Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple
+from models.scan_result import ScanResult
+from services.scan_parser import StrongestBySsid, parse_wpa_cli_scan_results
+
+# wpa_supplicant の制御ソケットを探すディレクトリ（Android の新旧の場所と Linux の標準）
+DEFAULT_CTRL_DIRS = (
+    "/data/vendor/wifi/wpa/sockets",
+    "/data/misc/wifi/sockets",
+    "/var/run/wpa_supplicant",
+)
+
+# 応答の最大サイズ（SCAN_RESULTS はBSSが多いと数十KBになる）
+_MAX_REPLY = 65536
+
+# 要求の応答を待つ間に届いたイベントを取っておく件数
+_MAX_PENDING_EVENTS = 256
+
+# ローカル側のソケット名の連番（同じプロセスで複数のクライアントを作れるように）
+_local_counter = itertools.count()
+
+
+def find_ctrl_socket(interface: str = "wlan0", dirs: Sequence[str] = DEFAULT_CTRL_DIRS) -> Optional[str]:
+    """インターフェースの制御ソケットのパスを探す（見つからない場合はNone）"""
+    for directory in dirs:
+        path = os.path.join(directory, interface)
+        try:
+            if stat.S_ISSOCK(os.stat(path).st_mode):
+                return path
+        except OSError:
+            continue
+    return None
+
+
+class WpaCtrlClient:
+    """wpa_supplicant の制御インターフェース（AF_UNIX データグラムソケット）のクライアント
+    
+    wpa_cli を起動する代わりに、制御ソケットに直接コマンドを送ります。接続は
+    最初の要求で開き、以降の要求で使い回します。タイムアウトや送受信エラーの
+    後は接続を閉じ、次の要求で開き直します（遅れて届いた古い応答を受け取らないため）。
+    
+    要求はスレッド間で排他されるため、同じクライアントを複数のスレッドや
+    イベントループから使えます。
+    """
+    
+    def __init__(self, ctrl_path: str, timeout: float = 2.0, local_dir: Optional[str] = None):
+        """
+        Args:
+            ctrl_path: wpa_supplicant の制御ソケットのパス
+            timeout: 応答を待つ時間（秒）
+            local_dir: 応答を受け取るローカル側のソケットを作るディレクトリ（省略時は一時ディレクトリ）
+        """
+        self.ctrl_path = ctrl_path
+        self.timeout = timeout
+        self.local_dir = local_dir or tempfile.gettempdir()
+        self._sock: Optional[socket.socket] = None
+        self._local_path: Optional[str] = None
+        self._lock = threading.Lock()
+        # 要求の応答を待つ間に届いたイベント（receive() で先に返す）
+        self._pending_events: Deque[str] = deque(maxlen=_MAX_PENDING_EVENTS)
+    
+    @property
+    def is_open(self) -> bool:
+        return self._sock is not None
+    
+    def open(self):
+        """制御ソケットに接続する（接続済みの場合は何もしない）
+        
+        Raises:
+            OSError: ソケットが存在しない・権限がないなどで接続できない場合
+        """
+        with self._lock:
+            self._open_locked()
+    
+    def _open_locked(self):
+        if self._sock is not None:
+            return
+        local_path = os.path.join(self.local_dir, f"wpa_ctrl_{os.getpid()}-{next(_local_counter)}")
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        try:
+            if os.path.exists(local_path):
+                os.unlink(local_path)
+            # wpa_supplicant は送信元のアドレスに応答するため、ローカル側にも名前が必要
+            sock.bind(local_path)
+            sock.connect(self.ctrl_path)
+        except OSError:
+            sock.close()
+            self._unlink(local_path)
+            raise
+        self._sock = sock
+        self._local_path = local_path
+    
+    def close(self):
+        """接続を閉じる"""
+        with self._lock:
+            self._close_locked()
+    
+    def _close_locked(self):
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+        if self._local_path is not None:
+            self._unlink(self._local_path)
+            self._local_path = None
+    
+    def _unlink(self, path: str):
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+    
+    def request(self, command: str, timeout: Optional[float] = None) -> str:
+        """コマンドを送り、応答を返す
+        
+        ATTACH 済みの接続に届くイベント（"<3>CTRL-EVENT-..." の形式）は応答とみなさず、
+        receive() で受け取れるように取っておきます。
+        
+        Args:
+            command: コマンド（例: "SCAN", "STATUS"）
+            timeout: 応答を待つ時間（秒）。省略時は self.timeout
+        
+        Raises:
+            TimeoutError: 応答が届かなかった場合
+            OSError: 接続・送受信に失敗した場合
+        """
+        timeout = self.timeout if timeout is None else timeout
+        with self._lock:
+            self._open_locked()
+            try:
+                self._sock.settimeout(timeout)
+                self._sock.send(command.encode("utf-8"))
+                deadline = time.monotonic() + timeout
+                while True:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise TimeoutError(f"wpa_supplicant から {command} の応答がありません")
+                    self._sock.settimeout(remaining)
+                    reply = self._sock.recv(_MAX_REPLY).decode("utf-8", errors="replace")
+                    if not reply.startswith("<"):
+                        return reply
+                    self._pending_events.append(reply)
+            except OSError:
+                self._close_locked()
+                raise
+    
+    def receive(self, timeout: float) -> Optional[str]:
+        """ATTACH 済みの接続に届いたイベントを1件受け取る
+        
+        Returns:
+            "<3>CTRL-EVENT-..." 形式のメッセージ（timeout秒以内に届かなかった場合はNone）
+        
+        Raises:
+            OSError: 受信に失敗した場合
+        """
+        with self._lock:
+            if self._pending_events:
+                return self._pending_events.popleft()
+            self._open_locked()
+            try:
+                self._sock.settimeout(timeout)
+                message = self._sock.recv(_MAX_REPLY).decode("utf-8", errors="replace")
+            except TimeoutError:
+                return None
+            except OSError:
+                self._close_locked()
+                raise
+        # イベント以外（タイムアウトした要求への遅れた応答など）は捨てる
+        return message if message.startswith("<") else None
+    
+    def wait_event(self, names: Iterable[str], timeout: float) -> Optional["WpaEvent"]:
+        """ATTACH 済みの接続で、names のいずれかのイベントが届くまで待つ
+        
+        Returns:
+            届いたイベント（timeout秒以内に届かなかった場合はNone）。他のイベントは捨てます
+        
+        Raises:
+            OSError: 受信に失敗した場合
+        """
+        names = frozenset(names)
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            message = self.receive(remaining)
+            event = parse_event(message) if message is not None else None
+            if event is not None and event.name in names:
+                return event
+    
+    async def request_async(self, command: str, timeout: Optional[float] = None) -> str:
+        """request() をワーカースレッドで実行する（イベントループを止めない）"""
+        return await asyncio.to_thread(self.request, command, timeout)
+    
+    def ping(self) -> bool:
+        """wpa_supplicant が応答するか"""
+        try:
+            return self.request("PING").strip() == "PONG"
+        except OSError:
+            return False
+    
+    def scan(self):
+        """スキャンを要求する（すでにスキャン中の場合もエラーにしない）
+        
+        Raises:
+            RuntimeError: wpa_supplicant がスキャンを拒否した場合
+        """
+        self._check_ok("SCAN", self.request("SCAN"), allowed=("FAIL-BUSY",))
+    
+    def scan_results(self) -> List[ScanResult]:
+        """最新のスキャン結果を返す（SSIDごとに最も信号の強いBSS、信号の強い順）"""
+        reply = self.request("SCAN_RESULTS")
+        return StrongestBySsid(parse_wpa_cli_scan_results(reply.splitlines())).results()
+    
+    def status(self) -> Dict[str, str]:
+        """接続状態（STATUS の "key=value" の行）を辞書で返す"""
+        return parse_key_values(self.request("STATUS"))
+    
+    def scan_and_wait(self, timeout: float) -> List[ScanResult]:
+        """スキャンを要求し、そのスキャンが終わってから結果を返す
+        
+        SCAN の直後に SCAN_RESULTS を送ると前回のスキャン結果が返るため、
+        完了を知らせる CTRL-EVENT-SCAN-RESULTS を待ちます。イベントを受け取るために
+        ATTACH した別の接続を使うので、この接続の他の要求を止めません。
+        
+        Raises:
+            TimeoutError: timeout 秒以内にスキャンが終わらなかった場合
+            RuntimeError: wpa_supplicant がスキャンを拒否した・スキャンに失敗した場合
+            OSError: 制御ソケットに接続できない場合
+        """
+        deadline = time.monotonic() + timeout
+        with WpaCtrlClient(self.ctrl_path, self.timeout, self.local_dir) as events:
+            self._check_ok("ATTACH", events.request("ATTACH"))
+            try:
+                events.scan()
+                event = events.wait_event((EVENT_SCAN_RESULTS, EVENT_SCAN_FAILED), deadline - time.monotonic())
+            finally:
+                try:
+                    events.request("DETACH")
+                except OSError:
+                    pass
+        if event is None:
+            raise TimeoutError("wpa_supplicant のスキャンが時間内に終わりませんでした")
+        if event.name == EVENT_SCAN_FAILED:
+            raise RuntimeError(f"wpa_supplicant のスキャンに失敗しました: {event.text}")
+        return self.scan_results()
+    
+    async def scan_async(self):
+        await asyncio.to_thread(self.scan)
+    
+    async def scan_results_async(self) -> List[ScanResult]:
+        return await asyncio.to_thread(self.scan_results)
+    
+    async def status_async(self) -> Dict[str, str]:
+        return await asyncio.to_thread(self.status)
+    
+    async def scan_and_wait_async(self, timeout: float) -> List[ScanResult]:
+        return await asyncio.to_thread(self.scan_and_wait, timeout)
+    
+    def _check_ok(self, command: str, reply: str, allowed: Sequence[str] = ()):
+        reply = reply.strip()
+        if reply != "OK" and reply not in allowed:
+            raise RuntimeError(f"wpa_supplicant が {command} に失敗しました: {reply}")
+    
+    def __enter__(self) -> "WpaCtrlClient":
+        self.open()
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+
+
+def parse_key_values(reply: str) -> Dict[str, str]:
+    """STATUS などの "key=value" 形式の応答を辞書にする"""
+    values = {}
+    for line in reply.splitlines():
+        key, sep, value = line.partition("=")
+        if sep:
+            values[key] = value
+    return values
+
+
+# 購読できる主なイベント
+EVENT_SCAN_RESULTS = "CTRL-EVENT-SCAN-RESULTS"
+EVENT_SCAN_FAILED = "CTRL-EVENT-SCAN-FAILED"
+EVENT_CONNECTED = "CTRL-EVENT-CONNECTED"
+EVENT_DISCONNECTED = "CTRL-EVENT-DISCONNECTED"
+
+_BSSID_PATTERN = re.compile(r"\b[0-9a-fA-F]{2}(?::[0-9a-fA-F]{2}){5}\b")
+
+
+@dataclass(slots=True)
+class WpaEvent:
+    """wpa_supplicant から届いたイベント"""
+    name: str  # 例: "CTRL-EVENT-CONNECTED"
+    text: str = ""  # イベント名より後ろの部分
+    level: int = 2  # wpa_supplicant のメッセージレベル（<N> の値）
+    received_at: float = field(default_factory=time.monotonic)
+    
+    @property
+    def fields(self) -> Dict[str, str]:
+        """text の "key=value" の項目（"[id=0 id_str=]" のような括弧の中も含む）"""
+        values = {}
+        for token in self.text.replace("[", " ").replace("]", " ").split():
+            key, sep, value = token.partition("=")
+            if sep:
+                values[key] = value
+        return values
+    
+    @property
+    def bssid(self) -> Optional[str]:
+        """イベントに含まれるBSSID（含まれない場合はNone）"""
+        match = _BSSID_PATTERN.search(self.text)
+        return match.group(0) if match else None
+
+
+def parse_event(message: str) -> Optional[WpaEvent]:
+    """"<3>CTRL-EVENT-..." 形式のメッセージを WpaEvent にする（イベントでない場合はNone）"""
+    if not message.startswith("<"):
+        return None
+    end = message.find(">")
+    if end < 0:
+        return None
+    try:
+        level = int(message[1:end])
+    except ValueError:
+        return None
+    name, _, text = message[end + 1:].strip().partition(" ")
+    if not name:
+        return None
+    return WpaEvent(name, text, level)
+
+
+class EventDispatcher:
+    """イベントをコールバックと非同期イテレーターに配信する
+    
+    publish() はどのスレッドから呼んでも構いません。コールバックは publish() を
+    呼んだスレッドで実行され、非同期イテレーターにはそれぞれのイベントループに
+    call_soon_threadsafe で渡されます。
+    """
+    
+    def __init__(self):
+        self._subscribers: List[Tuple[Callable[[WpaEvent], None], Optional[FrozenSet[str]]]] = []
+        self._lock = threading.Lock()
+    
+    def subscribe(self, callback: Callable[[WpaEvent], None],
+                  names: Optional[Iterable[str]] = None) -> Callable[[], None]:
+        """イベントを受け取るコールバックを登録する
+        
+        Args:
+            callback: WpaEvent を受け取る関数
+            names: 受け取るイベント名（省略時はすべて）
+        
+        Returns:
+            登録を解除する関数
+        """
+        entry = (callback, frozenset(names) if names is not None else None)
+        with self._lock:
+            self._subscribers = self._subscribers + [entry]
+        
+        def unsubscribe():
+            with self._lock:
+                self._subscribers = [s for s in self._subscribers if s is not entry]
+        return unsubscribe
+    
+    def publish(self, event: WpaEvent):
+        """イベントを配信する（コールバックの例外は表示して無視する）"""
+        for callback, names in self._subscribers:
+            if names is not None and event.name not in names:
+                continue
+            try:
+                callback(event)
+            except Exception as e:
+                print(f"イベント {event.name} の処理エラー: {e}")
+    
+    async def iterate(self, names: Optional[Iterable[str]] = None, max_queue: int = 256) -> AsyncIterator[WpaEvent]:
+        """イベントを順に返す非同期イテレーター
+        
+        処理が追いつかずに max_queue 件を超えた場合は古いイベントから捨てます。
+        
+        Example:
+            async for event in dispatcher.iterate([EVENT_CONNECTED]):
+                ...
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(max_queue)
+        
+        def put(event: WpaEvent):
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(event)
+        
+        unsubscribe = self.subscribe(lambda event: loop.call_soon_threadsafe(put, event), names)
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            unsubscribe()
+
+
+class WpaEventMonitor:
+    """wpa_supplicant にモニターとして接続（ATTACH）し、届いたイベントを渡すスレッド
+    
+    要求用の接続とは別の接続を使います。接続が切れた場合や wpa_supplicant が
+    再起動した場合は、reconnect_delay 秒から倍々に間隔を空けて接続し直します。
+    """
+    
+    def __init__(self, ctrl_path: str, on_event: Callable[[WpaEvent], None],
+                 local_dir: Optional[str] = None, reconnect_delay: float = 1.0,
+                 max_reconnect_delay: float = 60.0, ping_interval: float = 30.0):
+        """
+        Args:
+            ctrl_path: wpa_supplicant の制御ソケットのパス
+            on_event: イベントを受け取る関数（モニターのスレッドで呼ばれる）
+            local_dir: ローカル側のソケットを作るディレクトリ
+            reconnect_delay: 接続し直すまでの待ち時間（秒、初回）
+            max_reconnect_delay: 接続し直すまでの待ち時間の上限（秒）
+            ping_interval: イベントが届かない間に接続を確認する間隔（秒）
+        """
+        self.ctrl_path = ctrl_path
+        self.on_event = on_event
+        self.local_dir = local_dir
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.ping_interval = ping_interval
+        self._attached = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    @property
+    def is_attached(self) -> bool:
+        """イベントを受け取れる状態か"""
+        return self._attached.is_set()
+    
+    def start(self, wait: Optional[float] = None) -> bool:
+        """監視を開始する
+        
+        Args:
+            wait: 接続できるまで待つ時間（秒）。省略時は待たない
+        
+        Returns:
+            接続できている場合True
+        """
+        if self._thread is None or not self._thread.is_alive():
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._run, name="wpa-event-monitor", daemon=True)
+            self._thread.start()
+        if wait:
+            self._attached.wait(wait)
+        return self.is_attached
+    
+    def stop(self):
+        """監視を停止する"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+    
+    def _run(self):
+        delay = self.reconnect_delay
+        while not self._stop_event.is_set():
+            client = WpaCtrlClient(self.ctrl_path, local_dir=self.local_dir)
+            try:
+                reply = client.request("ATTACH").strip()
+                if reply != "OK":
+                    raise RuntimeError(f"ATTACH に失敗しました: {reply}")
+                self._attached.set()
+                delay = self.reconnect_delay
+                self._receive_events(client)
+                if self._stop_event.is_set():
+                    client.request("DETACH", timeout=0.5)
+            except (OSError, RuntimeError) as e:
+                if not self._stop_event.is_set():
+                    print(f"wpa_supplicant のイベント監視エラー: {e!r}")
+            finally:
+                self._attached.clear()
+                client.close()
+            if self._stop_event.wait(delay):
+                return
+            delay = min(delay * 2, self.max_reconnect_delay)
+    
+    def _receive_events(self, client: "WpaCtrlClient"):
+        last_message = time.monotonic()
+        while not self._stop_event.is_set():
+            message = client.receive(timeout=1.0)
+            now = time.monotonic()
+            if message is None:
+                if now - last_message >= self.ping_interval:
+                    # wpa_supplicant が再起動していると、古い接続にはイベントが届かない
+                    if client.request("PING").strip() != "PONG":
+                        raise RuntimeError("PING に応答がありません")
+                    last_message = now
+                continue
+            last_message = now
+            event = parse_event(message)
+            if event is not None:
+                self.on_event(event)
@@ -0,0 +1,76 @@
+import atexit
+import threading
+from typing import Callable, Dict, Hashable, List, Optional
+
+
+class WriteBehindQueue:
+    """変更を溜めて遅延書き込みするキュー
+    
+    同じキーへの変更は最後の1件にまとめ（コアレッシング）、最後の変更から
+    delay 秒経過した時点でバックグラウンドスレッドから flush_fn にまとめて渡します。
+    プロセス終了時にも必ず flush します。
+    """
+    
+    def __init__(self, flush_fn: Callable[[List[object]], None], delay: float = 0.5):
+        """
+        Args:
+            flush_fn: 溜まった変更（キーごとに最新の1件）のリストを受け取って書き込む関数
+            delay: 最後の変更から書き込みまでの待ち時間（秒）
+        """
+        self.flush_fn = flush_fn
+        self.delay = delay
+        self._pending: Dict[Hashable, object] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        self._atexit_registered = False
+    
+    def schedule(self, key: Hashable, item: object):
+        """変更を登録する（同じキーの未書き込みの変更は置き換える）"""
+        with self._lock:
+            self._pending[key] = item
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.delay, self._flush_in_background)
+            self._timer.daemon = True
+            self._timer.start()
+            if not self._atexit_registered:
+                atexit.register(self.flush)
+                self._atexit_registered = True
+    
+    def discard(self, key: Hashable):
+        """未書き込みの変更を取り消す"""
+        with self._lock:
+            self._pending.pop(key, None)
+    
+    def pending(self) -> Dict[Hashable, object]:
+        """未書き込みの変更のコピー"""
+        with self._lock:
+            return dict(self._pending)
+    
+    def flush(self):
+        """未書き込みの変更を今すぐ書き込む"""
+        with self._flush_lock:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                items = list(self._pending.items())
+                self._pending.clear()
+            
+            if not items:
+                return
+            try:
+                self.flush_fn([item for _, item in items])
+            except Exception:
+                # 失敗した変更は次回の flush で再試行する（その間の新しい変更を優先）
+                with self._lock:
+                    for key, item in items:
+                        self._pending.setdefault(key, item)
+                raise
+    
+    def _flush_in_background(self):
+        try:
+            self.flush()
+        except Exception as e:
+            print(f"遅延書き込みエラー: {e}")
@@ -0,0 +1,136 @@
+import os
+import socket
+import threading
+import time
+from typing import Dict, List, Optional, Set
+
+OLD_SCAN_RESULTS = (
+    "bssid / frequency / signal level / flags / ssid\n"
+    "00:11:22:33:44:55\t2437\t-67\t[WPA2-PSK-CCMP][ESS]\tOldNet\n"
+)
+
+NEW_SCAN_RESULTS = (
+    "bssid / frequency / signal level / flags / ssid\n"
+    "00:11:22:33:44:55\t2437\t-67\t[WPA2-PSK-CCMP][ESS]\tMyHome\n"
+    "00:11:22:33:44:56\t5745\t-48\t[WPA2-PSK-CCMP][ESS]\tMyHome\n"
+    "66:77:88:99:aa:bb\t5180\t-71\t[ESS]\tCafe\n"
+)
+
+STATUS_REPLY = (
+    "bssid=00:11:22:33:44:56\n"
+    "freq=5745\n"
+    "ssid=MyHome\n"
+    "id=0\n"
+    "mode=station\n"
+    "key_mgmt=WPA2-PSK\n"
+    "wpa_state=COMPLETED\n"
+    "ip_address=192.168.1.23\n"
+)
+
+
+class FakeWpaSupplicant:
+    """テスト用の wpa_supplicant の制御ソケット（AF_UNIX データグラム）
+    
+    実物と同じく、コマンドごとに送信元のアドレスへ応答を返し、ATTACH した
+    アドレスにはイベント（"<N>CTRL-EVENT-..."）を送ります。
+    
+    - silent: 応答しないコマンド（タイムアウトの確認用）
+    - reply_delay: コマンド → 応答を遅らせる秒数
+    - events_before_reply: コマンド → 応答の前に同じ相手へ送るイベント
+    - scan_delay: SCAN から CTRL-EVENT-SCAN-RESULTS までの秒数（Noneの場合は完了しない）
+    - scan_fails: True の場合は SCAN の後に CTRL-EVENT-SCAN-FAILED を送る
+    """
+    
+    def __init__(self, path: str):
+        self.path = path
+        self.commands: List[str] = []
+        self.replies: Dict[str, str] = {
+            "PING": "PONG\n",
+            "STATUS": STATUS_REPLY,
+            "ATTACH": "OK\n",
+            "DETACH": "OK\n",
+            "SCAN": "OK\n",
+        }
+        self.scan_results = OLD_SCAN_RESULTS
+        self.next_scan_results = NEW_SCAN_RESULTS
+        self.silent: Set[str] = set()
+        self.reply_delay: Dict[str, float] = {}
+        self.events_before_reply: Dict[str, List[str]] = {}
+        self.scan_delay: Optional[float] = 0.05
+        self.scan_fails = False
+        self.attached: Set[str] = set()
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._sock.bind(path)
+        self._thread = threading.Thread(target=self._serve, name="fake-wpa-supplicant", daemon=True)
+        self._thread.start()
+    
+    def _serve(self):
+        while True:
+            try:
+                data, addr = self._sock.recvfrom(4096)
+            except OSError:
+                return
+            command = data.decode("utf-8")
+            self.commands.append(command)
+            if command == "ATTACH":
+                self.attached.add(addr)
+            elif command == "DETACH":
+                self.attached.discard(addr)
+            elif command == "SCAN":
+                self._start_scan()
+            if command in self.silent:
+                continue
+            for event in self.events_before_reply.get(command, ()):
+                self._send(event, addr)
+            if command == "SCAN_RESULTS":
+                reply = self.scan_results
+            else:
+                reply = self.replies.get(command, "UNKNOWN COMMAND\n")
+            delay = self.reply_delay.get(command)
+            if delay:
+                threading.Timer(delay, self._send, (reply, addr)).start()
+            else:
+                self._send(reply, addr)
+    
+    def _start_scan(self):
+        if self.scan_fails:
+            threading.Timer(0.01, self.emit, ("<3>CTRL-EVENT-SCAN-FAILED ret=-16",)).start()
+        elif self.scan_delay is not None:
+            threading.Timer(self.scan_delay, self._finish_scan).start()
+    
+    def _finish_scan(self):
+        self.scan_results = self.next_scan_results
+        self.emit("<2>CTRL-EVENT-SCAN-RESULTS ")
+    
+    def _send(self, message: str, addr: str):
+        try:
+            self._sock.sendto(message.encode("utf-8"), addr)
+        except OSError:
+            # 相手が先に閉じた（タイムアウトした要求への遅れた応答など）
+            pass
+    
+    def emit(self, message: str):
+        """ATTACH しているすべての相手にイベントを送る"""
+        for addr in list(self.attached):
+            self._send(message, addr)
+    
+    def wait_for_attach(self, timeout: float = 2.0) -> bool:
+        deadline = time.monotonic() + timeout
+        while not self.attached:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+    
+    def close(self):
+        self._sock.close()
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+    
+    def __enter__(self) -> "FakeWpaSupplicant":
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
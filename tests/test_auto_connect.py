@@ -0,0 +1,141 @@
+import asyncio
+import shutil
+import tempfile
+
+import pytest
+
+from models.wifi_config import WiFiConfig
+from services.auto_connect import ACTION_CONNECT, ACTION_SUGGEST, AutoConnectEngine
+from services.priority_index import PRIORITY_STEP
+from services.simulated_wifi import SyntheticWiFi
+from services.storage_manager import StorageManager
+from services.wifi_manager import WiFiManager
+
+
+@pytest.fixture
+def storage():
+    directory = tempfile.mkdtemp(prefix="autoconnect")
+    manager = StorageManager(storage_dir=directory)
+    yield manager
+    manager.close()
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+@pytest.fixture
+def wifi_manager():
+    simulator = SyntheticWiFi(networks=6, churn_db=0.0, visibility_churn=0.0, seed=1)
+    manager = WiFiManager(simulator=simulator)
+    yield manager
+    manager.close()
+
+
+@pytest.fixture
+def results(wifi_manager):
+    # 接続できるのは直前のスキャンで見えていたネットワークだけ
+    return asyncio.run(wifi_manager.scan_results_async())
+
+
+def save(storage, ssid, rank, **flags):
+    wifi = WiFiConfig(ssid=ssid, password="secret", priority=rank * PRIORITY_STEP)
+    for name, value in flags.items():
+        setattr(wifi.status_flags, name, value)
+    storage.add_wifi_config(wifi)
+    return wifi
+
+
+def make_engine(storage, wifi_manager, **kwargs):
+    return AutoConnectEngine(storage, wifi_manager, interval=60, min_signal_dbm=None, **kwargs)
+
+
+def test_evaluate_suggests_a_higher_priority_network(storage, wifi_manager, results):
+    best = save(storage, "SimNet-0003", 1)
+    save(storage, "SimNet-0001", 2)
+    
+    decision = make_engine(storage, wifi_manager).evaluate(results, "SimNet-0001")
+    
+    assert decision.action == ACTION_SUGGEST
+    assert decision.wifi.id == best.id
+    assert decision.scan.ssid == "SimNet-0003"
+    assert decision.current_ssid == "SimNet-0001"
+
+
+def test_evaluate_returns_none_when_already_on_the_best_network(storage, wifi_manager, results):
+    save(storage, "SimNet-0003", 1)
+    save(storage, "SimNet-0001", 2)
+    
+    assert make_engine(storage, wifi_manager).evaluate(results, "SimNet-0003") is None
+
+
+def test_evaluate_compares_with_the_best_ranked_duplicate_of_the_current_ssid(storage, wifi_manager, results):
+    save(storage, "SimNet-0002", 5)
+    save(storage, "SimNet-0004", 3)
+    save(storage, "SimNet-0002", 1)
+    
+    assert make_engine(storage, wifi_manager).evaluate(results, "SimNet-0002") is None
+
+
+def test_evaluate_skips_ignored_networks(storage, wifi_manager, results):
+    save(storage, "SimNet-0003", 1, ignore_until_manual_reset=True)
+    fallback = save(storage, "SimNet-0005", 2)
+    
+    decision = make_engine(storage, wifi_manager).evaluate(results, None)
+    
+    assert decision.wifi.id == fallback.id
+
+
+def test_evaluate_skips_networks_below_the_signal_floor(storage, wifi_manager, results):
+    save(storage, "SimNet-0003", 1)
+    engine = AutoConnectEngine(storage, wifi_manager, interval=60, min_signal_dbm=0.0)
+    
+    assert engine.evaluate(results, None) is None
+
+
+def test_evaluate_ignores_networks_that_are_not_visible(storage, wifi_manager, results):
+    save(storage, "Elsewhere", 1)
+    
+    assert make_engine(storage, wifi_manager).evaluate(results, None) is None
+
+
+def test_process_notifies_the_same_decision_once(storage, wifi_manager, results):
+    save(storage, "SimNet-0003", 1)
+    decisions = []
+    engine = make_engine(storage, wifi_manager, on_decision=decisions.append)
+    
+    first = engine.process(results)
+    second = engine.process(results)
+    
+    assert first is not None and first.action == ACTION_SUGGEST
+    assert second is None
+    assert decisions == [first]
+
+
+def test_process_connects_when_auto_connect_is_enabled(storage, wifi_manager, results):
+    save(storage, "SimNet-0003", 1)
+    decisions = []
+    engine = make_engine(storage, wifi_manager, on_decision=decisions.append, auto_connect=True)
+    
+    decision = engine.process(results)
+    
+    assert decision.action == ACTION_CONNECT
+    assert decision.connected is True
+    assert wifi_manager.get_current_network() == "SimNet-0003"
+    assert decisions == [decision]
+    # 接続した後は、これ以上優先度の高い候補はない
+    assert engine.process(results) is None
+
+
+def test_process_does_not_take_over_a_connect_in_progress(storage, wifi_manager, results):
+    save(storage, "SimNet-0003", 1)
+    wifi_manager.simulator.connect_latency = 0.5
+    manual = wifi_manager.connect_async("SimNet-0005", "secret")
+    engine = make_engine(storage, wifi_manager, auto_connect=True)
+    
+    assert engine.process(results) is None
+    assert manual.result(timeout=5) is True
+    assert wifi_manager.get_current_network() == "SimNet-0005"
+    
+    # 画面からの接続が終われば、次の判定で接続する
+    wifi_manager.simulator.connect_latency = 0.0
+    decision = engine.process(results)
+    assert decision.connected is True
+    assert wifi_manager.get_current_network() == "SimNet-0003"
@@ -0,0 +1,198 @@
+import os
+import shutil
+import tempfile
+
+import pytest
+
+from models.wifi_config import WiFiConfig
+from services.config_journal import ConfigJournal
+from services.storage_manager import StorageManager
+
+
+@pytest.fixture
+def storage_dir():
+    directory = tempfile.mkdtemp(prefix="journal")
+    yield directory
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+def _journaled(storage_dir, **kwargs):
+    # テスト中にバックグラウンドの圧縮が走らないよう閾値を大きくする
+    kwargs.setdefault("journal_compact_threshold", 1 << 30)
+    return StorageManager(storage_dir=storage_dir, journaled=True, **kwargs)
+
+
+def _save(storage, count):
+    storage.save_wifi_configs([
+        WiFiConfig(ssid=f"Net-{i}", password=f"secret-{i}", priority=(i + 1) * 1024) for i in range(count)
+    ])
+
+
+def test_torn_tail_is_truncated(storage_dir):
+    path = os.path.join(storage_dir, "config.journal")
+    journal = ConfigJournal(path)
+    journal.append_many([{"seq": 1}, {"seq": 2}])
+    journal.close()
+    valid_size = os.path.getsize(path)
+    with open(path, "ab") as f:
+        f.write(b'deadbeef {"seq": 3, "put"')
+    
+    assert [r["seq"] for r in ConfigJournal(path).replay()] == [1, 2]
+    assert os.path.getsize(path) == valid_size
+
+
+def test_torn_last_record_with_newline_is_truncated(storage_dir):
+    path = os.path.join(storage_dir, "config.journal")
+    journal = ConfigJournal(path)
+    journal.append({"seq": 1})
+    journal.close()
+    valid_size = os.path.getsize(path)
+    with open(path, "ab") as f:
+        f.write(b'00000000 {"seq": 2}\n')
+    
+    assert [r["seq"] for r in ConfigJournal(path).replay()] == [1]
+    assert os.path.getsize(path) == valid_size
+
+
+def test_corrupt_record_in_the_middle_is_skipped(storage_dir):
+    path = os.path.join(storage_dir, "config.journal")
+    journal = ConfigJournal(path)
+    journal.append({"seq": 1})
+    journal.close()
+    corrupt_offset = os.path.getsize(path)
+    with open(path, "ab") as f:
+        f.write(b'00000000 {"seq": 2}\n')
+    journal.append({"seq": 3})
+    journal.close()
+    size = os.path.getsize(path)
+    
+    replayed = ConfigJournal(path)
+    assert [r["seq"] for r in replayed.replay()] == [1, 3]
+    assert replayed.corrupt_offsets == [corrupt_offset]
+    # 途中の破損では後続の有効なレコードを残すため切り詰めない
+    assert os.path.getsize(path) == size
+
+
+def test_torn_write_is_ignored_when_reopened(storage_dir):
+    storage = _journaled(storage_dir)
+    _save(storage, 3)
+    wifi = storage.get_wifi_configs()[0]
+    wifi.ssid = "Renamed"
+    storage.update_wifi_config(wifi)
+    storage.close()
+    with open(storage.journal_file, "ab") as f:
+        f.write(b'deadbeef {"seq": 99, "delete": [')
+    
+    reopened = _journaled(storage_dir)
+    
+    assert [w.ssid for w in reopened.get_wifi_configs()] == ["Renamed", "Net-1", "Net-2"]
+    reopened.close()
+
+
+def test_single_update_is_appended_and_reloaded(storage_dir):
+    storage = _journaled(storage_dir)
+    _save(storage, 100)
+    wifi = storage.get_wifi_configs()[42]
+    wifi.set_ignore_permanently(True)
+    size = os.path.getsize(storage.journal_file)
+    
+    storage.update_wifi_config(wifi)
+    storage.add_wifi_config(WiFiConfig(ssid="Added", password="added", priority=1))
+    storage.delete_wifi_config(storage.get_wifi_configs()[-1].id)
+    
+    # 1件の変更はそれぞれ1レコードの追記で済む
+    assert len(ConfigJournal(storage.journal_file).replay()) == 4
+    assert os.path.getsize(storage.journal_file) - size < 1024
+    expected = storage.load_config()
+    storage.close()
+    
+    reopened = _journaled(storage_dir)
+    assert reopened.load_config() == expected
+    assert reopened.get_wifi_configs()[0].ssid == "Added"
+    assert reopened.get_wifi_configs()[43].status_flags.ignore_until_manual_reset
+    reopened.close()
+
+
+def test_compaction_writes_snapshot_and_discards_journal(storage_dir):
+    storage = _journaled(storage_dir)
+    _save(storage, 10)
+    for wifi in storage.get_wifi_configs()[:5]:
+        wifi.set_ignore_permanently(True)
+        storage.update_wifi_config(wifi)
+    expected = storage.load_config()
+    
+    storage.compact_journal()
+    
+    assert os.path.getsize(storage.journal_file) == 0
+    assert StorageManager(storage_dir=storage_dir).load_config() == expected
+    wifi = storage.get_wifi_configs()[9]
+    wifi.ssid = "After compaction"
+    storage.update_wifi_config(wifi)
+    storage.close()
+    
+    reopened = _journaled(storage_dir)
+    assert reopened.get_wifi_configs()[9].ssid == "After compaction"
+    assert sum(w.status_flags.ignore_until_manual_reset for w in reopened.get_wifi_configs()) == 5
+    reopened.close()
+
+
+def test_background_compaction_after_threshold(storage_dir):
+    storage = _journaled(storage_dir, journal_compact_threshold=4096)
+    _save(storage, 20)
+    for i in range(40):
+        wifi = storage.get_wifi_configs()[i % 20]
+        wifi.ssid = f"Renamed-{i}"
+        storage.update_wifi_config(wifi)
+    expected = storage.load_config()
+    storage.close()
+    
+    assert os.path.getsize(storage.journal_file) < 4096 + 1024
+    assert _journaled(storage_dir).load_config() == expected
+
+
+def test_non_journaled_open_folds_journal_into_snapshot(storage_dir):
+    storage = _journaled(storage_dir)
+    _save(storage, 27)
+    for i in range(3):
+        storage.add_wifi_config(WiFiConfig(ssid=f"Extra-{i}", password="extra", priority=(28 + i) * 1024))
+    storage.close()
+    
+    plain = StorageManager(storage_dir=storage_dir)
+    
+    assert len(plain.get_wifi_configs()) == 30
+    assert not os.path.exists(plain.journal_file)
+    wifi = plain.get_wifi_configs()[27]
+    wifi.ssid = "Edited without journal"
+    plain.update_wifi_config(wifi)
+    plain.close()
+    
+    # 後でジャーナルモードで開いても古いレコードで上書きされない
+    reopened = _journaled(storage_dir)
+    assert len(reopened.get_wifi_configs()) == 30
+    assert reopened.get_wifi_configs()[27].ssid == "Edited without journal"
+    reopened.close()
+
+
+def test_stale_journal_does_not_override_non_journaled_save(storage_dir):
+    storage = _journaled(storage_dir)
+    _save(storage, 3)
+    wifi = storage.get_wifi_configs()[0]
+    wifi.ssid = "Journal edit"
+    storage.update_wifi_config(wifi)
+    with open(storage.journal_file, "rb") as f:
+        stale = f.read()
+    storage.compact_journal()
+    storage.close()
+    
+    plain = StorageManager(storage_dir=storage_dir)
+    wifi = plain.get_wifi_configs()[0]
+    wifi.ssid = "Plain edit"
+    plain.update_wifi_config(wifi)
+    plain.close()
+    # 圧縮済みのジャーナルが（別のコピーなどから）戻ってきても、反映済みの番号は読み飛ばす
+    with open(plain.journal_file, "wb") as f:
+        f.write(stale)
+    
+    reopened = _journaled(storage_dir)
+    assert reopened.get_wifi_configs()[0].ssid == "Plain edit"
+    reopened.close()
@@ -0,0 +1,228 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from services.simulated_wifi import SyntheticWiFi
+from services.wifi_connect import (
+    CONNECT_ASSOCIATING, CONNECT_AUTHENTICATING, CONNECT_CANCELLED, CONNECT_CONNECTED, CONNECT_FAILED,
+    CONNECT_OBTAINING_IP, CONNECT_PENDING, REASON_CANCELLED, REASON_SUPERSEDED, REASON_TIMEOUT,
+    ConnectAttempt,
+)
+from services.wifi_manager import WiFiManager
+
+SSID = "SimNet-0001"
+
+
+@pytest.fixture
+def wifi_manager():
+    simulator = SyntheticWiFi(networks=4, churn_db=0.0, visibility_churn=0.0, seed=1)
+    manager = WiFiManager(simulator=simulator)
+    # 接続できるのは直前のスキャンで見えていたネットワークだけ
+    manager.scan_networks()
+    yield manager
+    manager.close()
+
+
+def _states(attempt):
+    return [progress.state for progress in attempt.history]
+
+
+def _wait_until(condition):
+    deadline = time.monotonic() + 5
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def _wait_for_state(attempt, state):
+    reached = threading.Event()
+    remove = attempt.add_progress_listener(lambda progress: reached.set() if progress.state == state else None)
+    try:
+        if state not in _states(attempt):
+            assert reached.wait(5)
+    finally:
+        remove()
+
+
+def test_connects_and_reports_every_stage(wifi_manager):
+    received = []
+    
+    attempt = wifi_manager.connect_async(SSID, "secret", on_progress=received.append)
+    
+    assert attempt.result(5)
+    assert _states(attempt) == [
+        CONNECT_PENDING, CONNECT_ASSOCIATING, CONNECT_AUTHENTICATING, CONNECT_OBTAINING_IP, CONNECT_CONNECTED,
+    ]
+    assert [progress.state for progress in received] == _states(attempt)[1:]
+    assert attempt.reason is None
+    assert wifi_manager.get_current_network() == SSID
+
+
+def test_failure_is_reported(wifi_manager):
+    attempt = wifi_manager.connect_async("Not-Visible", "secret")
+    
+    assert not attempt.result(5)
+    assert attempt.state == CONNECT_FAILED
+
+
+def test_deadline_fails_the_attempt(wifi_manager):
+    wifi_manager.simulator.connect_latency = 30.0
+    
+    attempt = wifi_manager.connect_async(SSID, "secret", timeout=0.1)
+    
+    assert not attempt.result(5)
+    assert attempt.state == CONNECT_FAILED
+    assert attempt.reason == REASON_TIMEOUT
+    assert wifi_manager.get_current_network() is None
+
+
+def test_cancel_stops_a_running_attempt(wifi_manager):
+    wifi_manager.simulator.connect_latency = 30.0
+    attempt = wifi_manager.connect_async(SSID, "secret")
+    _wait_for_state(attempt, CONNECT_ASSOCIATING)
+    
+    assert attempt.cancel()
+    
+    assert not attempt.result(5)
+    assert attempt.state == CONNECT_CANCELLED
+    assert attempt.reason == REASON_CANCELLED
+    assert not attempt.cancel()
+    assert wifi_manager.get_current_network() is None
+
+
+def test_cancel_before_start_never_connects():
+    attempt = ConnectAttempt(SSID, "wlan0", timeout=None)
+    calls = []
+    
+    async def connect(report):
+        calls.append(report)
+        return True
+    
+    assert attempt.cancel()
+    assert not asyncio.run(attempt._run(connect))
+    
+    assert calls == []
+    assert _states(attempt) == [CONNECT_PENDING, CONNECT_CANCELLED]
+
+
+def test_new_attempt_supersedes_the_running_one(wifi_manager):
+    wifi_manager.simulator.connect_latency = 30.0
+    first = wifi_manager.connect_async(SSID, "secret")
+    _wait_for_state(first, CONNECT_ASSOCIATING)
+    
+    wifi_manager.simulator.connect_latency = 0.0
+    second = wifi_manager.connect_async("SimNet-0002", "secret")
+    
+    assert not first.result(5)
+    assert first.state == CONNECT_CANCELLED
+    assert first.reason == REASON_SUPERSEDED
+    assert second.result(5)
+    assert wifi_manager.get_current_network() == "SimNet-0002"
+
+
+def test_supersede_false_leaves_the_running_attempt_alone(wifi_manager):
+    wifi_manager.simulator.connect_latency = 30.0
+    manual = wifi_manager.connect_async(SSID, "secret")
+    _wait_for_state(manual, CONNECT_ASSOCIATING)
+    
+    assert wifi_manager.connect_async("SimNet-0002", "secret", supersede=False) is None
+    assert wifi_manager.get_connect_attempt() is manual
+    assert not manual.done()
+    
+    # 別のインターフェースには影響しない
+    other = wifi_manager.connect_async("SimNet-0002", "secret", interface="wlan1", timeout=0.1)
+    assert not other.result(5)
+    assert not manual.done()
+    manual.cancel()
+    assert manual.result(5) is False
+
+
+def test_superseded_attempt_is_forgotten_only_once_replaced(wifi_manager):
+    wifi_manager.simulator.connect_latency = 30.0
+    first = wifi_manager.connect_async(SSID, "secret")
+    second = wifi_manager.connect_async(SSID, "secret")
+    first.result(5)
+    
+    assert wifi_manager.get_connect_attempt() is second
+    second.cancel()
+    second.result(5)
+    _wait_until(lambda: wifi_manager.get_connect_attempt() is None)
+
+
+def test_cancel_while_the_attempt_is_finishing(wifi_manager):
+    # 接続完了の通知（_run の最後のロックの直前）で cancel() しても、閉じたループに触れない
+    results = []
+    attempt = wifi_manager.connect_async(
+        SSID, "secret",
+        on_progress=lambda progress: results.append(attempt.cancel()) if progress.state == CONNECT_CONNECTED else None,
+    )
+    
+    assert attempt.result(5)
+    assert attempt.state == CONNECT_CONNECTED
+    assert results == [False]
+    assert not attempt.cancel()
+
+
+def test_cancel_racing_with_completion_always_settles(wifi_manager):
+    errors = []
+    
+    def cancel_soon(attempt, delay):
+        try:
+            threading.Event().wait(delay)
+            attempt.cancel()
+        except Exception as e:
+            errors.append(e)
+    
+    wifi_manager.simulator.connect_latency = 0.003
+    for i in range(100):
+        attempt = wifi_manager.connect_async(SSID, "secret", interface=f"wlan{i}")
+        canceller = threading.Thread(target=cancel_soon, args=(attempt, (i % 10) * 0.0005))
+        canceller.start()
+        connected = attempt.result(5)
+        canceller.join(5)
+        assert attempt.state == (CONNECT_CONNECTED if connected else CONNECT_CANCELLED)
+        assert attempt.history[-1].is_terminal
+    
+    assert errors == []
+
+
+def test_iter_progress_replays_history_and_stops_at_the_end(wifi_manager):
+    wifi_manager.simulator.connect_latency = 0.03
+    attempt = wifi_manager.connect_async(SSID, "secret")
+    
+    async def collect():
+        return [progress.state async for progress in attempt.iter_progress()]
+    
+    states = asyncio.run(collect())
+    
+    assert states == _states(attempt)
+    assert states[0] == CONNECT_PENDING and states[-1] == CONNECT_CONNECTED
+    # 終わった試行では history をそのまま返す
+    assert asyncio.run(collect()) == states
+
+
+def test_listener_errors_do_not_stop_the_attempt(wifi_manager):
+    def broken(progress):
+        raise RuntimeError("UI is gone")
+    received = []
+    
+    attempt = wifi_manager.connect_async(SSID, "secret", on_progress=broken)
+    attempt.add_progress_listener(received.append)
+    
+    assert attempt.result(5)
+    assert received[-1].state == CONNECT_CONNECTED
+
+
+def test_wait_is_not_cancelled_with_the_caller(wifi_manager):
+    wifi_manager.simulator.connect_latency = 0.1
+    attempt = wifi_manager.connect_async(SSID, "secret")
+    
+    async def main():
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(attempt.wait(), 0.01)
+        return await attempt.wait()
+    
+    assert asyncio.run(main())
+    assert attempt.state == CONNECT_CONNECTED
@@ -0,0 +1,123 @@
+import copy
+import shutil
+import tempfile
+
+import pytest
+
+from models.wifi_config import StatusFlags, WiFiConfig
+from services.storage_manager import StorageManager
+
+
+@pytest.fixture
+def storage():
+    directory = tempfile.mkdtemp(prefix="dirty")
+    storage = StorageManager(storage_dir=directory)
+    storage.save_wifi_configs([
+        WiFiConfig(ssid=f"Net-{i}", password=f"secret-{i}", priority=(i + 1) * 1024) for i in range(5)
+    ])
+    storage.invalidate_cache()
+    yield storage
+    storage.close()
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+def _record_writes(storage):
+    writes = []
+    write = storage.backend.write
+    storage.backend.write = lambda puts, deletes, sections: (writes.append(puts), write(puts, deletes, sections))
+    return writes
+
+
+def test_new_config_is_dirty_until_marked_clean():
+    wifi = WiFiConfig(ssid="Home", password="secret", priority=1024)
+    
+    assert wifi.is_dirty
+    assert wifi.dirty_fields == frozenset(WiFiConfig.TRACKED_FIELDS)
+    wifi.mark_clean()
+    assert not wifi.is_dirty
+    assert wifi.dirty_fields == frozenset()
+
+
+def test_setting_a_field_marks_it_dirty():
+    wifi = WiFiConfig(ssid="Home", password="secret", priority=1024)
+    wifi.mark_clean()
+    version = wifi.version
+    
+    wifi.priority = 2048
+    
+    assert wifi.dirty_fields == {"priority"}
+    assert wifi.version == version + 1
+    assert wifi.to_delta() == {"id": wifi.id, "priority": 2048}
+
+
+def test_status_flag_changes_mark_the_owner_dirty():
+    wifi = WiFiConfig(ssid="Home", password="secret", priority=1024)
+    wifi.mark_clean()
+    
+    wifi.set_ignore_permanently(True)
+    assert wifi.dirty_fields == {"status_flags"}
+    
+    # 置き換えた StatusFlags の変更も追跡する
+    wifi.status_flags = StatusFlags()
+    wifi.mark_clean()
+    wifi.status_flags.ignore_today = True
+    assert wifi.dirty_fields == {"status_flags"}
+
+
+def test_mark_clean_with_stale_version_keeps_changes():
+    wifi = WiFiConfig(ssid="Home", password="secret", priority=1024)
+    wifi.mark_clean()
+    wifi.ssid = "Saved"
+    saved_version = wifi.version
+    wifi.ssid = "Changed while saving"
+    
+    wifi.mark_clean(saved_version)
+    
+    assert wifi.is_dirty
+    wifi.mark_clean(wifi.version)
+    assert not wifi.is_dirty
+
+
+def test_copy_keeps_dirty_state():
+    wifi = WiFiConfig(ssid="Home", password="secret", priority=1024)
+    wifi.mark_clean()
+    wifi.ssid = "Renamed"
+    
+    clone = copy.copy(wifi)
+    clone.mark_clean()
+    clone.status_flags.ignore_today = True
+    
+    assert wifi.dirty_fields == {"ssid"}
+    assert clone.dirty_fields == {"status_flags"}
+    assert not wifi.status_flags.ignore_today
+
+
+def test_loaded_configs_are_clean(storage):
+    assert not any(wifi.is_dirty for wifi in storage.get_wifi_configs())
+
+
+def test_update_of_clean_config_is_skipped(storage):
+    writes = _record_writes(storage)
+    wifi = storage.get_wifi_configs()[0]
+    
+    storage.update_wifi_config(wifi)
+    assert writes == []
+    
+    wifi.ssid = "Renamed"
+    storage.update_wifi_config(wifi)
+    assert len(writes) == 1
+    assert not wifi.is_dirty
+
+
+def test_save_writes_only_dirty_configs(storage):
+    writes = _record_writes(storage)
+    configs = storage.get_wifi_configs()
+    configs[1].set_ignore_today()
+    configs[3].password = "changed"
+    
+    storage.save_wifi_configs(configs)
+    
+    assert sorted(record["ssid"] for record in writes[0]) == ["Net-1", "Net-3"]
+    assert not any(wifi.is_dirty for wifi in configs)
+    storage.invalidate_cache()
+    assert storage.get_wifi_configs()[3].password.reveal() == "changed"
@@ -0,0 +1,53 @@
+import itertools
+
+from models.wifi_config import StatusFlags, WiFiConfig, compute_ignored_flags, exclude_ignored
+from models.wifi_config_table import WiFiConfigTable
+
+TODAY = 20000
+
+
+def _all_flag_combinations():
+    configs = []
+    for ignore_today, permanent, day in itertools.product(
+            (False, True), (False, True), (None, TODAY - 1, TODAY, TODAY + 1)):
+        configs.append(WiFiConfig(
+            ssid=f"Net-{len(configs)}", password="secret", priority=len(configs),
+            status_flags=StatusFlags(ignore_today, permanent, day),
+        ))
+    return configs
+
+
+def test_flags_match_is_ignored():
+    configs = _all_flag_combinations()
+    
+    assert compute_ignored_flags(configs, TODAY) == [wifi.is_ignored(TODAY) for wifi in configs]
+    assert exclude_ignored(configs, TODAY) == [wifi for wifi in configs if not wifi.is_ignored(TODAY)]
+    # 判定だけでフラグは変更しない
+    assert [wifi.status_flags.ignore_today for wifi in configs] == [
+        wifi.status_flags.ignore_today for wifi in _all_flag_combinations()
+    ]
+
+
+def test_expired_ignore_today_is_not_ignored():
+    wifi = WiFiConfig(ssid="Cafe", password="", priority=1,
+                      status_flags=StatusFlags(ignore_today=True, last_ignored_date=TODAY - 1))
+    
+    assert compute_ignored_flags([wifi], TODAY) == [False]
+    assert compute_ignored_flags([wifi], TODAY - 1) == [True]
+
+
+def test_accepts_iterators_and_empty_input():
+    configs = _all_flag_combinations()
+    
+    assert exclude_ignored(iter(configs), TODAY) == exclude_ignored(configs, TODAY)
+    assert compute_ignored_flags([], TODAY) == []
+    assert exclude_ignored([], TODAY) == []
+
+
+def test_table_mask_matches_flags():
+    configs = _all_flag_combinations()
+    table = WiFiConfigTable(configs)
+    
+    flags = compute_ignored_flags(configs, TODAY)
+    assert table.ignored_mask(TODAY) == sum(1 << i for i, ignored in enumerate(flags) if ignored)
+    assert WiFiConfigTable().ignored_mask(TODAY) == 0
@@ -0,0 +1,74 @@
+import shutil
+import tempfile
+
+import pytest
+
+from models.wifi_config import EncryptedPassword, WiFiConfig
+from services.storage_manager import StorageManager
+
+
+@pytest.fixture(params=["json", "sqlite"])
+def storage(request):
+    directory = tempfile.mkdtemp(prefix="passwords")
+    storage = StorageManager(storage_dir=directory, backend=request.param)
+    storage.save_wifi_configs([
+        WiFiConfig(ssid=f"Net-{i}", password=f"secret-{i}", priority=(i + 1) * 1024) for i in range(5)
+    ])
+    yield storage
+    storage.close()
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+def _count_decrypts(storage):
+    calls = []
+    decrypt = storage._cipher.decrypt
+    storage._cipher.decrypt = lambda token: (calls.append(token), decrypt(token))[1]
+    return calls
+
+
+def test_passwords_are_decrypted_only_when_revealed(storage):
+    storage.invalidate_cache()
+    calls = _count_decrypts(storage)
+    
+    configs = storage.get_wifi_configs()
+    
+    assert calls == []
+    assert all(isinstance(wifi.password, EncryptedPassword) for wifi in configs)
+    assert "secret" not in repr(configs)
+    assert configs[3].password.reveal() == "secret-3"
+    assert len(calls) == 1
+
+
+def test_load_config_returns_plaintext(storage):
+    config = storage.load_config()
+    
+    assert [wifi["password"] for wifi in config["wifi_configs"]] == [f"secret-{i}" for i in range(5)]
+
+
+def test_unchanged_passwords_are_not_rewritten(storage):
+    storage.invalidate_cache()
+    writes = []
+    write = storage.backend.write
+    storage.backend.write = lambda puts, deletes, sections: (writes.append(puts), write(puts, deletes, sections))
+    tokens = {wifi.id: wifi.password.token for wifi in storage.get_wifi_configs()}
+    
+    storage.save_config(storage.load_config())
+    wifi = storage.get_wifi_configs()[1]
+    wifi.ssid = "Renamed"
+    storage.update_wifi_config(wifi)
+    
+    assert len(writes) == 1
+    assert [record["password"] for record in writes[0]] == [tokens[wifi.id]]
+
+
+def test_changed_password_is_encrypted_on_save(storage):
+    config = storage.load_config()
+    config["wifi_configs"][2]["password"] = "changed"
+    
+    storage.save_config(config)
+    
+    cached = storage._load_cached_config()["wifi_configs"]
+    assert all(isinstance(wifi["password"], EncryptedPassword) for wifi in cached)
+    storage.invalidate_cache()
+    assert storage.get_wifi_configs()[2].password.reveal() == "changed"
+    assert storage.get_wifi_configs()[1].password.reveal() == "secret-1"
@@ -0,0 +1,142 @@
+import shutil
+import tempfile
+import threading
+import time
+from datetime import date
+
+import pytest
+
+from models import wifi_config
+from models.wifi_config import StatusFlags, WiFiConfig, to_epoch_day
+from services import midnight_rollover
+from services.midnight_rollover import MidnightRolloverScheduler
+from services.storage_manager import StorageManager
+
+DAY = 20000
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """スケジューラが参照する「今日」を差し替える"""
+    current = {"day": DAY}
+    monkeypatch.setattr(midnight_rollover, "today_epoch_day", lambda: current["day"])
+    return current
+
+
+@pytest.fixture
+def storage():
+    directory = tempfile.mkdtemp(prefix="rollover")
+    storage = StorageManager(storage_dir=directory)
+    storage.save_wifi_configs([
+        WiFiConfig(ssid="Yesterday", password="secret", priority=1024, id="yesterday",
+                   status_flags=StatusFlags(ignore_today=True, last_ignored_date=DAY - 1)),
+        WiFiConfig(ssid="Today", password="secret", priority=2048, id="today",
+                   status_flags=StatusFlags(ignore_today=True, last_ignored_date=DAY)),
+        WiFiConfig(ssid="Permanent", password="secret", priority=3072, id="permanent",
+                   status_flags=StatusFlags(ignore_until_manual_reset=True, last_ignored_date=DAY - 5)),
+        WiFiConfig(ssid="Normal", password="secret", priority=4096, id="normal"),
+    ])
+    yield storage
+    storage.close()
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+def _ignored_today(storage):
+    return sorted(w.id for w in storage.get_wifi_configs() if w.status_flags.ignore_today)
+
+
+def test_expired_flags_are_cleared_in_one_write(storage, clock):
+    writes = []
+    write = storage.backend.write
+    storage.backend.write = lambda puts, deletes, sections: (writes.append(puts), write(puts, deletes, sections))
+    notified = []
+    scheduler = MidnightRolloverScheduler(storage, on_rollover=notified.append)
+    
+    expired = scheduler.check()
+    
+    assert [w.id for w in expired] == ["yesterday"]
+    assert [[w.id for w in batch] for batch in notified] == [["yesterday"]]
+    assert [[record["id"] for record in puts] for puts in writes] == [["yesterday"]]
+    assert _ignored_today(StorageManager(storage_dir=storage.storage_dir)) == ["today"]
+    # 永続的な無視はそのまま
+    assert storage.get_wifi_config("permanent").should_ignore_permanently()
+
+
+def test_check_is_noop_until_the_date_changes(storage, clock):
+    notified = []
+    scheduler = MidnightRolloverScheduler(storage, on_rollover=notified.append)
+    scheduler.check()
+    
+    assert scheduler.check() == []
+    assert len(notified) == 1
+    
+    clock["day"] = DAY + 1
+    assert [w.id for w in scheduler.check()] == ["today"]
+    assert _ignored_today(storage) == []
+    assert len(notified) == 2
+    
+    # 解除するものがない日付の変更では通知しない
+    clock["day"] = DAY + 2
+    assert scheduler.check() == []
+    assert len(notified) == 2
+
+
+def test_flag_set_before_midnight_stops_applying_before_it_is_cleared(storage):
+    wifi = storage.get_wifi_config("today")
+    
+    assert wifi.should_ignore_today(DAY)
+    assert not wifi.should_ignore_today(DAY + 1)
+    assert wifi.is_ignore_today_expired(DAY + 1)
+    assert storage.best_scanned_network(["Today"], today=DAY) is None
+    assert storage.best_scanned_network(["Today"], today=DAY + 1).id == "today"
+
+
+def test_failed_expiry_is_retried(storage, clock):
+    scheduler = MidnightRolloverScheduler(storage)
+    
+    def broken(today):
+        raise OSError("disk full")
+    storage.expire_ignore_today = broken
+    assert scheduler.check() == []
+    
+    # 失敗した日は処理済みにしないので、次の確認でやり直す
+    del storage.expire_ignore_today
+    assert [w.id for w in scheduler.check()] == ["yesterday"]
+
+
+def test_callback_error_does_not_stop_the_rollover(storage, clock):
+    def broken(expired):
+        raise RuntimeError("UI is gone")
+    scheduler = MidnightRolloverScheduler(storage, on_rollover=broken)
+    
+    assert [w.id for w in scheduler.check()] == ["yesterday"]
+    assert _ignored_today(storage) == ["today"]
+
+
+def test_background_thread_clears_flags_after_midnight(storage, clock):
+    rolled_over = threading.Event()
+    notified = []
+    scheduler = MidnightRolloverScheduler(
+        storage, on_rollover=lambda expired: (notified.append(expired), rolled_over.set()),
+        check_interval=0.01,
+    )
+    scheduler.start()
+    try:
+        assert rolled_over.wait(5)
+        rolled_over.clear()
+        clock["day"] = DAY + 1
+        assert rolled_over.wait(5)
+    finally:
+        scheduler.stop()
+    
+    assert [[w.id for w in expired] for expired in notified] == [["yesterday"], ["today"]]
+    assert _ignored_today(storage) == []
+
+
+def test_today_epoch_day_recomputes_after_midnight(monkeypatch):
+    monkeypatch.setattr(wifi_config, "_today_cache", (123, time.time() + 60))
+    assert wifi_config.today_epoch_day() == 123
+    
+    # 次の0時を過ぎたらキャッシュを使わない
+    monkeypatch.setattr(wifi_config, "_today_cache", (123, time.time() - 1))
+    assert wifi_config.today_epoch_day() == to_epoch_day(date.today())
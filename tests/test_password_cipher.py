@@ -0,0 +1,110 @@
+import base64
+import json
+import os
+import shutil
+import tempfile
+
+import pytest
+
+from models.wifi_config import WiFiConfig
+from services import password_cipher
+from services.password_cipher import KEY_SIZE, PasswordCipher, get_password_cipher
+from services.storage_manager import StorageManager
+
+
+@pytest.fixture
+def storage_dir():
+    directory = tempfile.mkdtemp(prefix="cipher")
+    yield directory
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+def _tamper(token):
+    prefix, _, body = token.partition(":")
+    sealed = bytearray(base64.b64decode(body))
+    sealed[-1] ^= 1
+    return f"{prefix}:{base64.b64encode(bytes(sealed)).decode('ascii')}"
+
+
+def test_round_trip_and_tamper_detection():
+    cipher = PasswordCipher(os.urandom(KEY_SIZE))
+    token = cipher.encrypt("パスワード")
+    
+    assert token.startswith(PasswordCipher.GCM_PREFIX)
+    assert cipher.decrypt(token) == "パスワード"
+    assert cipher.decrypt_many(cipher.encrypt_many(["a", "b"])) == ["a", "b"]
+    with pytest.raises(ValueError):
+        cipher.decrypt(_tamper(token))
+    with pytest.raises(ValueError):
+        PasswordCipher(os.urandom(KEY_SIZE)).decrypt(token)
+
+
+def test_falls_back_to_hmac_without_cryptography(storage_dir, monkeypatch, capsys):
+    monkeypatch.setattr(password_cipher, "AESGCM", None)
+    monkeypatch.setattr(password_cipher, "_cipher_cache", {})
+    key_file = os.path.join(storage_dir, "encryption.key")
+    
+    cipher = get_password_cipher(key_file)
+    
+    assert "警告" in capsys.readouterr().out
+    token = cipher.encrypt("secret")
+    assert token.startswith(PasswordCipher.HMAC_PREFIX)
+    assert cipher.decrypt(token) == "secret"
+    with pytest.raises(ValueError):
+        cipher.decrypt(_tamper(token))
+    
+    # cryptography が入った後も読み込め、AES-GCM で暗号化し直す対象になる
+    monkeypatch.undo()
+    upgraded = PasswordCipher(password_cipher.load_or_create_key(key_file))
+    assert upgraded.decrypt(token) == "secret"
+    assert upgraded.needs_reencryption(token)
+
+
+def test_storage_starts_without_cryptography(storage_dir, monkeypatch):
+    monkeypatch.setattr(password_cipher, "AESGCM", None)
+    monkeypatch.setattr(password_cipher, "_cipher_cache", {})
+    
+    storage = StorageManager(storage_dir=storage_dir)
+    storage.add_wifi_config(WiFiConfig(ssid="Home", password="secret", priority=1024))
+    storage.invalidate_cache()
+    
+    assert storage.get_wifi_configs()[0].password.reveal() == "secret"
+
+
+def _write_tampered(storage_dir):
+    storage = StorageManager(storage_dir=storage_dir)
+    storage.save_wifi_configs([
+        WiFiConfig(ssid="Home", password="secret", priority=1024, id="home"),
+        WiFiConfig(ssid="Office", password="office", priority=2048, id="office"),
+    ])
+    storage.close()
+    with open(storage.config_file, encoding="utf-8") as f:
+        config = json.load(f)
+    config["wifi_configs"][0]["password"] = _tamper(config["wifi_configs"][0]["password"])
+    with open(storage.config_file, "w", encoding="utf-8") as f:
+        json.dump(config, f)
+
+
+def test_tampered_password_raises_instead_of_returning_empty(storage_dir, capsys):
+    _write_tampered(storage_dir)
+    storage = StorageManager(storage_dir=storage_dir)
+    
+    with pytest.raises(ValueError):
+        storage.get_wifi_config("home").password.reveal()
+    assert "パスワード復号化エラー" in capsys.readouterr().out
+    assert storage.get_wifi_config("office").password.reveal() == "office"
+    with pytest.raises(ValueError):
+        storage.load_config()
+
+
+def test_tampered_password_can_be_replaced(storage_dir):
+    _write_tampered(storage_dir)
+    storage = StorageManager(storage_dir=storage_dir)
+    
+    wifi = storage.get_wifi_config("home")
+    wifi.password = "re-entered"
+    storage.update_wifi_config(wifi)
+    storage.invalidate_cache()
+    
+    assert storage.get_wifi_config("home").password.reveal() == "re-entered"
+    assert storage.load_config()["wifi_configs"][0]["password"] == "re-entered"
@@ -0,0 +1,138 @@
+import shutil
+import tempfile
+
+import pytest
+
+from models.wifi_config import WiFiConfig
+from services.priority_index import PRIORITY_STEP, PriorityIndex
+from services.storage_manager import StorageManager
+
+
+def _configs(count):
+    return [
+        WiFiConfig(ssid=f"Net-{i}", password="secret", priority=(i + 1) * PRIORITY_STEP, id=f"id-{i}")
+        for i in range(count)
+    ]
+
+
+@pytest.fixture
+def storage():
+    directory = tempfile.mkdtemp(prefix="priority")
+    storage = StorageManager(storage_dir=directory)
+    storage.save_wifi_configs(_configs(5))
+    yield storage
+    storage.close()
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+def _order(index):
+    return [wifi.id for wifi in index.to_list()]
+
+
+def test_keeps_priority_order_with_stable_ties():
+    configs = [
+        WiFiConfig(ssid="c", password="", priority=2048, id="c"),
+        WiFiConfig(ssid="a", password="", priority=1024, id="a"),
+        WiFiConfig(ssid="b", password="", priority=2048, id="b"),
+    ]
+    index = PriorityIndex(configs)
+    
+    assert _order(index) == ["a", "c", "b"]
+    index.put(WiFiConfig(ssid="d", password="", priority=1024, id="d"))
+    assert _order(index) == ["a", "d", "c", "b"]
+    assert index.next_priority() == 2048 + PRIORITY_STEP
+
+
+def test_put_after_priority_change_moves_entry():
+    configs = _configs(4)
+    index = PriorityIndex(configs)
+    
+    configs[3].priority = 1
+    index.put(configs[3])
+    
+    assert _order(index) == ["id-3", "id-0", "id-1", "id-2"]
+    assert index.index_of("id-3") == 0
+    assert index.remove("id-0") is configs[0]
+    assert index.index_of("id-0") == -1
+    assert index.get("id-2") is configs[2]
+
+
+def test_move_into_a_gap_changes_only_the_moved_entry():
+    index = PriorityIndex(_configs(5))
+    
+    changed = index.move("id-4", 1)
+    
+    assert [wifi.id for wifi in changed] == ["id-4"]
+    assert changed[0].priority == PRIORITY_STEP + PRIORITY_STEP // 2
+    assert _order(index) == ["id-0", "id-4", "id-1", "id-2", "id-3"]
+
+
+def test_moves_to_the_ends():
+    index = PriorityIndex(_configs(3))
+    
+    assert [wifi.id for wifi in index.move("id-0", 10)] == ["id-0"]
+    assert _order(index) == ["id-1", "id-2", "id-0"]
+    assert index.move("id-0", 2) == []
+    index.move("id-0", -5)
+    assert _order(index) == ["id-0", "id-1", "id-2"]
+    assert index.get("id-0").priority < index.get("id-1").priority
+
+
+def test_exhausted_gap_respaces_everything():
+    index = PriorityIndex(_configs(3))
+    
+    # 同じ場所への移動を繰り返すと、いずれ間に空きがなくなる
+    moves = 0
+    while True:
+        moved = "id-2" if index.index_of("id-2") != 1 else "id-0"
+        changed = index.move(moved, 1)
+        moves += 1
+        if len(changed) > 1:
+            break
+        assert moves < 20
+    
+    priorities = [wifi.priority for wifi in index.to_list()]
+    assert priorities == [PRIORITY_STEP, 2 * PRIORITY_STEP, 3 * PRIORITY_STEP]
+    assert len(set(priorities)) == 3
+
+
+def test_move_unknown_id_raises():
+    with pytest.raises(KeyError):
+        PriorityIndex(_configs(2)).move("missing", 0)
+
+
+def test_storage_move_writes_one_record(storage):
+    writes = []
+    write = storage.backend.write
+    storage.backend.write = lambda puts, deletes, sections: (writes.append(puts), write(puts, deletes, sections))
+    
+    storage.move_wifi_config("id-4", 0)
+    
+    assert [[record["id"] for record in puts] for puts in writes] == [["id-4"]]
+    reopened = StorageManager(storage_dir=storage.storage_dir)
+    assert [wifi.id for wifi in reopened.get_wifi_configs()] == ["id-4", "id-0", "id-1", "id-2", "id-3"]
+
+
+def test_renumber_priorities(storage):
+    writes = []
+    write = storage.backend.write
+    storage.backend.write = lambda puts, deletes, sections: (writes.append(puts), write(puts, deletes, sections))
+    
+    storage.renumber_priorities(["id-1", "id-0"])
+    
+    configs = StorageManager(storage_dir=storage.storage_dir).get_wifi_configs()
+    assert [wifi.id for wifi in configs] == ["id-1", "id-0", "id-2", "id-3", "id-4"]
+    assert [wifi.priority for wifi in configs] == [(i + 1) * PRIORITY_STEP for i in range(5)]
+    # 優先順位が変わらなかったWi-Fiは書き込まない
+    assert [sorted(record["id"] for record in puts) for puts in writes] == [["id-0", "id-1"]]
+
+
+def test_renumber_after_moves_restores_even_spacing(storage):
+    storage.move_wifi_config("id-4", 1)
+    storage.move_wifi_config("id-3", 1)
+    
+    storage.renumber_priorities()
+    
+    configs = StorageManager(storage_dir=storage.storage_dir).get_wifi_configs()
+    assert [wifi.id for wifi in configs] == ["id-0", "id-3", "id-4", "id-1", "id-2"]
+    assert [wifi.priority for wifi in configs] == [(i + 1) * PRIORITY_STEP for i in range(5)]
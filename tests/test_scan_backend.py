@@ -0,0 +1,91 @@
+import asyncio
+
+import pytest
+
+from models.scan_result import ScanResult
+from services import wifi_manager as wifi_manager_module
+from services.wifi_manager import WiFiManager
+
+
+@pytest.fixture
+def manager():
+    manager = WiFiManager()
+    manager.is_android = True
+    yield manager
+    manager.close()
+
+
+async def hang():
+    await asyncio.sleep(3600)
+
+
+async def broken():
+    raise RuntimeError("no root")
+
+
+async def works():
+    return [ScanResult("Home", "aa:bb:cc:dd:ee:01")]
+
+
+def test_probe_gives_each_backend_its_own_budget(manager, monkeypatch):
+    monkeypatch.setattr(wifi_manager_module, "PROBE_TIMEOUT", 0.05)
+    manager._scan_backends = {"wpa_ctrl": hang, "iw": broken, "wpa_cli": works}
+    
+    results = asyncio.run(manager.scan_results_async(timeout=5))
+    
+    assert [r.ssid for r in results] == ["Home"]
+    timings = manager.get_scan_backend_info()["probe_timings"]
+    assert [(t["backend"], t["ok"]) for t in timings] == [("wpa_ctrl", False), ("iw", False), ("wpa_cli", True)]
+    assert manager.scan_backend.backend == "wpa_cli"
+
+
+def test_probe_cut_short_by_the_scan_timeout_is_still_recorded(manager):
+    calls = []
+    
+    async def slow():
+        calls.append("slow")
+        await hang()
+    manager._scan_backends = {"wpa_ctrl": broken, "iw": slow}
+    
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(manager.scan_results_async(timeout=0.05))
+    
+    timings = manager.get_scan_backend_info()["probe_timings"]
+    assert [(t["backend"], t["ok"], t["error"]) for t in timings][-1] == ("iw", False, "cancelled")
+    assert manager.scan_backend.probe_count == 1
+    assert not manager.scan_backend.needs_probe()
+    
+    # 次の判定までは、遅い方法をもう一度試さない
+    with pytest.raises(RuntimeError):
+        asyncio.run(manager.scan_results_async(timeout=0.05))
+    assert calls == ["slow"]
+
+
+def test_failed_android_scan_raises_instead_of_returning_mock_networks(manager):
+    manager._scan_backends = {"iw": broken}
+    
+    with pytest.raises(RuntimeError):
+        manager.start_scan(force_refresh=True).result()
+    
+    # 失敗したスキャンはキャッシュしない
+    assert manager.scan_cache.peek() is None
+
+
+def test_selected_backend_failure_is_not_cached(manager):
+    manager._scan_backends = {"iw": works}
+    assert [r.ssid for r in manager.start_scan(force_refresh=True).result().results] == ["Home"]
+    manager.scan_cache.invalidate()
+    manager._scan_backends["iw"] = broken
+    
+    with pytest.raises(RuntimeError):
+        manager.start_scan().result()
+    assert manager.scan_cache.peek() is None
+    assert manager.scan_backend.failures == 1
+
+
+def test_development_environment_still_uses_mock_networks():
+    manager = WiFiManager()
+    manager.is_android = False
+    
+    assert asyncio.run(manager.scan_results_async()) == manager._scan_results_mock()
+    manager.close()
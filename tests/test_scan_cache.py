@@ -0,0 +1,198 @@
+import asyncio
+import threading
+
+import pytest
+
+from models.scan_result import ScanResult
+from services.wifi_manager import ScanCache
+
+
+def _result(ssid):
+    return ScanResult(ssid=ssid, bssid="02:00:00:00:00:01")
+
+
+class CountingScan:
+    """呼び出し回数を数えるスキャン関数（release まで結果を返さない）"""
+    
+    def __init__(self, *ssids, blocking=False):
+        self.ssids = ssids
+        self.calls = 0
+        self.cancelled = 0
+        self.started = threading.Event()
+        self.release = threading.Event()
+        if not blocking:
+            self.release.set()
+    
+    async def __call__(self):
+        self.calls += 1
+        self.started.set()
+        try:
+            while not self.release.is_set():
+                await asyncio.sleep(0.005)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return [_result(ssid) for ssid in self.ssids]
+
+
+def test_result_is_reused_within_ttl():
+    cache = ScanCache(ttl=60)
+    scan = CountingScan("Home", "Office")
+    
+    async def main():
+        first = await cache.get(scan)
+        second = await cache.get(scan)
+        return first, second
+    
+    first, second = asyncio.run(main())
+    
+    assert scan.calls == 1
+    assert second is first
+    assert first.networks == ["Home", "Office"]
+    assert cache.peek() is first
+
+
+def test_expired_result_is_rescanned():
+    cache = ScanCache(ttl=0.05)
+    scan = CountingScan("Home")
+    
+    async def main():
+        first = await cache.get(scan)
+        await asyncio.sleep(0.1)
+        assert cache.peek() is None
+        return first, await cache.get(scan)
+    
+    first, second = asyncio.run(main())
+    
+    assert scan.calls == 2
+    assert second is not first
+
+
+def test_force_refresh_and_zero_ttl_skip_the_cache():
+    scan = CountingScan("Home")
+    cache = ScanCache(ttl=60)
+    asyncio.run(cache.get(scan))
+    asyncio.run(cache.get(scan, force_refresh=True))
+    assert scan.calls == 2
+    
+    uncached = ScanCache(ttl=0)
+    asyncio.run(uncached.get(scan))
+    asyncio.run(uncached.get(scan))
+    assert scan.calls == 4
+    assert uncached.peek() is None
+    uncached.put([_result("Home")])
+    assert uncached.peek() is None
+
+
+def test_put_and_invalidate():
+    cache = ScanCache(ttl=60)
+    
+    snapshot = cache.put([_result("Event")])
+    assert cache.peek() is snapshot
+    assert asyncio.run(cache.get(CountingScan("Scan"))) is snapshot
+    
+    cache.invalidate()
+    assert cache.peek() is None
+
+
+def test_concurrent_callers_share_one_scan():
+    cache = ScanCache(ttl=60)
+    scan = CountingScan("Home", blocking=True)
+    
+    async def main():
+        callers = [asyncio.ensure_future(cache.get(scan, force_refresh=True)) for _ in range(5)]
+        await asyncio.sleep(0.02)
+        scan.release.set()
+        return await asyncio.gather(*callers)
+    
+    snapshots = asyncio.run(main())
+    
+    assert scan.calls == 1
+    assert all(snapshot is snapshots[0] for snapshot in snapshots)
+
+
+def test_callers_on_different_event_loops_share_one_scan():
+    cache = ScanCache(ttl=60)
+    scan = CountingScan("Home", blocking=True)
+    results = []
+    worker = threading.Thread(target=lambda: results.append(asyncio.run(cache.get(scan))))
+    worker.start()
+    assert scan.started.wait(5)
+    
+    async def join_and_release():
+        waiter = asyncio.ensure_future(cache.get(scan))
+        await asyncio.sleep(0.02)
+        scan.release.set()
+        return await waiter
+    
+    snapshot = asyncio.run(join_and_release())
+    worker.join(5)
+    
+    assert scan.calls == 1
+    assert results == [snapshot]
+
+
+def test_failed_scan_is_shared_and_not_cached():
+    cache = ScanCache(ttl=60)
+    calls = []
+    
+    async def failing():
+        calls.append(None)
+        await asyncio.sleep(0.01)
+        raise RuntimeError("scan failed")
+    
+    async def main():
+        return await asyncio.gather(cache.get(failing), cache.get(failing), return_exceptions=True)
+    
+    errors = asyncio.run(main())
+    
+    assert len(calls) == 1
+    assert all(isinstance(error, RuntimeError) for error in errors)
+    assert cache.peek() is None
+    with pytest.raises(RuntimeError):
+        asyncio.run(cache.get(failing))
+    assert len(calls) == 2
+
+
+def test_cancelling_one_waiter_keeps_the_scan_running():
+    cache = ScanCache(ttl=60)
+    scan = CountingScan("Home", blocking=True)
+    
+    async def main():
+        cancelled = asyncio.ensure_future(cache.get(scan))
+        kept = asyncio.ensure_future(cache.get(scan))
+        await asyncio.sleep(0.02)
+        cancelled.cancel()
+        await asyncio.sleep(0.02)
+        scan.release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled
+        return await kept
+    
+    snapshot = asyncio.run(main())
+    
+    assert scan.cancelled == 0
+    assert snapshot.networks == ["Home"]
+    assert cache.peek() is snapshot
+
+
+def test_cancelling_the_last_waiter_cancels_the_scan():
+    cache = ScanCache(ttl=60)
+    scan = CountingScan("Home", blocking=True)
+    
+    async def main():
+        waiter = asyncio.ensure_future(cache.get(scan))
+        await asyncio.sleep(0.02)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        await asyncio.sleep(0.02)
+        # 次の呼び出しは新しいスキャンを始める
+        scan.release.set()
+        return await cache.get(scan)
+    
+    snapshot = asyncio.run(main())
+    
+    assert scan.cancelled == 1
+    assert scan.calls == 2
+    assert snapshot.networks == ["Home"]
@@ -0,0 +1,174 @@
+import asyncio
+import os
+
+import pytest
+
+from models.scan_result import ScanResult
+from services.scan_parser import (
+    IwScanParser, StrongestBySsid, parse_iw_scan, parse_wpa_cli_scan_results,
+    read_scan_results, unescape_ssid,
+)
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+# iw_scan.txt / wpa_cli_scan_results.txt に含まれるBSS（bssid -> (ssid, freq, signal)）
+EXPECTED_BSS = {
+    "3c:37:86:5e:2a:11": ("MyHome", 5180, -52.0),
+    "3c:37:86:5e:2a:10": ("MyHome", 2437, -61.0),
+    "7c:a9:6b:01:9d:c4": ("カフェ_Free ", 2412, -74.0),
+    "02:1a:11:f0:33:7e": ("Station_Open", 2462, -80.0),
+    "00:0d:0b:44:12:90": ("OldPrinter", 2472, -86.0),
+    "64:d1:54:7a:00:21": ("Corp-Secure", 5500, -66.0),
+    "64:d1:54:7a:00:22": ("", 5500, -67.0),
+    "8e:15:44:90:ab:03": ("", 5745, -70.0),
+    "5a:ef:68:2c:19:b0": ('Guest \\ "Lounge"', 5240, -58.0),
+}
+
+
+def read_fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return f.read().splitlines(keepends=True)
+
+
+def by_bssid(results):
+    return {r.bssid: r for r in results}
+
+
+def normalized_flags(flags):
+    """暗号方式の並び順（iw は表示順、wpa_cli は固定順）の違いを除いたフラグ"""
+    normalized = []
+    for flag in flags:
+        head, sep, ciphers = flag.rpartition("-")
+        normalized.append(f"{head}{sep}{'+'.join(sorted(ciphers.split('+')))}" if sep else flag)
+    return tuple(normalized)
+
+
+@pytest.mark.parametrize("name, parse", [
+    ("iw_scan.txt", parse_iw_scan),
+    ("wpa_cli_scan_results.txt", parse_wpa_cli_scan_results),
+])
+def test_parses_every_bss(name, parse):
+    results = by_bssid(parse(read_fixture(name)))
+    
+    assert {bssid: (r.ssid, r.freq, r.signal_dbm) for bssid, r in results.items()} == EXPECTED_BSS
+
+
+def test_iw_security_flags():
+    results = by_bssid(parse_iw_scan(read_fixture("iw_scan.txt")))
+    
+    assert results["3c:37:86:5e:2a:11"].flags == ("WPA2-PSK+SAE-CCMP", "ESS")
+    assert results["7c:a9:6b:01:9d:c4"].flags == ("WPA-PSK-TKIP+CCMP", "WPA2-PSK-CCMP+TKIP", "ESS")
+    assert results["64:d1:54:7a:00:21"].flags == ("WPA2-EAP+FT/EAP-CCMP", "ESS")
+    assert results["5a:ef:68:2c:19:b0"].flags == ("WPA2-OWE-CCMP", "ESS")
+    assert results["00:0d:0b:44:12:90"].flags == ("WEP", "ESS")
+    assert results["02:1a:11:f0:33:7e"].flags == ("ESS",)
+
+
+def test_wpa_cli_security_flags():
+    results = by_bssid(parse_wpa_cli_scan_results(read_fixture("wpa_cli_scan_results.txt")))
+    
+    assert results["3c:37:86:5e:2a:11"].flags == ("WPA2-PSK+SAE-CCMP", "ESS")
+    assert results["7c:a9:6b:01:9d:c4"].flags == ("WPA-PSK-CCMP+TKIP", "WPA2-PSK-CCMP+TKIP", "ESS")
+    assert results["00:0d:0b:44:12:90"].flags == ("WEP", "ESS")
+
+
+@pytest.mark.parametrize("name, parse", [
+    ("iw_scan.txt", parse_iw_scan),
+    ("wpa_cli_scan_results.txt", parse_wpa_cli_scan_results),
+])
+def test_open_networks(name, parse):
+    results = list(parse(read_fixture(name)))
+    
+    assert sorted(r.ssid for r in results if r.is_open) == ["Station_Open"]
+
+
+@pytest.mark.parametrize("name, parse", [
+    ("iw_scan.txt", parse_iw_scan),
+    ("wpa_cli_scan_results.txt", parse_wpa_cli_scan_results),
+])
+def test_strongest_by_ssid_keeps_the_strongest_bss_and_drops_hidden_ones(name, parse):
+    strongest = StrongestBySsid(parse(read_fixture(name)))
+    results = strongest.results()
+    
+    assert len(strongest) == 6
+    assert [r.ssid for r in results] == [
+        "MyHome", 'Guest \\ "Lounge"', "Corp-Secure", "カフェ_Free ", "Station_Open", "OldPrinter",
+    ]
+    assert results[0] == ScanResult("MyHome", "3c:37:86:5e:2a:11", 5180, -52.0, ("WPA2-PSK+SAE-CCMP", "ESS"))
+    assert [r.signal_dbm for r in results] == sorted((r.signal_dbm for r in results), reverse=True)
+    assert "" not in {r.ssid for r in results}
+
+
+def test_strongest_by_ssid_prefers_known_signal_and_keeps_the_first_of_equals():
+    strongest = StrongestBySsid([
+        ScanResult("Net", "00:00:00:00:00:01", 2412, None),
+        ScanResult("Net", "00:00:00:00:00:02", 2412, -70.0),
+        ScanResult("Net", "00:00:00:00:00:03", 2412, -70.0),
+        ScanResult("Other", "00:00:00:00:00:04", 2412, None),
+    ])
+    
+    assert [(r.ssid, r.bssid) for r in strongest.results()] == [
+        ("Net", "00:00:00:00:00:02"), ("Other", "00:00:00:00:00:04"),
+    ]
+
+
+@pytest.mark.parametrize("escaped, expected", [
+    ("plain", "plain"),
+    ("\\xe3\\x82\\xab\\xe3\\x83\\x95\\xe3\\x82\\xa7", "カフェ"),
+    ("\\x20lead and trail\\x20", " lead and trail "),
+    ("back\\\\slash \\\"quoted\\\"", 'back\\slash "quoted"'),
+    ("tab\\tnew\\nline", "tab\tnew\nline"),
+    ("broken \\xff utf-8", "broken � utf-8"),
+    ("\\x00\\x00\\x00", ""),
+])
+def test_unescape_ssid(escaped, expected):
+    assert unescape_ssid(escaped) == expected
+
+
+def test_large_captures_agree_between_iw_and_wpa_cli():
+    iw = list(parse_iw_scan(read_fixture("iw_scan_large.txt")))
+    wpa = list(parse_wpa_cli_scan_results(read_fixture("wpa_cli_scan_results_large.txt")))
+    
+    assert len(iw) == len(wpa) == 240
+    assert len(by_bssid(iw)) == 240
+    assert {r.bssid: (r.ssid, r.freq, r.signal_dbm, normalized_flags(r.flags)) for r in iw} == {
+        r.bssid: (r.ssid, r.freq, r.signal_dbm, normalized_flags(r.flags)) for r in wpa
+    }
+    assert any(r.ssid == "" for r in iw)
+    assert any(not r.ssid.isascii() for r in iw)
+    assert any(r.ssid != r.ssid.strip() for r in iw)
+
+
+def test_large_capture_strongest_by_ssid():
+    iw = list(parse_iw_scan(read_fixture("iw_scan_large.txt")))
+    expected = {}
+    for r in iw:
+        if r.ssid and (r.ssid not in expected or r.signal_dbm > expected[r.ssid].signal_dbm):
+            expected[r.ssid] = r
+    
+    results = StrongestBySsid(iw).results()
+    
+    assert {r.ssid: r.bssid for r in results} == {ssid: r.bssid for ssid, r in expected.items()}
+    assert [r.signal_dbm for r in results] == sorted((r.signal_dbm for r in results), reverse=True)
+
+
+def test_read_scan_results_streams_a_large_capture():
+    lines = read_fixture("iw_scan_large.txt")
+    
+    async def read():
+        stream = asyncio.StreamReader()
+        stream.feed_data("".join(lines).encode("utf-8"))
+        stream.feed_eof()
+        return await read_scan_results(stream, IwScanParser())
+    
+    assert asyncio.run(read()) == StrongestBySsid(parse_iw_scan(lines)).results()
+
+
+def test_iw_parser_ignores_lines_before_the_first_bss_and_returns_the_last_on_close():
+    parser = IwScanParser()
+    
+    assert parser.feed("command failed: Device or resource busy (-16)\n") is None
+    assert parser.feed("BSS 00:11:22:33:44:55(on wlan0)\n") is None
+    assert parser.feed("\tSSID: Last\n") is None
+    assert parser.close().ssid == "Last"
+    assert parser.close() is None
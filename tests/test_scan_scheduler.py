@@ -0,0 +1,182 @@
+import os
+import shutil
+import tempfile
+import threading
+
+import pytest
+
+from models.scan_result import ScanResult
+from services.scan_scheduler import AdaptiveScanScheduler, scan_changed
+from services.simulated_wifi import ReplayWiFi, SyntheticWiFi, append_scan_trace
+from services.wifi_manager import WiFiManager
+from services.wpa_ctrl import EVENT_DISCONNECTED, EVENT_SCAN_RESULTS, WpaEvent
+
+
+def _result(ssid, signal_dbm=-50.0):
+    return ScanResult(ssid, "02:00:00:00:00:01", 2412, signal_dbm)
+
+
+@pytest.fixture
+def trace_dir():
+    directory = tempfile.mkdtemp(prefix="scheduler")
+    yield directory
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+def make_manager(simulator, connect_to=None):
+    manager = WiFiManager(simulator=simulator)
+    if connect_to is not None:
+        manager.scan_networks()
+        assert manager.connect_to_network(connect_to, "secret")
+    return manager
+
+
+def stable_manager(connected=True):
+    simulator = SyntheticWiFi(networks=5, churn_db=0.0, visibility_churn=0.0, seed=1)
+    return make_manager(simulator, "SimNet-0001" if connected else None)
+
+
+def test_scan_changed():
+    before = [_result("Home", -50.0), _result("Office", -70.0)]
+    
+    assert scan_changed(None, before)
+    assert not scan_changed(before, [_result("Office", -72.0), _result("Home", -48.0)])
+    assert scan_changed(before, [_result("Home", -50.0), _result("Office", -64.0)])
+    assert scan_changed(before, [_result("Home", -50.0)])
+    assert scan_changed(before, [_result("Home", -50.0), _result("Cafe", -70.0)])
+    assert scan_changed(before, [_result("Home", -50.0), _result("Office", None)])
+    assert not scan_changed(before, [_result("Home", -50.0), _result("Office", -64.0)], signal_change_db=10.0)
+
+
+def test_interval_options_are_validated_and_clamped():
+    manager = stable_manager(connected=False)
+    try:
+        with pytest.raises(ValueError):
+            AdaptiveScanScheduler(manager, min_interval=0)
+        with pytest.raises(ValueError):
+            AdaptiveScanScheduler(manager, min_interval=600, max_interval=300)
+        
+        scheduler = AdaptiveScanScheduler(manager, base_interval=5, min_interval=10, max_interval=100, min_spacing=20)
+        # スキャンの最小間隔より短い間隔にはしない
+        assert scheduler.min_interval == 20
+        assert scheduler.interval == 20
+        assert AdaptiveScanScheduler(manager, base_interval=1000, max_interval=100, min_spacing=0).interval == 100
+    finally:
+        manager.close()
+
+
+def test_interval_backs_off_while_nothing_changes():
+    manager = stable_manager()
+    scheduler = AdaptiveScanScheduler(manager, base_interval=60, min_interval=30, max_interval=200, min_spacing=0)
+    try:
+        intervals = []
+        for _ in range(5):
+            assert scheduler.tick()
+            intervals.append(scheduler.interval)
+    finally:
+        manager.close()
+    
+    assert intervals == [60, 120, 200, 200, 200]
+    assert manager.simulator.scan_count == 6
+
+
+def test_change_resets_to_the_short_interval(trace_dir):
+    path = os.path.join(trace_dir, "trace.jsonl")
+    home = [_result("Home", -50.0)]
+    for frame in (home, home, home, home, [_result("Home", -50.0), _result("Cafe", -60.0)], home):
+        append_scan_trace(path, frame)
+    manager = make_manager(ReplayWiFi(path, loop=False), connect_to="Home")
+    scheduler = AdaptiveScanScheduler(manager, base_interval=60, min_interval=30, max_interval=1000, min_spacing=0)
+    try:
+        intervals = []
+        for _ in range(5):
+            scheduler.tick()
+            intervals.append(scheduler.interval)
+    finally:
+        manager.close()
+    
+    # Cafe が見えたときと、見えなくなったときに短い間隔に戻る
+    assert intervals == [60, 120, 240, 30, 30]
+
+
+def test_short_interval_while_disconnected():
+    manager = stable_manager(connected=False)
+    scheduler = AdaptiveScanScheduler(manager, base_interval=60, min_interval=30, max_interval=200, min_spacing=0)
+    try:
+        for _ in range(3):
+            scheduler.tick()
+            assert scheduler.interval == 30
+    finally:
+        manager.close()
+
+
+def test_recent_scan_is_reused_instead_of_scanning():
+    manager = stable_manager(connected=True)
+    scheduler = AdaptiveScanScheduler(manager, base_interval=60, min_interval=30, max_interval=200, min_spacing=30)
+    try:
+        # アプリの他の場所で行ったスキャンも min_spacing の対象
+        scans = manager.simulator.scan_count
+        assert not scheduler.tick()
+        assert manager.simulator.scan_count == scans
+        
+        manager.scan_cache.invalidate()
+        assert scheduler.tick()
+        assert not scheduler.tick()
+        assert manager.simulator.scan_count == scans + 1
+        
+        metrics = scheduler.metrics()
+    finally:
+        manager.close()
+    
+    assert metrics["scans_performed"] == metrics["scans_performed_per_hour"] == 1
+    assert metrics["scans_skipped"] == metrics["scans_skipped_per_hour"] == 2
+    # スキップした回も結果を比べて間隔を決める
+    assert metrics["interval"] == 200
+
+
+def test_scan_results_event_is_published_only_for_real_scans():
+    manager = stable_manager(connected=True)
+    events = []
+    manager.add_event_listener(events.append, [EVENT_SCAN_RESULTS])
+    scheduler = AdaptiveScanScheduler(manager, min_spacing=30)
+    try:
+        manager.scan_cache.invalidate()
+        scheduler.tick()
+        scheduler.tick()
+    finally:
+        manager.close()
+    
+    assert [event.name for event in events] == [EVENT_SCAN_RESULTS]
+
+
+def test_trigger_shortens_the_interval():
+    manager = stable_manager()
+    scheduler = AdaptiveScanScheduler(manager, base_interval=60, min_interval=30, max_interval=200, min_spacing=0)
+    try:
+        scheduler.tick()
+        scheduler.tick()
+        assert scheduler.interval == 120
+        scheduler.trigger()
+        assert scheduler.interval == 30
+    finally:
+        manager.close()
+
+
+def test_disconnect_event_wakes_the_background_scan():
+    manager = stable_manager()
+    scanned = threading.Semaphore(0)
+    manager.add_event_listener(lambda event: scanned.release(), [EVENT_SCAN_RESULTS])
+    scheduler = AdaptiveScanScheduler(manager, base_interval=1000, min_interval=500, max_interval=1000, min_spacing=0)
+    scheduler.start()
+    try:
+        # 最初のスキャンはすぐに行う
+        assert scanned.acquire(timeout=5)
+        assert scheduler.interval == 1000
+        
+        manager.event_dispatcher.publish(WpaEvent(EVENT_DISCONNECTED))
+        assert scanned.acquire(timeout=5)
+    finally:
+        scheduler.stop()
+        manager.close()
+    
+    assert scheduler.metrics()["scans_performed"] == 2
@@ -0,0 +1,189 @@
+import asyncio
+import os
+import shutil
+import tempfile
+import time
+
+import pytest
+
+from models.scan_result import ScanResult
+from services.simulated_wifi import (
+    SIMULATOR_ENV, ReplayWiFi, SyntheticWiFi, append_scan_trace, create_simulator, simulator_from_env,
+)
+from services.wifi_connect import CONNECT_ASSOCIATING, CONNECT_AUTHENTICATING, CONNECT_OBTAINING_IP
+from services.wifi_manager import WiFiManager
+
+
+@pytest.fixture
+def trace_dir():
+    directory = tempfile.mkdtemp(prefix="simulated")
+    yield directory
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+def _frame(*ssids):
+    return [ScanResult(ssid, f"02:00:00:00:00:{i:02x}", 2412, -40.0 - i, ("WPA2-PSK-CCMP",))
+            for i, ssid in enumerate(ssids)]
+
+
+def _scans(simulator, count):
+    async def main():
+        return [await simulator.scan_async() for _ in range(count)]
+    return asyncio.run(main())
+
+
+def test_synthetic_scans_are_reproducible_with_a_seed():
+    first = _scans(SyntheticWiFi(networks=50, seed=7), 5)
+    second = _scans(SyntheticWiFi(networks=50, seed=7), 5)
+    other = _scans(SyntheticWiFi(networks=50, seed=8), 5)
+    
+    assert first == second
+    assert first != other
+    # 信号強度は変わるが、SSIDごとに1件・信号の強い順
+    for results in first:
+        assert len({r.ssid for r in results}) == len(results)
+        assert [r.signal_dbm for r in results] == sorted((r.signal_dbm for r in results), reverse=True)
+    assert first[0] != first[1]
+
+
+def test_synthetic_without_churn_returns_the_same_networks():
+    results = _scans(SyntheticWiFi(networks=20, churn_db=0.0, visibility_churn=0.0, seed=1), 3)
+    
+    assert results[0] == results[1] == results[2]
+    assert len(results[0]) == 20
+    assert {r.ssid for r in results[0]} == {f"SimNet-{i:04d}" for i in range(20)}
+
+
+def test_replay_returns_frames_in_order_and_loops(trace_dir):
+    path = os.path.join(trace_dir, "trace.jsonl")
+    frames = [_frame("Home"), _frame("Home", "Office"), _frame("Cafe")]
+    for frame in frames:
+        append_scan_trace(path, frame)
+    
+    assert _scans(ReplayWiFi(path), 5) == frames + frames[:2]
+    assert _scans(ReplayWiFi(path, loop=False), 5) == frames + [frames[-1]] * 2
+
+
+def test_replay_uses_the_recorded_latency(trace_dir):
+    path = os.path.join(trace_dir, "trace.jsonl")
+    append_scan_trace(path, _frame("Slow"), latency=0.2)
+    append_scan_trace(path, _frame("Fast"))
+    simulator = ReplayWiFi(path)
+    
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(asyncio.wait_for(simulator.scan_async(), 0.05))
+    
+    # 打ち切られたフレームは消費しない
+    assert simulator.scan_count == 0
+    started = time.monotonic()
+    assert asyncio.run(simulator.scan_async()) == _frame("Slow")
+    assert time.monotonic() - started >= 0.2
+    assert asyncio.run(asyncio.wait_for(simulator.scan_async(), 0.1)) == _frame("Fast")
+
+
+def test_replay_rejects_bad_traces(trace_dir):
+    empty = os.path.join(trace_dir, "empty.jsonl")
+    with open(empty, "w", encoding="utf-8") as f:
+        f.write("\n")
+    broken = os.path.join(trace_dir, "broken.jsonl")
+    with open(broken, "w", encoding="utf-8") as f:
+        f.write('{"results": [{"ssid": "Home"}]}\n')
+    
+    with pytest.raises(ValueError):
+        ReplayWiFi(empty)
+    with pytest.raises(ValueError, match="broken.jsonl:1"):
+        ReplayWiFi(broken)
+    with pytest.raises(OSError):
+        ReplayWiFi(os.path.join(trace_dir, "missing.jsonl"))
+
+
+def test_injected_failures_and_timeouts():
+    failing = SyntheticWiFi(networks=5, scan_failure_rate=1.0, seed=1)
+    with pytest.raises(RuntimeError):
+        _scans(failing, 1)
+    assert failing.scan_count == 0
+    
+    hanging = SyntheticWiFi(networks=5, scan_timeout_rate=1.0, seed=1)
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(asyncio.wait_for(hanging.scan_async(), 0.05))
+
+
+def test_injected_failures_are_reproducible():
+    def outcomes(seed):
+        simulator = SyntheticWiFi(networks=5, scan_failure_rate=0.5, seed=seed)
+        results = []
+        for _ in range(20):
+            try:
+                _scans(simulator, 1)
+                results.append(True)
+            except RuntimeError:
+                results.append(False)
+        return results
+    
+    assert outcomes(3) == outcomes(3)
+    assert True in outcomes(3) and False in outcomes(3)
+
+
+def test_connect_only_to_visible_networks(trace_dir):
+    path = os.path.join(trace_dir, "trace.jsonl")
+    append_scan_trace(path, _frame("Home", "Office"))
+    append_scan_trace(path, _frame("Office"))
+    simulator = ReplayWiFi(path, loop=False)
+    
+    assert not simulator.connect("Home", "secret")
+    _scans(simulator, 1)
+    assert simulator.connect("Home", "secret")
+    assert not simulator.connect("Cafe", "secret")
+    assert simulator.current_network() == "Home"
+    
+    # 接続中のネットワークが見えなくなると切断される
+    _scans(simulator, 1)
+    assert simulator.current_network() is None
+
+
+def test_connect_async_reports_each_stage():
+    simulator = SyntheticWiFi(networks=3, churn_db=0.0, visibility_churn=0.0, seed=1)
+    _scans(simulator, 1)
+    states = []
+    
+    assert asyncio.run(simulator.connect_async("SimNet-0002", "secret", states.append))
+    assert states == [CONNECT_ASSOCIATING, CONNECT_AUTHENTICATING, CONNECT_OBTAINING_IP]
+    assert simulator.current_network() == "SimNet-0002"
+    
+    failing = SyntheticWiFi(networks=3, connect_failure_rate=1.0, seed=1)
+    _scans(failing, 1)
+    states = []
+    assert not asyncio.run(failing.connect_async("SimNet-0002", "secret", states.append))
+    assert states == [CONNECT_ASSOCIATING, CONNECT_AUTHENTICATING]
+
+
+def test_create_simulator_parses_options(trace_dir):
+    simulator = create_simulator("synthetic:networks=12,scan_latency=0.5,seed=4")
+    assert isinstance(simulator, SyntheticWiFi)
+    assert simulator.networks == 12
+    assert simulator.scan_latency == 0.5
+    
+    path = os.path.join(trace_dir, "trace.jsonl")
+    append_scan_trace(path, _frame("Home"))
+    replay = create_simulator(f"replay:path={path},loop=false")
+    assert isinstance(replay, ReplayWiFi)
+    assert replay.loop is False
+    
+    for spec in ("unknown", "synthetic:networks", "synthetic:colour=red", "synthetic:networks=many",
+                 f"replay:path={path},loop=maybe"):
+        with pytest.raises(ValueError):
+            create_simulator(spec)
+
+
+def test_simulator_from_env(monkeypatch):
+    monkeypatch.delenv(SIMULATOR_ENV, raising=False)
+    assert simulator_from_env() is None
+    
+    monkeypatch.setenv(SIMULATOR_ENV, "synthetic:networks=4,churn_db=0,visibility_churn=0,seed=2")
+    manager = WiFiManager()
+    try:
+        assert manager.get_scan_backend_info()["backend"] == "synthetic"
+        assert manager.scan_networks(force_refresh=True) == [r.ssid for r in _scans(
+            SyntheticWiFi(networks=4, churn_db=0, visibility_churn=0, seed=2), 1)[0]]
+    finally:
+        manager.close()
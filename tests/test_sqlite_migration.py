@@ -0,0 +1,59 @@
+import os
+import shutil
+import tempfile
+
+import pytest
+
+from models.wifi_config import WiFiConfig
+from services import sqlite_storage_backend
+from services.storage_manager import StorageManager
+
+
+@pytest.fixture
+def json_dir():
+    directory = tempfile.mkdtemp(prefix="migration")
+    storage = StorageManager(storage_dir=directory)
+    storage.save_wifi_configs([
+        WiFiConfig(ssid=f"Net-{i}", password=f"secret-{i}", priority=(i + 1) * 1024) for i in range(5)
+    ])
+    storage.close()
+    yield directory
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+def test_migrates_config_json_once(json_dir):
+    storage = StorageManager(storage_dir=json_dir, backend="sqlite")
+    
+    assert [w.ssid for w in storage.get_wifi_configs()] == [f"Net-{i}" for i in range(5)]
+    assert storage.get_wifi_configs()[2].password.reveal() == "secret-2"
+    assert not os.path.exists(os.path.join(json_dir, "config.json"))
+    assert os.path.exists(os.path.join(json_dir, "config.json.migrated"))
+    assert not os.path.exists(os.path.join(json_dir, "config.db.tmp"))
+    storage.close()
+
+
+def test_failed_migration_leaves_no_database_and_is_retried(json_dir, monkeypatch):
+    def broken_write(self, puts, deletes, sections):
+        raise OSError("disk full")
+    monkeypatch.setattr(sqlite_storage_backend.SQLiteStorageBackend, "write", broken_write)
+    
+    with pytest.raises(OSError):
+        StorageManager(storage_dir=json_dir, backend="sqlite")
+    assert not os.path.exists(os.path.join(json_dir, "config.db"))
+    assert not os.path.exists(os.path.join(json_dir, "config.db.tmp"))
+    assert os.path.exists(os.path.join(json_dir, "config.json"))
+    
+    monkeypatch.undo()
+    storage = StorageManager(storage_dir=json_dir, backend="sqlite")
+    assert len(storage.get_wifi_configs()) == 5
+    storage.close()
+
+
+def test_stale_temporary_database_is_discarded(json_dir):
+    with open(os.path.join(json_dir, "config.db.tmp"), "wb") as f:
+        f.write(b"left over from a crash")
+    
+    storage = StorageManager(storage_dir=json_dir, backend="sqlite")
+    
+    assert len(storage.get_wifi_configs()) == 5
+    storage.close()
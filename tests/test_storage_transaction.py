@@ -0,0 +1,135 @@
+import os
+import shutil
+import tempfile
+
+import pytest
+
+from models.wifi_config import WiFiConfig
+from services.sqlite_storage_backend import SQLiteStorageBackend
+from services.storage_manager import StorageManager
+
+
+@pytest.fixture(params=["json", "journal", "sqlite"])
+def storage(request):
+    directory = tempfile.mkdtemp(prefix="transaction")
+    if request.param == "journal":
+        storage = StorageManager(storage_dir=directory, journaled=True)
+    else:
+        storage = StorageManager(storage_dir=directory, backend=request.param)
+    storage.save_wifi_configs([
+        WiFiConfig(ssid=f"Net-{i}", password=f"secret-{i}", priority=(i + 1) * 1024) for i in range(5)
+    ])
+    yield storage
+    storage.close()
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+def _reopen(storage):
+    if isinstance(storage.backend, SQLiteStorageBackend):
+        return StorageManager(storage_dir=storage.storage_dir, backend="sqlite")
+    return StorageManager(storage_dir=storage.storage_dir, journaled=storage.backend.journal_file is not None)
+
+
+def test_transaction_commits_once(storage):
+    writes = []
+    write = storage.backend.write
+    storage.backend.write = lambda *args: (writes.append(args), write(*args))
+    
+    with storage.transaction():
+        storage.add_wifi_config(WiFiConfig(ssid="Added", password="added", priority=6 * 1024))
+        storage.delete_wifi_config(storage.get_wifi_configs()[0].id)
+        storage.add_activated_key("PRO-KEY")
+        # コミット前は書き込まれない
+        assert writes == []
+    
+    assert len(writes) == 1
+    reopened = _reopen(storage)
+    assert [w.ssid for w in reopened.get_wifi_configs()] == ["Net-1", "Net-2", "Net-3", "Net-4", "Added"]
+    assert reopened.get_license_info()["activated_keys"] == ["PRO-KEY"]
+    reopened.close()
+
+
+def test_transaction_rolls_back_on_exception(storage):
+    before = storage.load_config()
+    
+    with pytest.raises(RuntimeError):
+        with storage.transaction():
+            storage.delete_wifi_config(storage.get_wifi_configs()[0].id)
+            wifi = storage.get_wifi_configs()[0]
+            wifi.ssid = "Changed"
+            storage.update_wifi_config(wifi)
+            storage.renumber_priorities()
+            storage.save_user_settings({"scan_interval_seconds": 1, "notifications_enabled": False})
+            raise RuntimeError("abort")
+    
+    assert storage.load_config() == before
+    assert [w.ssid for w in storage.get_wifi_configs()] == [f"Net-{i}" for i in range(5)]
+    reopened = _reopen(storage)
+    assert reopened.load_config() == before
+    reopened.close()
+
+
+def test_nested_transaction_commits_at_outermost(storage):
+    writes = []
+    write = storage.backend.write
+    storage.backend.write = lambda *args: (writes.append(args), write(*args))
+    
+    with storage.transaction():
+        storage.add_wifi_config(WiFiConfig(ssid="Outer", password="outer", priority=6 * 1024))
+        with storage.transaction():
+            storage.add_wifi_config(WiFiConfig(ssid="Inner", password="inner", priority=7 * 1024))
+        assert writes == []
+        assert [w.ssid for w in storage.get_wifi_configs()][-2:] == ["Outer", "Inner"]
+    
+    assert len(writes) == 1
+    assert len(storage.get_wifi_configs()) == 7
+
+
+def test_apply_batch(storage):
+    first = storage.get_wifi_configs()[0]
+    first.ssid = "Updated"
+    
+    storage.apply_batch([
+        ("update", first),
+        ("add", WiFiConfig(ssid="Added", password="added", priority=1)),
+        ("delete", storage.get_wifi_configs()[4].id),
+        ("renumber", None),
+        ("activate_key", "PRO-KEY"),
+        ("settings", {"scan_interval_seconds": 60, "notifications_enabled": False}),
+    ])
+    
+    reopened = _reopen(storage)
+    configs = reopened.get_wifi_configs()
+    assert [w.ssid for w in configs] == ["Added", "Updated", "Net-1", "Net-2", "Net-3"]
+    assert [w.priority for w in configs] == [1024, 2048, 3072, 4096, 5120]
+    assert reopened.get_license_info() == {"is_pro_unlocked": True, "activated_keys": ["PRO-KEY"]}
+    assert reopened.get_user_settings()["scan_interval_seconds"] == 60
+    reopened.close()
+
+
+def test_apply_batch_with_unknown_op_discards_everything(storage):
+    before = storage.load_config()
+    
+    with pytest.raises(ValueError):
+        storage.apply_batch([
+            ("delete", storage.get_wifi_configs()[0].id),
+            ("bogus",),
+        ])
+    
+    assert storage.load_config() == before
+    reopened = _reopen(storage)
+    assert len(reopened.get_wifi_configs()) == 5
+    reopened.close()
+
+
+def test_failed_commit_leaves_storage_unchanged(storage):
+    def broken_write(puts, deletes, sections):
+        raise OSError("disk full")
+    storage.backend.write = broken_write
+    
+    with pytest.raises(OSError):
+        storage.apply_batch([("delete", storage.get_wifi_configs()[0].id)])
+    
+    del storage.backend.write
+    assert len(storage.get_wifi_configs()) == 5
+    assert not os.path.exists(os.path.join(storage.storage_dir, "config.json.tmp"))
@@ -0,0 +1,141 @@
+import random
+import shutil
+import tempfile
+
+import pytest
+
+from models.wifi_config import WiFiConfig
+from services.storage_manager import StorageManager
+from services.wifi_repository import WiFiRepository
+
+
+def _wifi(ssid, priority, wifi_id):
+    return WiFiConfig(ssid=ssid, password="secret", priority=priority, id=wifi_id)
+
+
+def _assert_consistent(repository, expected):
+    """インデックスの内容が expected（id -> WiFiConfig）と一致することを確かめる"""
+    assert len(repository) == len(expected)
+    ordered = repository.to_list()
+    assert [w.id for w in ordered] == [w.id for w in sorted(ordered, key=lambda w: w.priority)]
+    for wifi_id, wifi in expected.items():
+        assert wifi_id in repository
+        assert repository.get(wifi_id) is wifi
+        assert wifi in repository.find_by_ssid(wifi.ssid)
+    for ssid in {w.ssid for w in expected.values()}:
+        assert {w.id for w in repository.find_by_ssid(ssid)} == {
+            w.id for w in expected.values() if w.ssid == ssid
+        }
+
+
+@pytest.fixture
+def storage():
+    directory = tempfile.mkdtemp(prefix="repository")
+    storage = StorageManager(storage_dir=directory)
+    storage.save_wifi_configs([
+        _wifi("Home", 1024, "home"),
+        _wifi("Office", 2048, "office"),
+        _wifi("Home", 3072, "home-2"),
+    ])
+    yield storage
+    storage.close()
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+def test_find_by_ssid_returns_priority_order():
+    repository = WiFiRepository([
+        _wifi("Home", 3072, "b"),
+        _wifi("Office", 2048, "c"),
+        _wifi("Home", 1024, "a"),
+    ])
+    
+    assert [w.id for w in repository.find_by_ssid("Home")] == ["a", "b"]
+    assert repository.find_by_ssid("Missing") == []
+    assert [w.id for w in repository.match_scan(["Office", "Home", "Home"])] == ["a", "c", "b"]
+
+
+def test_rename_moves_between_ssid_buckets():
+    home = _wifi("Home", 1024, "a")
+    repository = WiFiRepository([home, _wifi("Home", 2048, "b")])
+    
+    home.ssid = "Cafe"
+    repository.put(home)
+    
+    assert [w.id for w in repository.find_by_ssid("Home")] == ["b"]
+    assert repository.find_by_ssid("Cafe") == [home]
+
+
+def test_remove_clears_both_indexes():
+    repository = WiFiRepository([_wifi("Home", 1024, "a")])
+    
+    assert repository.remove("a").id == "a"
+    assert repository.remove("a") is None
+    assert "a" not in repository
+    assert repository.get("a") is None
+    assert repository.find_by_ssid("Home") == []
+    assert repository.match_scan(["Home"]) == []
+
+
+def test_random_updates_keep_indexes_consistent():
+    rng = random.Random(0)
+    ssids = [f"Net-{i}" for i in range(8)]
+    expected = {}
+    repository = WiFiRepository()
+    
+    for step in range(2000):
+        action = rng.random()
+        if action < 0.4 or not expected:
+            wifi = _wifi(rng.choice(ssids), rng.randrange(1, 50) * 1024, f"id-{step}")
+            expected[wifi.id] = wifi
+            repository.add(wifi)
+        elif action < 0.8:
+            wifi = expected[rng.choice(sorted(expected))]
+            if rng.random() < 0.5:
+                wifi.ssid = rng.choice(ssids)
+            else:
+                wifi.priority = rng.randrange(1, 50) * 1024
+            repository.put(wifi)
+        else:
+            wifi_id = rng.choice(sorted(expected))
+            del expected[wifi_id]
+            repository.remove(wifi_id)
+        if step % 100 == 0:
+            _assert_consistent(repository, expected)
+    
+    _assert_consistent(repository, expected)
+
+
+def test_best_match_skips_ignored():
+    home = _wifi("Home", 1024, "a")
+    repository = WiFiRepository([home, _wifi("Home", 2048, "b"), _wifi("Office", 512, "c")])
+    home.set_ignore_permanently(True)
+    
+    assert repository.best_match(["Home"]).id == "b"
+    assert repository.best_match(["Home", "Office"]).id == "c"
+    assert repository.best_match(["Missing"]) is None
+
+
+def test_storage_lookups_follow_update_and_delete(storage):
+    home = storage.get_wifi_config("home")
+    home.ssid = "Renamed"
+    storage.update_wifi_config(home)
+    storage.delete_wifi_config("office")
+    
+    assert [w.id for w in storage.find_wifi_configs_by_ssid("Home")] == ["home-2"]
+    assert [w.id for w in storage.find_wifi_configs_by_ssid("Renamed")] == ["home"]
+    assert storage.find_wifi_configs_by_ssid("Office") == []
+    assert storage.get_wifi_config("office") is None
+    assert [w.id for w in storage.match_scanned_networks(["Home", "Renamed", "Office"])] == ["home", "home-2"]
+    
+    reopened = StorageManager(storage_dir=storage.storage_dir)
+    assert [w.id for w in reopened.find_wifi_configs_by_ssid("Renamed")] == ["home"]
+    assert reopened.get_wifi_config("office") is None
+
+
+def test_storage_lookups_include_pending_updates(storage):
+    office = storage.get_wifi_config("office")
+    office.ssid = "Office-5G"
+    storage.schedule_wifi_update(office)
+    
+    assert [w.id for w in storage.find_wifi_configs_by_ssid("Office-5G")] == ["office"]
+    assert storage.find_wifi_configs_by_ssid("Office") == []
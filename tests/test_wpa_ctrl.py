@@ -0,0 +1,161 @@
+import asyncio
+import os
+import shutil
+import tempfile
+import threading
+
+import pytest
+
+from services.wifi_manager import WiFiManager
+from services.wpa_ctrl import EVENT_CONNECTED, WpaCtrlClient, WpaEventMonitor
+from tests.fake_wpa_supplicant import FakeWpaSupplicant
+
+
+@pytest.fixture
+def socket_dir():
+    # AF_UNIX のパスの長さ制限（108バイト）に収まるよう短いディレクトリを使う
+    directory = tempfile.mkdtemp(prefix="wpa")
+    yield directory
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+@pytest.fixture
+def wpa(socket_dir):
+    with FakeWpaSupplicant(os.path.join(socket_dir, "wlan0")) as server:
+        yield server
+
+
+@pytest.fixture
+def client(wpa, socket_dir):
+    with WpaCtrlClient(wpa.path, timeout=1.0, local_dir=socket_dir) as c:
+        yield c
+
+
+def test_ping(client, wpa):
+    assert client.ping() is True
+    assert wpa.commands == ["PING"]
+
+
+def test_status_is_parsed_into_key_values(client, wpa):
+    wpa.replies["STATUS"] = "ssid=a=b\nwpa_state=COMPLETED\nip_address=10.0.0.2\nnot a pair\n"
+    
+    status = client.status()
+    
+    assert status == {"ssid": "a=b", "wpa_state": "COMPLETED", "ip_address": "10.0.0.2"}
+
+
+def test_event_arriving_before_the_reply_is_kept_for_receive(client, wpa):
+    event = "<3>CTRL-EVENT-CONNECTED - Connection to 00:11:22:33:44:56 completed [id=0 id_str=]"
+    wpa.events_before_reply["STATUS"] = [event]
+    
+    status = client.status()
+    
+    assert status["wpa_state"] == "COMPLETED"
+    assert client.receive(timeout=0.5) == event
+    assert client.receive(timeout=0.05) is None
+
+
+def test_request_times_out_and_reopens_for_the_next_request(client, wpa):
+    wpa.silent.add("STATUS")
+    
+    with pytest.raises(TimeoutError):
+        client.request("STATUS", timeout=0.1)
+    
+    assert not client.is_open
+    assert client.ping() is True
+
+
+def test_late_reply_is_not_returned_for_the_next_request(client, wpa):
+    wpa.reply_delay["STATUS"] = 0.3
+    
+    with pytest.raises(TimeoutError):
+        client.request("STATUS", timeout=0.1)
+    
+    assert client.request("PING").strip() == "PONG"
+
+
+def test_wait_event_skips_other_events(wpa, socket_dir):
+    with WpaCtrlClient(wpa.path, local_dir=socket_dir) as events:
+        assert events.request("ATTACH").strip() == "OK"
+        wpa.emit("<2>CTRL-EVENT-SCAN-STARTED ")
+        wpa.emit("<3>CTRL-EVENT-CONNECTED - Connection to 00:11:22:33:44:56 completed")
+        
+        event = events.wait_event([EVENT_CONNECTED], timeout=1.0)
+        
+        assert event is not None and event.bssid == "00:11:22:33:44:56"
+        assert events.wait_event([EVENT_CONNECTED], timeout=0.05) is None
+
+
+def test_scan_and_wait_returns_results_of_the_new_scan(client, wpa):
+    results = client.scan_and_wait(timeout=2.0)
+    
+    assert [r.ssid for r in results] == ["MyHome", "Cafe"]
+    assert results[0].bssid == "00:11:22:33:44:56"
+    assert wpa.commands.index("SCAN_RESULTS") > wpa.commands.index("SCAN")
+    assert not wpa.attached
+
+
+def test_scan_and_wait_times_out_when_the_scan_never_finishes(client, wpa):
+    wpa.scan_delay = None
+    
+    with pytest.raises(TimeoutError):
+        client.scan_and_wait(timeout=0.2)
+    
+    assert "SCAN_RESULTS" not in wpa.commands
+    assert not wpa.attached
+
+
+def test_scan_and_wait_reports_a_failed_scan(client, wpa):
+    wpa.scan_fails = True
+    
+    with pytest.raises(RuntimeError):
+        client.scan_and_wait(timeout=1.0)
+
+
+def test_event_monitor_delivers_events_received_during_ping(wpa, socket_dir):
+    received = []
+    delivered = threading.Event()
+    
+    def on_event(event):
+        received.append(event)
+        delivered.set()
+    
+    wpa.events_before_reply["PING"] = ["<3>CTRL-EVENT-DISCONNECTED bssid=00:11:22:33:44:56 reason=3"]
+    monitor = WpaEventMonitor(wpa.path, on_event, local_dir=socket_dir, ping_interval=0.0)
+    try:
+        assert monitor.start(wait=2.0)
+        assert delivered.wait(3.0)
+    finally:
+        monitor.stop()
+    
+    assert received[0].name == "CTRL-EVENT-DISCONNECTED"
+    assert received[0].fields["reason"] == "3"
+
+
+def test_wifi_manager_scans_through_the_control_socket(wpa):
+    manager = WiFiManager(wpa_ctrl_path=wpa.path)
+    try:
+        results = asyncio.run(manager._scan_with_wpa_ctrl())
+    finally:
+        manager.close()
+    
+    assert [r.ssid for r in results] == ["MyHome", "Cafe"]
+
+
+def test_wifi_manager_shares_one_client_between_threads(wpa):
+    manager = WiFiManager(wpa_ctrl_path=wpa.path)
+    barrier = threading.Barrier(8)
+    clients = []
+    
+    def get_client():
+        barrier.wait()
+        clients.append(manager._get_wpa_ctrl())
+    
+    threads = [threading.Thread(target=get_client) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    manager.close()
+    
+    assert len({id(c) for c in clients}) == 1
@@ -0,0 +1,149 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+
+import pytest
+
+from models.wifi_config import WiFiConfig
+from services import write_behind
+from services.storage_manager import StorageManager
+from services.write_behind import WriteBehindQueue
+
+
+@pytest.fixture
+def storage():
+    directory = tempfile.mkdtemp(prefix="write_behind")
+    storage = StorageManager(storage_dir=directory, write_behind_delay=60.0)
+    storage.save_wifi_configs([
+        WiFiConfig(ssid=f"Net-{i}", password=f"secret-{i}", priority=(i + 1) * 1024) for i in range(3)
+    ])
+    yield storage
+    storage.close()
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+def test_updates_to_the_same_key_are_coalesced():
+    flushed = []
+    queue = WriteBehindQueue(flushed.append, delay=60.0)
+    
+    for i in range(5):
+        queue.schedule("a", f"a-{i}")
+    queue.schedule("b", "b-0")
+    queue.flush()
+    
+    assert flushed == [["a-4", "b-0"]]
+    queue.flush()
+    assert len(flushed) == 1
+
+
+def test_flushes_in_background_after_delay():
+    done = threading.Event()
+    flushed = []
+    queue = WriteBehindQueue(lambda items: (flushed.append(items), done.set()), delay=0.05)
+    
+    queue.schedule("a", 1)
+    queue.schedule("a", 2)
+    
+    assert done.wait(5)
+    assert flushed == [[2]]
+    assert queue.pending() == {}
+
+
+def test_failed_flush_keeps_items_for_retry():
+    attempts = []
+    
+    def flush_fn(items):
+        attempts.append(items)
+        if len(attempts) == 1:
+            raise OSError("disk full")
+    
+    queue = WriteBehindQueue(flush_fn, delay=60.0)
+    queue.schedule("a", 1)
+    with pytest.raises(OSError):
+        queue.flush()
+    queue.schedule("b", 2)
+    queue.flush()
+    
+    assert attempts == [[1], [1, 2]]
+
+
+def test_flush_is_registered_at_exit(monkeypatch):
+    registered = []
+    monkeypatch.setattr(write_behind.atexit, "register", registered.append)
+    flushed = []
+    queue = WriteBehindQueue(flushed.append, delay=60.0)
+    
+    queue.schedule("a", 1)
+    queue.schedule("a", 2)
+    assert registered == [queue.flush]
+    
+    # プロセス終了時に呼ばれる関数を実行する
+    registered[0]()
+    assert flushed == [[2]]
+
+
+def test_pending_update_is_written_when_the_process_exits(storage):
+    wifi_id = storage.get_wifi_configs()[0].id
+    script = (
+        "import sys\n"
+        "from services.storage_manager import StorageManager\n"
+        "storage = StorageManager(storage_dir=sys.argv[1], write_behind_delay=60.0)\n"
+        "wifi = storage.get_wifi_config(sys.argv[2])\n"
+        "wifi.set_ignore_permanently(True)\n"
+        "storage.schedule_wifi_update(wifi)\n"
+    )
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    
+    # close() も flush() も呼ばずに終了する
+    subprocess.run([sys.executable, "-c", script, storage.storage_dir, wifi_id], cwd=root, check=True, timeout=30)
+    
+    assert StorageManager(storage_dir=storage.storage_dir).get_wifi_config(wifi_id).should_ignore_permanently()
+
+
+def test_storage_coalesces_rapid_updates_into_one_write(storage):
+    writes = []
+    write = storage.backend.write
+    storage.backend.write = lambda puts, deletes, sections: (writes.append(puts), write(puts, deletes, sections))
+    wifi = storage.get_wifi_configs()[0]
+    
+    for _ in range(4):
+        wifi.set_ignore_permanently(not wifi.should_ignore_permanently())
+        storage.schedule_wifi_update(wifi)
+    wifi.set_ignore_today()
+    storage.schedule_wifi_update(wifi)
+    
+    # 書き込み前でもキャッシュには反映されている
+    assert writes == []
+    assert storage.get_wifi_config(wifi.id).status_flags.ignore_today
+    storage.flush()
+    
+    assert len(writes) == 1
+    assert len(writes[0]) == 1
+    reopened = StorageManager(storage_dir=storage.storage_dir)
+    flags = reopened.get_wifi_config(wifi.id).status_flags
+    assert flags.ignore_today and not flags.ignore_until_manual_reset
+
+
+def test_close_flushes_pending_updates(storage):
+    wifi = storage.get_wifi_configs()[2]
+    wifi.set_ignore_permanently(True)
+    storage.schedule_wifi_update(wifi)
+    
+    storage.close()
+    
+    reopened = StorageManager(storage_dir=storage.storage_dir)
+    assert reopened.get_wifi_config(wifi.id).should_ignore_permanently()
+
+
+def test_delete_discards_pending_update(storage):
+    wifi = storage.get_wifi_configs()[1]
+    wifi.set_ignore_permanently(True)
+    storage.schedule_wifi_update(wifi)
+    
+    storage.delete_wifi_config(wifi.id)
+    storage.flush()
+    
+    assert StorageManager(storage_dir=storage.storage_dir).get_wifi_config(wifi.id) is None
@@ -1,6 +1,17 @@
 import flet as ft
+from typing import List
 from models.wifi_config import WiFiConfig
-from services.wifi_manager import WiFiManager
+from services.wifi_manager import WiFiManager, ScanSnapshot
+
+
+def format_scan_age(snapshot: ScanSnapshot) -> str:
+    """スキャン結果の経過時間の表示用テキスト"""
+    age = int(snapshot.age)
+    if age < 5:
+        return "たった今スキャン"
+    if age < 60:
+        return f"{age}秒前にスキャン"
+    return f"{age // 60}分前にスキャン"
 
 
 class AddWiFiDialog(ft.AlertDialog):
@@ -11,7 +22,7 @@ class AddWiFiDialog(ft.AlertDialog):
         Args:
             wifi_manager: Wi-Fiマネージャー
             on_save: 保存時のコールバック関数
-            current_priority: 次の優先順位番号
+            current_priority: 新しいWi-Fiの優先順位（並べ替え用のキー）
         """
         self.wifi_manager = wifi_manager
         self.on_save_callback = on_save
@@ -50,12 +61,17 @@ class AddWiFiDialog(ft.AlertDialog):
         self.selected_ssid = None
         self.selected_password = ""
         
+        # 実行中のスキャン（page.run_task() の戻り値）
+        self._scan_task = None
+        self.scan_age_text = ft.Text("", size=12, color="grey")
+        
         # コンテンツエリア
         self.scan_content = ft.Container(
             content=ft.Column([
                 ft.Row([
                     ft.Text("利用可能なネットワーク", size=16),
                     ft.Container(expand=True),
+                    self.scan_age_text,
                     ft.IconButton(
                         icon="refresh",
                         tooltip="再スキャン",
@@ -105,8 +121,7 @@ class AddWiFiDialog(ft.AlertDialog):
         )
         
         
-        # 初回スキャンはdid_mountで行う（UIフリーズ回避のため）
-        # self._load_scan_results() 
+        # 初回スキャンはdid_mountで開始する（結果はスキャン完了後に表示）
         print("AddWiFiDialog initialized")
 
     def did_mount(self):
@@ -114,6 +129,10 @@ class AddWiFiDialog(ft.AlertDialog):
         print("AddWiFiDialog did_mount")
         self._load_scan_results()
     
+    def will_unmount(self):
+        """ダイアログが閉じられる前に実行"""
+        self._cancel_scan()
+    
     def _on_tab_changed(self, e):
         """タブ切り替え時"""
         if e.control.selected_index == 0:
@@ -126,9 +145,59 @@ class AddWiFiDialog(ft.AlertDialog):
         if self.page:
             self.page.update()
     
-    def _load_scan_results(self):
-        """スキャン結果を読み込み"""
-        networks = self.wifi_manager.scan_networks()
+    def _load_scan_results(self, force_refresh: bool = False):
+        """スキャンを開始し、結果が届いたらリストを更新する
+        
+        スキャン中もダイアログを操作できるよう、スキャンは page.run_task() で
+        イベントループ上で行います。実行中のスキャンがあればキャンセルします。
+        最近のスキャン結果があれば、スキャンせずにそれを表示します。
+        
+        Args:
+            force_refresh: Trueの場合は最近のスキャン結果を使わない
+        """
+        self._cancel_scan()
+        self.scan_age_text.value = ""
+        self.scan_list.controls.clear()
+        self.scan_list.controls.append(
+            ft.Container(
+                content=ft.Row([
+                    ft.ProgressRing(width=16, height=16, stroke_width=2),
+                    ft.Text("スキャン中...", color="grey", italic=True),
+                ], alignment=ft.MainAxisAlignment.CENTER),
+                padding=20,
+                alignment=ft.alignment.center
+            )
+        )
+        if self.page:
+            self.page.update()
+            self._scan_task = self.page.run_task(self._scan_and_show_results, force_refresh)
+        else:
+            try:
+                networks = self.wifi_manager.scan_networks(force_refresh=force_refresh)
+            except Exception as e:
+                print(f"Wi-Fiスキャンエラー: {e}")
+                networks = []
+            self._show_scan_results(networks)
+    
+    async def _scan_and_show_results(self, force_refresh: bool = False):
+        """スキャンを実行して結果を表示"""
+        try:
+            snapshot = await self.wifi_manager.scan_networks_cached(force_refresh=force_refresh)
+        except Exception as e:
+            print(f"Wi-Fiスキャンエラー: {e}")
+            self._show_scan_results([])
+            return
+        self.scan_age_text.value = format_scan_age(snapshot)
+        self._show_scan_results(snapshot.networks)
+    
+    def _cancel_scan(self):
+        """実行中のスキャンをキャンセル"""
+        if self._scan_task is not None:
+            self._scan_task.cancel()
+            self._scan_task = None
+    
+    def _show_scan_results(self, networks: List[str]):
+        """スキャン結果をリストに表示"""
         self.scan_list.controls.clear()
         
         if not networks:
@@ -151,6 +220,7 @@ class AddWiFiDialog(ft.AlertDialog):
                         title=ft.Text(ssid),
                         on_click=lambda e, s=ssid: self._on_network_selected(s),
                         hover_color="blue,0.1",
+                        bgcolor="blue900" if ssid == self.selected_ssid else None,
                     )
                 )
         
@@ -158,8 +228,10 @@ class AddWiFiDialog(ft.AlertDialog):
             self.page.update()
     
     def _on_refresh_scan(self, e):
-        """再スキャンボタン"""
-        self._load_scan_results()
+        """再スキャンボタン（スキャン中に押された場合は何もしない）"""
+        if self._scan_task is not None and not self._scan_task.done():
+            return
+        self._load_scan_results(force_refresh=True)
     
     def _on_network_selected(self, ssid: str):
         """ネットワーク選択時"""
@@ -181,6 +253,7 @@ class AddWiFiDialog(ft.AlertDialog):
     
     def _on_cancel(self, e):
         """キャンセルボタン"""
+        self._cancel_scan()
         self.open = False
         if self.page:
             self.page.update()
@@ -1,13 +1,29 @@
 import flet as ft
-from typing import List
-from models.wifi_config import WiFiConfig
+from typing import List, Optional
+from models.wifi_config import WiFiConfig, compute_ignored_flags
+from services.auto_connect import ACTION_CONNECT, AutoConnectDecision
+from services.wifi_connect import (
+    CONNECT_ASSOCIATING, CONNECT_AUTHENTICATING, CONNECT_CANCELLED, CONNECT_CONNECTED,
+    CONNECT_FAILED, CONNECT_OBTAINING_IP, REASON_SUPERSEDED, REASON_TIMEOUT, ConnectAttempt, ConnectProgress,
+)
 from services.wifi_manager import WiFiManager
+from services.wpa_ctrl import EVENT_CONNECTED, EVENT_DISCONNECTED, EVENT_SCAN_RESULTS
 from services.storage_manager import StorageManager
 from services.license_manager import LicenseManager
 from ui.wifi_card import WiFiCard
-from ui.add_wifi_dialog import AddWiFiDialog
+from ui.add_wifi_dialog import AddWiFiDialog, format_scan_age
 from ui.license_dialog import LicenseDialog
 
+# 接続試行の進行状態ごとのステータス表示（文言, 色）
+_CONNECT_STATUS = {
+    CONNECT_ASSOCIATING: ("接続中...", "orange"),
+    CONNECT_AUTHENTICATING: ("認証中...", "orange"),
+    CONNECT_OBTAINING_IP: ("IPアドレス取得中...", "orange"),
+    CONNECT_CONNECTED: ("接続成功", "green"),
+    CONNECT_FAILED: ("接続失敗", "red"),
+    CONNECT_CANCELLED: ("キャンセルしました", "grey"),
+}
+
 
 class Dashboard(ft.Container):
     """メインダッシュボード画面"""
@@ -32,6 +48,16 @@ class Dashboard(ft.Container):
             color="grey"
         )
         
+        # 接続中だけ表示するキャンセルボタン
+        self.cancel_connect_button = ft.IconButton(
+            icon="cancel",
+            icon_size=20,
+            on_click=self._on_cancel_connect_clicked,
+            tooltip="接続をキャンセル",
+            visible=False,
+        )
+        self._connect_attempt: Optional[ConnectAttempt] = None
+        
         # Wi-Fiカードのリスト
         self.wifi_list_view = ft.ListView(
             expand=True,
@@ -64,9 +90,10 @@ class Dashboard(ft.Container):
                             self.current_network_text,
                         ], spacing=2),
                         ft.Container(expand=True),
-                        ft.Column([
+                        ft.Row([
                             self.status_text,
-                        ], horizontal_alignment=ft.CrossAxisAlignment.END),
+                            self.cancel_connect_button,
+                        ], spacing=0),
                         ft.Container(width=10),
                         self.add_button,
                     ]),
@@ -86,6 +113,12 @@ class Dashboard(ft.Container):
         # 初期データ読み込み
         self.load_wifi_configs()
         self.update_current_network()
+        
+        # 接続・切断のイベントが届いたら現在の接続を更新
+        self.wifi_manager.add_event_listener(
+            lambda event: self.update_current_network(),
+            [EVENT_CONNECTED, EVENT_DISCONNECTED]
+        )
     
     def load_wifi_configs(self):
         """Wi-Fi設定を読み込んで表示"""
@@ -113,14 +146,10 @@ class Dashboard(ft.Container):
                 )
             )
         else:
-            for wifi in wifi_configs:
-                card = WiFiCard(
-                    wifi=wifi,
-                    on_update=self._on_wifi_updated,
-                    on_delete=self._on_wifi_deleted,
-                    on_connect=self._on_wifi_connect
-                )
-                self.wifi_list_view.controls.append(card)
+            # 除外状態は一覧全体で1回だけ判定する
+            ignored_flags = compute_ignored_flags(wifi_configs)
+            for i, (wifi, ignored) in enumerate(zip(wifi_configs, ignored_flags)):
+                self.wifi_list_view.controls.append(self._create_wifi_card(wifi, ignored, rank=i + 1))
         
         if self.page:
             self.page.update()
@@ -136,6 +165,26 @@ class Dashboard(ft.Container):
         if self.page:
             self.page.update()
     
+    def show_auto_connect_decision(self, decision: AutoConnectDecision):
+        """自動接続エンジンの判定結果を表示（接続の提案、または接続した結果）"""
+        wifi = decision.wifi
+        if decision.action == ACTION_CONNECT:
+            if decision.connected:
+                message, bgcolor = f"優先度の高い「{wifi.ssid}」に接続しました", "green"
+            else:
+                message, bgcolor = f"「{wifi.ssid}」への自動接続に失敗しました", "red"
+            self.page.snack_bar = ft.SnackBar(content=ft.Text(message), bgcolor=bgcolor)
+            self.update_current_network()
+        else:
+            self.page.snack_bar = ft.SnackBar(
+                content=ft.Text(f"優先度の高い「{wifi.ssid}」が見つかりました"),
+                action="接続",
+                on_action=lambda e: self._on_wifi_connect(wifi),
+                duration=10000,
+            )
+        self.page.snack_bar.open = True
+        self.page.update()
+    
     def _on_add_wifi_clicked(self, e):
         """Wi-Fi追加ボタンクリック"""
         try:
@@ -196,8 +245,7 @@ class Dashboard(ft.Container):
         """Wi-Fi追加ダイアログを表示"""
         try:
             print("_show_add_wifi_dialog - START")
-            wifi_configs = self.storage_manager.get_wifi_configs()
-            next_priority = len(wifi_configs) + 1
+            next_priority = self.storage_manager.get_next_priority()
             print(f"_show_add_wifi_dialog - next_priority: {next_priority}")
             
             dialog = AddWiFiDialog(
@@ -230,10 +278,6 @@ class Dashboard(ft.Container):
         try:
             print("_show_add_wifi_bottomsheet - START")
             
-            # Wi-Fiスキャン実行
-            networks = self.wifi_manager.scan_networks()
-            print(f"Scanned networks: {networks}")
-            
             # 選択されたSSIDとパスワード入力欄
             selected_ssid_ref = {"value": None}
             password_field = ft.TextField(
@@ -245,6 +289,7 @@ class Dashboard(ft.Container):
             
             # Wi-Fiリスト
             wifi_list_column = ft.Column([], spacing=2, scroll=ft.ScrollMode.AUTO, height=250)
+            scan_age_text = ft.Text("", size=12, color="grey")
             
             def on_network_click(ssid):
                 selected_ssid_ref["value"] = ssid
@@ -258,28 +303,63 @@ class Dashboard(ft.Container):
                 wifi_list_column.update()
                 print(f"Selected: {ssid}")
             
-            # ネットワークリストを構築（コンパクト表示）
-            if networks:
-                for ssid in networks:
-                    wifi_list_column.controls.append(
-                        ft.Container(
-                            content=ft.Row([
-                                ft.Icon("wifi", size=16),
-                                ft.Container(width=8),
-                                ft.Text(ssid, size=13),
-                            ]),
-                            data=ssid,
-                            on_click=lambda e, s=ssid: on_network_click(s),
-                            border_radius=5,
-                            padding=ft.padding.symmetric(vertical=8, horizontal=10)
+            def show_networks(networks: List[str]):
+                # ネットワークリストを構築（コンパクト表示）
+                wifi_list_column.controls.clear()
+                if networks:
+                    for ssid in networks:
+                        wifi_list_column.controls.append(
+                            ft.Container(
+                                content=ft.Row([
+                                    ft.Icon("wifi", size=16),
+                                    ft.Container(width=8),
+                                    ft.Text(ssid, size=13),
+                                ]),
+                                data=ssid,
+                                on_click=lambda e, s=ssid: on_network_click(s),
+                                bgcolor="blue900" if ssid == selected_ssid_ref["value"] else None,
+                                border_radius=5,
+                                padding=ft.padding.symmetric(vertical=8, horizontal=10)
+                            )
                         )
+                else:
+                    wifi_list_column.controls.append(
+                        ft.Text("Wi-Fiネットワークが見つかりませんでした", color="grey", italic=True, size=12)
                     )
-            else:
-                wifi_list_column.controls.append(
-                    ft.Text("Wi-Fiネットワークが見つかりませんでした", color="grey", italic=True, size=12)
-                )
+                self.page.update()
+            
+            async def scan_and_show():
+                # BottomSheetを表示したままスキャンし、完了したらリストを差し替える
+                try:
+                    snapshot = await self.wifi_manager.scan_networks_cached()
+                except Exception as ex:
+                    print(f"Wi-Fiスキャンエラー: {ex}")
+                    show_networks([])
+                    return
+                print(f"Scanned networks: {snapshot.networks}")
+                scan_age_text.value = format_scan_age(snapshot)
+                show_networks(snapshot.networks)
+            
+            def on_scan_results(event):
+                # 表示中に新しいスキャン結果が届いたらリストを差し替える
+                snapshot = self.wifi_manager.scan_cache.peek()
+                if snapshot is not None:
+                    scan_age_text.value = format_scan_age(snapshot)
+                    show_networks(snapshot.networks)
+            
+            def stop_updates():
+                scan_task.cancel()
+                remove_scan_listener()
+            
+            wifi_list_column.controls.append(
+                ft.Row([
+                    ft.ProgressRing(width=16, height=16, stroke_width=2),
+                    ft.Text("スキャン中...", color="grey", italic=True, size=12),
+                ])
+            )
             
             def close_bs(e=None):
+                stop_updates()
                 bs.open = False
                 bs.update()
                 # ステータスを戻す
@@ -301,8 +381,7 @@ class Dashboard(ft.Container):
                 
                 # Wi-Fi設定を作成
                 from models.wifi_config import WiFiConfig
-                wifi_configs = self.storage_manager.get_wifi_configs()
-                next_priority = len(wifi_configs) + 1
+                next_priority = self.storage_manager.get_next_priority()
                 
                 wifi = WiFiConfig(
                     ssid=selected_ssid_ref["value"],
@@ -324,7 +403,11 @@ class Dashboard(ft.Container):
                             ft.IconButton(icon="close", on_click=close_bs)
                         ]),
                         ft.Divider(),
-                        ft.Text("利用可能なネットワーク", size=16),
+                        ft.Row([
+                            ft.Text("利用可能なネットワーク", size=16),
+                            ft.Container(expand=True),
+                            scan_age_text,
+                        ]),
                         wifi_list_column,
                         ft.Container(height=10),
                         password_field,
@@ -339,10 +422,15 @@ class Dashboard(ft.Container):
                     width=500
                 ),
                 open=True,
+                on_dismiss=lambda e: stop_updates(),
             )
             
             self.page.overlay.append(bs)
             self.page.update()
+            
+            # Wi-Fiスキャン実行（結果は届いた時点で表示）
+            scan_task = self.page.run_task(scan_and_show)
+            remove_scan_listener = self.wifi_manager.add_event_listener(on_scan_results, [EVENT_SCAN_RESULTS])
             print("_show_add_wifi_bottomsheet - done")
             
         except Exception as ex:
@@ -373,9 +461,34 @@ class Dashboard(ft.Container):
         self.page.update()
     
     def _on_wifi_updated(self, wifi: WiFiConfig):
-        """Wi-Fi更新時"""
-        self.storage_manager.update_wifi_config(wifi)
-        self.load_wifi_configs()
+        """Wi-Fi更新時
+        
+        保存は遅延書き込みに任せ、変更されたカードだけを作り直します。
+        """
+        self.storage_manager.schedule_wifi_update(wifi)
+        
+        for i, control in enumerate(self.wifi_list_view.controls):
+            if isinstance(control, WiFiCard) and control.wifi.id == wifi.id:
+                self.wifi_list_view.controls[i] = self._create_wifi_card(wifi, rank=i + 1)
+                break
+        else:
+            self.load_wifi_configs()
+            return
+        
+        if self.page:
+            self.page.update()
+    
+    def _create_wifi_card(self, wifi: WiFiConfig, ignored: Optional[bool] = None,
+                          rank: Optional[int] = None) -> WiFiCard:
+        """Wi-Fiカードを生成（rank は一覧での順位）"""
+        return WiFiCard(
+            wifi=wifi,
+            on_update=self._on_wifi_updated,
+            on_delete=self._on_wifi_deleted,
+            on_connect=self._on_wifi_connect,
+            ignored=ignored,
+            rank=rank,
+        )
     
     def _on_wifi_deleted(self, wifi: WiFiConfig):
         """Wi-Fi削除時"""
@@ -408,28 +521,55 @@ class Dashboard(ft.Container):
         self.page.update()
     
     def _on_wifi_connect(self, wifi: WiFiConfig):
-        """Wi-Fi接続試行"""
+        """Wi-Fi接続試行
+        
+        接続はバックグラウンドで行い、進行状態をステータスに表示します。
+        接続中に別のWi-Fiへの接続を始めた場合は、前の接続試行はキャンセルされます。
+        """
         self.status_text.value = "接続中..."
         self.status_text.color = "orange"
+        self.cancel_connect_button.visible = True
         self.page.update()
         
-        success = self.wifi_manager.connect_to_network(wifi.ssid, wifi.password)
-        
-        if success:
-            self.status_text.value = "接続成功"
-            self.status_text.color = "green"
-            self.page.snack_bar = ft.SnackBar(
-                content=ft.Text(f"「{wifi.ssid}」に接続しました"),
-                bgcolor="green"
-            )
-            self.update_current_network()
-        else:
-            self.status_text.value = "接続失敗"
-            self.status_text.color = "red"
-            self.page.snack_bar = ft.SnackBar(
-                content=ft.Text(f"「{wifi.ssid}」への接続に失敗しました"),
-                bgcolor="red"
-            )
-        
-        self.page.snack_bar.open = True
+        attempt = self.wifi_manager.connect_async(wifi.ssid, wifi.password)
+        self._connect_attempt = attempt
+        attempt.add_progress_listener(lambda progress: self._on_connect_progress(attempt, progress))
+        # リスナーの登録より前に進んだ状態を反映する
+        self._on_connect_progress(attempt, attempt.history[-1])
+    
+    def _on_connect_progress(self, attempt: ConnectAttempt, progress: ConnectProgress):
+        """接続試行の進行状態を表示する（接続処理のスレッドから呼ばれる）"""
+        if attempt is not self._connect_attempt or progress.state not in _CONNECT_STATUS:
+            # 置き換えられた古い接続試行の通知は表示しない
+            return
+        self.status_text.value, self.status_text.color = _CONNECT_STATUS[progress.state]
+        if progress.is_terminal:
+            self.cancel_connect_button.visible = False
+            self._connect_attempt = None
+            # この接続試行の結果だけを表示する（前に表示したスナックバーを開き直さない）
+            snack_bar = None
+            if progress.state == CONNECT_CONNECTED:
+                snack_bar = ft.SnackBar(
+                    content=ft.Text(f"「{attempt.ssid}」に接続しました"),
+                    bgcolor="green"
+                )
+                self.update_current_network()
+            elif progress.state == CONNECT_FAILED:
+                message = "（時間内に接続できませんでした）" if progress.reason == REASON_TIMEOUT else ""
+                snack_bar = ft.SnackBar(
+                    content=ft.Text(f"「{attempt.ssid}」への接続に失敗しました{message}"),
+                    bgcolor="red"
+                )
+            elif progress.reason != REASON_SUPERSEDED:
+                snack_bar = ft.SnackBar(
+                    content=ft.Text(f"「{attempt.ssid}」への接続をキャンセルしました"),
+                )
+            if snack_bar is not None:
+                snack_bar.open = True
+                self.page.snack_bar = snack_bar
         self.page.update()
+    
+    def _on_cancel_connect_clicked(self, e):
+        """接続キャンセルボタンクリック"""
+        if self._connect_attempt is not None:
+            self._connect_attempt.cancel()
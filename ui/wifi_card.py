@@ -1,23 +1,30 @@
 import flet as ft
+from typing import Optional
 from models.wifi_config import WiFiConfig
 
 
 class WiFiCard(ft.Container):
     """Wi-Fi設定カードコンポーネント"""
     
-    def __init__(self, wifi: WiFiConfig, on_update, on_delete, on_connect):
+    def __init__(self, wifi: WiFiConfig, on_update, on_delete, on_connect, ignored: Optional[bool] = None,
+                 rank: Optional[int] = None):
         """
         Args:
             wifi: Wi-Fi設定オブジェクト
             on_update: 更新時のコールバック関数
             on_delete: 削除時のコールバック関数
             on_connect: 接続時のコールバック関数
+            ignored: 接続候補から除外されているか（一覧でまとめて判定済みの場合に渡す）
+            rank: 表示する優先順位（1始まり）。wifi.priority は並べ替え用のキーのため表示しない
         """
         self.wifi = wifi
         self.on_update_callback = on_update
         self.on_delete_callback = on_delete
         self.on_connect_callback = on_connect
         
+        if ignored is None:
+            ignored = wifi.is_ignored()
+        
         # トグルスイッチ
         self.ignore_today_switch = ft.Switch(
             label="今日だけ無視",
@@ -37,19 +44,19 @@ class WiFiCard(ft.Container):
                     ft.Icon(
                         "wifi",
                         size=32,
-                        color="blue" if not wifi.is_ignored() else "grey"
+                        color="blue" if not ignored else "grey"
                     ),
                     ft.Column([
                         ft.Text(
                             wifi.ssid,
                             size=18,
                             weight=ft.FontWeight.BOLD,
-                            color="white" if not wifi.is_ignored() else "grey"
+                            color="white" if not ignored else "grey"
                         ),
                         ft.Text(
-                            f"優先順位: {wifi.priority}",
+                            f"優先順位: {rank}" if rank is not None else "",
                             size=14,
-                            color="grey" if not wifi.is_ignored() else "grey"
+                            color="grey" if not ignored else "grey"
                         ),
                     ], spacing=2),
                     ft.Container(expand=True),
@@ -76,8 +83,8 @@ class WiFiCard(ft.Container):
             padding=15,
             margin=ft.margin.only(bottom=10),
             border_radius=10,
-            bgcolor="surfacevariant" if not wifi.is_ignored() else "grey900",
-            border=ft.border.all(1, "outline" if not wifi.is_ignored() else "grey"),
+            bgcolor="surfacevariant" if not ignored else "grey900",
+            border=ft.border.all(1, "outline" if not ignored else "grey"),
         )
     
     def _on_ignore_today_changed(self, e):
@@ -85,8 +92,7 @@ class WiFiCard(ft.Container):
         if e.control.value:
             self.wifi.set_ignore_today()
         else:
-            self.wifi.status_flags.ignore_today = False
-            self.wifi.status_flags.last_ignored_date = None
+            self.wifi.clear_ignore_today()
         
         self.on_update_callback(self.wifi)
     